@@ -1,9 +1,26 @@
-import re
+import asyncio
+import concurrent.futures
+import csv
+import io
+from typing import Awaitable
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from pydantic import BaseModel
 from services.chat_agent import Chat_agent
-from services.mysql_executer import MysqlDB
+from services.mysql_executer import MysqlDB, RunningQuery
+from services.row_counter import RowCounter
+from services.query_governor import QueryGovernor, GovernorDecision
+from services.pagination import keyset_plan, encode_cursor, decode_cursor
+from services.sql_utils import paginate_query
+from services.sql_templates import SqlTemplateStore, TemplateMatch
+from services.deadline import DeadlineExceeded, bounded, start_deadline
+from services.metrics import stage_timer, timed, start_request_timings, server_timing_header
+from services.serialization import FastJSONResponse, to_arrow_ipc, dumps as json_dumps
+from services.retriever import init_retriever, get_retriever, matches_lexically
+from services.schema_catalog import init_schema_catalog, close_schema_catalog
+from services.configuration.config import settings
 from services.configuration.keywords import Contains_Forbidden_Keywords
 from services.configuration.logger import get_logger
 from fastapi.middleware.cors import CORSMiddleware
@@ -16,6 +33,14 @@ logger = get_logger("API_Logger")
 # Instantiate core components for NLP-to-SQL and MySQL execution
 chat = Chat_agent()
 db_instance = MysqlDB()
+row_counter = RowCounter(db_instance)
+governor = QueryGovernor(db_instance)
+sql_templates = SqlTemplateStore(
+    max_size=settings.SQL_TEMPLATE_CACHE_SIZE,
+    ttl=settings.SQL_TEMPLATE_TTL,
+    min_support=settings.SQL_TEMPLATE_MIN_SUPPORT,
+    min_confidence=settings.SQL_TEMPLATE_MIN_CONFIDENCE
+)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -24,7 +49,10 @@ async def lifespan(app: FastAPI):
     Initializes resources on startup and closes the DB connection pool on shutdown.
     """
     logger.info("Starting up...")
+    await asyncio.to_thread(init_retriever)
+    await asyncio.to_thread(init_schema_catalog, db_instance)
     yield
+    close_schema_catalog()
     db_instance.close_pool()
     logger.info("Shutdown complete, connection pool closed.")
 
@@ -40,59 +68,132 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    """
+    Collects per-stage timings for each request and, when SERVER_TIMING is enabled,
+    reports them in a Server-Timing response header.
+    """
+    timings = start_request_timings()
+    with stage_timer("request"):
+        response = await call_next(request)
+    if settings.SERVER_TIMING and timings:
+        response.headers["Server-Timing"] = server_timing_header(timings)
+    return response
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Exposes pipeline stage latencies, pool utilization, LLM token counts and
+    cache hit ratios in the Prometheus text format.
+    """
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 # Define the expected structure of the incoming POST request
 class NlQueryRequest(BaseModel):
     user_query: str
     offset: int = 0
     limit: int = 10
+    pagination: str = "offset"     # "offset" (LIMIT/OFFSET) or "cursor" (keyset pagination)
+    cursor: str | None = None      # next_cursor token returned by the previous cursor-mode page
+    format: str = "rows"           # "rows" (list of objects), "columnar" or "arrow" (Arrow IPC stream)
+    timeout: float | None = None   # Time budget in seconds (defaults to REQUEST_TIMEOUT, capped at REQUEST_MAX_TIMEOUT)
+
+# Define the expected structure of a batch of queries
+class BatchQueryRequest(BaseModel):
+    items: list[NlQueryRequest]
+    stream: bool = False           # Stream per-item results as NDJSON in completion order
+
+# Define the expected structure of a streaming request
+class NlStreamRequest(BaseModel):
+    user_query: str
+    format: str = "ndjson"         # "ndjson" (one JSON object per line) or "csv"
+    timeout: float | None = None   # Time budget in seconds until streaming starts (defaults to REQUEST_TIMEOUT)
 
 # Set the maximum allowed rows to fetch per query
 MAX_LIMIT = 1000
 
-# List of SQL aggregate keywords used to detect queries where pagination should be avoided
-AGGREGATE_KEYWORDS = ["COUNT", "AVG", "SUM", "MIN", "MAX", "TOTAL", "UNION ALL"]
+# Response returned when a request runs out of its time budget
+DEADLINE_EXCEEDED_RESPONSE = {
+    "data_length": 0,
+    "data": [],
+    "response": "The request did not complete within its time budget.",
+    "status": "FAILED"
+}
 
-def format_sql_query(generated_sql: str, offset: int, limit: int) -> str:
+async def gather_or_cancel(*awaitables: Awaitable) -> list:
     """
-    Appends LIMIT and OFFSET clauses to the SQL query for pagination,
-    unless the query includes aggregate functions where pagination is not applicable.
+    Runs awaitables concurrently like asyncio.gather, but as soon as one fails the
+    others are cancelled (stopping their MySQL statements) before the error is raised,
+    so no sibling keeps holding a pooled connection for a response that is not sent.
     """
-    if any(keyword in generated_sql.upper() for keyword in AGGREGATE_KEYWORDS):
-        logger.debug("Aggregation detected, skipping pagination.")
-        return generated_sql
-    
-    logger.info(f"Applying pagination with LIMIT {limit} and OFFSET {offset}.")
-    return f"{generated_sql} LIMIT {limit} OFFSET {offset}"
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        return await asyncio.gather(*tasks)
+    except Exception:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
 
-@app.post("/data-requests")
-async def process_request(request: NlQueryRequest):
+async def run_until_disconnected(http_request: Request, work: Awaitable):
     """
-    Endpoint to process a natural language query.
-    Converts it to SQL, executes the query, and returns the data along with metadata.
+    Awaits the work while watching the client connection. If the client goes away,
+    the work is cancelled so its LLM call and MySQL statements stop holding capacity.
+
+    Returns:
+        The work's result, or None if the client disconnected.
     """
-    logger.info(f"Received request: {request.user_query[:50]}...")
-    user_query = request.user_query.strip()
-    requested_limit = min(request.limit, MAX_LIMIT)
+    task = asyncio.ensure_future(work)
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=settings.DISCONNECT_POLL_INTERVAL)
+        if done:
+            return task.result()
+        if await http_request.is_disconnected():
+            logger.info("Client disconnected, cancelling its request.")
+            task.cancel()
+            return None
 
-    logger.debug(f"User query: {user_query}")
-    logger.debug(f"Offset: {request.offset}, Limit: {requested_limit}")
+async def translate_query(user_query: str, use_templates: bool = True) -> tuple[str | None, TemplateMatch | None, dict | None]:
+    """
+    Screens a natural language query for forbidden keywords and converts it to SQL.
+    Shared by all data endpoints.
 
+    Args:
+        user_query (str): The natural language query.
+        use_templates (bool): Whether a learned SQL template may answer the query.
+
+    Returns:
+        tuple: (SQL, template match or None, None) on success, or (None, None, FAILED response)
+        otherwise. SQL from a template has `%s` placeholders for the match's parameters.
+    """
     # Check for any forbidden DML/DDL keywords in the query
-    if Contains_Forbidden_Keywords(user_query):
+    with stage_timer("keyword_check"):
+        forbidden = Contains_Forbidden_Keywords(user_query)
+    if forbidden:
         logger.warning("Query contains forbidden keywords (DML/DCL/DDL).")
-        return {
+        return None, None, {
                 "Data length": 0,
                 "data": [],
                 "response": "Your query contains restricted terms related to database modifications, which are not allowed.",
                 "status": "FAILED"
             }
-    
+
+    # Questions of a learned shape are answered from their template, without retrieval or the LLM
+    if use_templates and settings.SQL_TEMPLATES_ENABLED:
+        with stage_timer("template_match"):
+            template = sql_templates.match(user_query)
+        if template:
+            logger.info(f"Answered from SQL template for shape '{template.template.shape}'.")
+            return template.sql, template, None
+
     # Attempt to convert the NL query to SQL using the chat agent
     try:
-        generated_sql = await chat.nl_to_sql(user_query)
+        with stage_timer("translation"):
+            generated_sql = await chat.nl_to_sql(user_query)
         if not generated_sql:
             logger.warning("Failed to generate valid SQL for the given query.")
-            return {
+            return None, None, {
             "data_length": 0,
             "data": [],
             "response": "Failed to process input into valid SQL.",
@@ -100,29 +201,153 @@ async def process_request(request: NlQueryRequest):
         }
         
         logger.info(f"Generated SQL query: {generated_sql[:100]}...") 
+        return generated_sql, None, None
+    except DeadlineExceeded:
+        return None, None, DEADLINE_EXCEEDED_RESPONSE
     except Exception as e:
         logger.exception("Error in SQL generation.")
-        return {
+        return None, None, {
         "data_length": 0,
         "data": [],
         "response": "SQL generation failed due to resource exhaustion or other issues.",
         "status": "FAILED"
     }
 
+def arrow_response(result: dict) -> Response:
+    """
+    Returns a columnar result as an Arrow IPC stream, with the pagination metadata in headers.
+    """
+    try:
+        body = to_arrow_ipc(result["data"]["columns"], result["data"]["rows"])
+    except ImportError:
+        logger.error("Arrow output requested but pyarrow is not installed.")
+        return {
+        "data_length": 0,
+        "data": [],
+        "response": "Arrow output is not available on this server.",
+        "status": "FAILED"
+    }
+
+    headers = {"X-Data-Length": str(result["data_length"]), "X-Data-Length-Exact": str(result["data_length_exact"]).lower()}
+    if result.get("next_cursor"):
+        headers["X-Next-Cursor"] = result["next_cursor"]
+    return Response(body, media_type="application/vnd.apache.arrow.stream", headers=headers)
+
+@app.post("/data-requests")
+async def process_request(request: NlQueryRequest, http_request: Request):
+    """
+    Endpoint to process a natural language query.
+    Converts it to SQL, executes the query, and returns the data along with metadata.
+    Processing stops when the client disconnects or the request's time budget runs out.
+    """
+    result = await run_until_disconnected(http_request, execute_request(request))
+    if result is None:
+        return Response(status_code=499)
+    if result["status"] != "SUCCESS":
+        return result
+    if request.format == "arrow":
+        return arrow_response(result)
+    # Columnar results skip jsonable_encoder and are serialized by orjson directly
+    if request.format == "columnar":
+        return FastJSONResponse(result)
+    return result
+
+async def execute_request(request: NlQueryRequest, fallback: bool = False) -> dict:
+    """
+    Runs the full pipeline for one natural language query: forbidden-keyword check,
+    translation (or cursor decoding), paginated execution and total count.
+
+    Args:
+        request (NlQueryRequest): The request.
+        fallback (bool): Set when retrying after a failed template query; the retry
+            translates with the LLM and keeps the original deadline.
+
+    Returns:
+        dict: The response body; columnar data is left unencoded for orjson.
+    """
+    logger.info(f"Received request: {request.user_query[:50]}...")
+    user_query = request.user_query.strip()
+
+    # Every stage below (retrieval, LLM, EXPLAIN, page and count queries) honours this budget
+    if not fallback:
+        start_deadline(min(request.timeout or settings.REQUEST_TIMEOUT, settings.REQUEST_MAX_TIMEOUT))
+    requested_limit = min(request.limit, MAX_LIMIT)
+
+    logger.debug(f"User query: {user_query}")
+    logger.debug(f"Offset: {request.offset}, Limit: {requested_limit}")
+
+    # A cursor from a previous page carries the translated SQL, so the LLM is skipped
+    cursor_state = None
+    if request.cursor:
+        try:
+            cursor_state = decode_cursor(request.cursor)
+        except ValueError:
+            logger.warning("Rejected invalid pagination cursor.")
+            return {
+            "data_length": 0,
+            "data": [],
+            "response": "Invalid pagination cursor.",
+            "status": "FAILED"
+        }
+
+    template = None
+    if cursor_state:
+        generated_sql = cursor_state["sql"]
+    else:
+        generated_sql, template, failure = await translate_query(user_query, use_templates=not fallback)
+        if failure:
+            return failure
+    # Template SQL binds the question's values as parameters
+    generated_params = template.params if template else None
+
     # Execute the SQL query and fetch results
     try:
-        sql_query = format_sql_query(generated_sql, request.offset, requested_limit)
-        query_result = db_instance.Execute_Query(sql_query)
-
-        # Extract the table name to compute the total row count for pagination
-        if sql_query:
-            match = re.search(r'FROM\s+([a-zA-Z0-9_]+)', sql_query, re.IGNORECASE)
-            table_name = match.group(1)
-            logger.info(f"The count Table_name {table_name}")
-            count = db_instance.Execute_Query(f"SELECT COUNT(*) FROM {table_name}")
-            logger.info(f"count length{count}")
-            data_length = count[0]["COUNT(*)"]
-            logger.info(f"count length{data_length}")
+        # Review the query plan before anything runs; expensive queries are rejected here
+        with stage_timer("governor"):
+            decision = await governor.review(generated_sql, generated_params)
+        if decision.rejected:
+            return {
+            "data_length": 0,
+            "data": [],
+            "response": f"Query rejected as too expensive: {decision.reason}.",
+            "governor": decision.report(),
+            "status": "FAILED"
+        }
+
+        # Columnar results are built straight from the cursor tuples, without per-row dicts
+        columnar = request.format in ("columnar", "arrow")
+
+        # Pagination is planned on the parsed query: keyset pagination seeks past the previous
+        # page's last key instead of discarding OFFSET rows; otherwise LIMIT/OFFSET is pushed
+        # into the statement (and each UNION ALL branch), leaving only single-row aggregates as is
+        with stage_timer("sql_parse"):
+            keyset = keyset_plan(generated_sql) if (request.pagination == "cursor" or cursor_state) and not template else None
+            next_cursor = None
+            if keyset:
+                after = cursor_state["after"] if cursor_state else None
+                sql_query, params = keyset.page_query(after, requested_limit)
+            else:
+                sql_query = paginate_query(generated_sql, request.offset, requested_limit, parameterized=bool(template))
+                params = generated_params
+            sql_query = decision.apply(sql_query)
+
+        # Send the page query and the total-count query at the same time on separate pooled
+        # connections. Each statement takes its own connection only while it runs and never
+        # waits for a second one while holding the first, so with a single free connection
+        # the two simply run back to back instead of deadlocking. If one fails, the other is cancelled.
+        query_result, (data_length, count_exact) = await gather_or_cancel(
+            timed("data_query", db_instance.Execute_Query_Async(sql_query, params, columnar=columnar)),
+            timed("count_query", count_rows(generated_sql, decision, generated_params))
+        )
+        logger.info(f"Total row count {data_length} (exact: {count_exact})")
+
+        if keyset:
+            page = query_result["rows"] if columnar else query_result
+            if page and len(page) == requested_limit:
+                last_row = dict(zip(query_result["columns"], page[-1])) if columnar else page[-1]
+                after = keyset.next_after(last_row)
+                if after is not None:
+                    next_cursor = encode_cursor({"sql": generated_sql, "after": after})
 
         if not generated_sql:
             logger.warning(f"No data found for query: {sql_query}")
@@ -134,12 +359,30 @@ async def process_request(request: NlQueryRequest):
         }
         # Return success response with query results
         logger.info("Successfully fetched query results.")
-        return {
+        # SQL that ran successfully for a freshly translated question reinforces its shape's template
+        if settings.SQL_TEMPLATES_ENABLED and not template and not cursor_state:
+            sql_templates.learn(user_query, generated_sql)
+        with stage_timer("serialization"):
+            data = query_result if columnar else jsonable_encoder(query_result)
+        response = {
         "data_length": data_length,
-        "data": jsonable_encoder(query_result),
+        "data_length_exact": count_exact,
+        "data": data,
+        "governor": decision.report(),
         "status": "SUCCESS"
     }
+        if request.pagination == "cursor" or cursor_state:
+            response["pagination"] = "cursor" if keyset else "offset"
+            response["next_cursor"] = next_cursor
+        return response
+    except DeadlineExceeded:
+        logger.warning("Request deadline exceeded while executing the query.")
+        return DEADLINE_EXCEEDED_RESPONSE
     except Exception as e:
+       if template:
+           # A failing template loses confidence and the question is translated by the LLM instead
+           sql_templates.report_failure(template)
+           return await execute_request(request, fallback=True)
        logger.exception("Error executing the MySQL query.")
        return {
         "data_length": 0,
@@ -148,6 +391,232 @@ async def process_request(request: NlQueryRequest):
         "status": "FAILED"
     }
 
+async def count_rows(generated_sql: str, decision: GovernorDecision, params=None) -> tuple[int, bool]:
+    """
+    Returns the total row count for a governed query. For queries the governor marked estimate_count,
+    counting would examine as many rows as the query itself, so the plan estimate is used.
+    A count query that fails also falls back to the plan estimate (None without one),
+    reported as inexact, so the page is still returned.
+    """
+    if decision.action == "estimate_count":
+        return decision.estimated_result_rows, False
+    try:
+        return await row_counter.count(generated_sql, params, max_execution_ms=decision.max_execution_ms)
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        logger.warning(f"Count query failed, reporting the plan estimate instead: {e}")
+        return decision.estimated_result_rows, False
+
+@app.post("/data-requests/batch")
+async def process_batch_request(request: BatchQueryRequest, http_request: Request):
+    """
+    Endpoint to process many natural language queries in one call.
+
+    Questions that will need an embedding are embedded with one batched call up front,
+    then each item runs the same pipeline as /data-requests (keyword check, caches,
+    translation, execution) with at most BATCH_MAX_PARALLELISM items in flight. Returns per-item results and statuses,
+    or streams them as NDJSON as they complete when `stream` is set.
+    """
+    logger.info(f"Received batch request with {len(request.items)} items.")
+    if len(request.items) > settings.BATCH_MAX_ITEMS:
+        return {
+        "results": [],
+        "response": f"A batch may contain at most {settings.BATCH_MAX_ITEMS} items.",
+        "status": "FAILED"
+    }
+
+    # Warm the embedding cache with one batched call for the admissible questions that will
+    # need an embedding: not those a learned template answers or the schema catalog matches
+    queries = [item.user_query.strip() for item in request.items if not item.cursor]
+    queries = [
+        query for query in queries
+        if query and not Contains_Forbidden_Keywords(query)
+        and not (settings.SQL_TEMPLATES_ENABLED and sql_templates.match(query, count=False))
+        and not matches_lexically(query)
+    ]
+    if queries:
+        try:
+            await get_retriever().aembed_queries(queries)
+        except Exception:
+            logger.exception("Batched embedding failed, falling back to per-item embedding.")
+
+    semaphore = asyncio.Semaphore(settings.BATCH_MAX_PARALLELISM)
+
+    async def run_item(index: int, item: NlQueryRequest) -> dict:
+        async with semaphore:
+            try:
+                result = await execute_request(item)
+            except Exception:
+                logger.exception(f"Batch item {index} failed.")
+                result = {
+                "data_length": 0,
+                "data": [],
+                "response": "Unexpected error while processing the query.",
+                "status": "FAILED"
+            }
+        return {"index": index, **result}
+
+    tasks = [asyncio.ensure_future(run_item(i, item)) for i, item in enumerate(request.items)]
+
+    if request.stream:
+        async def stream_results():
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield json_dumps(await next_done) + b"\n"
+            finally:
+                for task in tasks:
+                    task.cancel()
+        return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+    results = await run_until_disconnected(http_request, asyncio.gather(*tasks))
+    if results is None:
+        return Response(status_code=499)
+    succeeded = sum(result["status"] == "SUCCESS" for result in results)
+    logger.info(f"Batch completed: {succeeded}/{len(results)} items succeeded.")
+    return FastJSONResponse({
+        "results": results,
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "status": "SUCCESS"
+    })
+
+def close_stream(fetch: concurrent.futures.Future | None, batches) -> None:
+    """
+    Closes a Stream_Query generator, returning its connection to the pool, once its
+    last batch fetch has finished: a generator cannot be closed while it is executing.
+    """
+    if fetch is not None:
+        concurrent.futures.wait([fetch])
+    batches.close()
+
+async def stream_rows(batches, columns: list[str], output_format: str):
+    """
+    Pulls row batches from a Stream_Query generator on the MySQL executor and
+    encodes them as NDJSON or CSV. A new batch is fetched only after the previous
+    chunk has been sent, so a slow client applies backpressure to the cursor.
+
+    The status line has been sent by the time rows are read, so a failure mid-stream
+    cannot change it: an NDJSON stream ends with an `{"error": ...}` record, and a CSV
+    stream, which has no room for one, is aborted so the client sees the transfer fail.
+    """
+    loop = asyncio.get_running_loop()
+    fetch = None
+    try:
+        if output_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            yield buffer.getvalue()
+
+        while True:
+            fetch = db_instance.executor.submit(next, batches, None)
+            rows = await asyncio.wrap_future(fetch)
+            if rows is None:
+                break
+
+            if output_format == "csv":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(rows)
+                yield buffer.getvalue()
+            else:
+                yield b"".join(json_dumps(dict(zip(columns, row))) + b"\n" for row in rows)
+    except Exception:
+        logger.exception("Error while streaming query results.")
+        if output_format == "csv":
+            raise
+        yield json_dumps({"error": "Error while streaming query results.", "status": "FAILED"}) + b"\n"
+    finally:
+        # A client that disconnects mid-fetch cancels this generator while the fetch still
+        # runs on a worker; the close waits for it, shielded so it always completes
+        await asyncio.shield(loop.run_in_executor(db_instance.executor, close_stream, fetch, batches))
+
+@app.post("/data-requests/stream")
+async def process_stream_request(request: NlStreamRequest, http_request: Request):
+    """
+    Endpoint to process a natural language query and stream its full result set.
+    Rows are read from an unbuffered server-side cursor and sent as NDJSON or CSV
+    while they are fetched, up to STREAM_MAX_ROWS, with flat memory use.
+    Until streaming starts, processing stops when the client disconnects or the
+    request's time budget runs out.
+    """
+    logger.info(f"Received stream request: {request.user_query[:50]}...")
+    opened = await run_until_disconnected(http_request, open_stream(request))
+    if opened is None:
+        return Response(status_code=499)
+    if isinstance(opened, dict):
+        return opened
+
+    batches, columns = opened
+    media_type = "text/csv" if request.format == "csv" else "application/x-ndjson"
+    return StreamingResponse(stream_rows(batches, columns, request.format), media_type=media_type)
+
+async def open_stream(request: NlStreamRequest) -> tuple | dict:
+    """
+    Runs the stages before a stream starts (keyword check, translation, governor review,
+    query execution up to its column names) within the request's time budget.
+
+    Returns:
+        tuple | dict: The Stream_Query generator and the column names, or a FAILED response.
+    """
+    user_query = request.user_query.strip()
+
+    # Translation, EXPLAIN and the first fetch honour this budget; the stream itself is
+    # paced by the client and stopped by closing the generator
+    start_deadline(min(request.timeout or settings.REQUEST_TIMEOUT, settings.REQUEST_MAX_TIMEOUT))
+
+    generated_sql, template, failure = await translate_query(user_query)
+    if failure:
+        return failure
+    params = template.params if template else None
+
+    # Streams are reviewed too, but get no execution time hint: the statement
+    # stays open while a slow client reads, which must not count as runaway work
+    try:
+        with stage_timer("governor"):
+            decision = await governor.review(generated_sql, params)
+    except DeadlineExceeded:
+        return DEADLINE_EXCEEDED_RESPONSE
+    if decision.rejected:
+        return {
+        "data_length": 0,
+        "data": [],
+        "response": f"Query rejected as too expensive: {decision.reason}.",
+        "governor": decision.report(),
+        "status": "FAILED"
+    }
+
+    # Execute the SQL query and read the column names before committing to a streamed response
+    loop = asyncio.get_running_loop()
+    running = RunningQuery()
+    fetch = None
+    try:
+        sql_query = paginate_query(generated_sql, 0, settings.STREAM_MAX_ROWS, parameterized=bool(template))
+        batches = db_instance.Stream_Query(sql_query, params, batch_size=settings.STREAM_BATCH_SIZE, running=running)
+        fetch = db_instance.executor.submit(next, batches)
+        columns = await bounded(asyncio.wrap_future(fetch))
+    except (asyncio.CancelledError, DeadlineExceeded) as e:
+        # The client left or the budget ran out: stop the statement and return its connection
+        # once the fetch has ended, without holding up the response. Killing may need a fresh
+        # connection, so it must not wait behind the MySQL executor
+        loop.run_in_executor(None, db_instance.kill_query, running)
+        loop.run_in_executor(db_instance.executor, close_stream, fetch, batches)
+        if isinstance(e, asyncio.CancelledError):
+            raise
+        logger.warning("Request deadline exceeded before the stream started.")
+        return DEADLINE_EXCEEDED_RESPONSE
+    except Exception as e:
+        if template:
+            sql_templates.report_failure(template)
+        logger.exception("Error executing the MySQL query.")
+        return {
+        "data_length": 0,
+        "data": [],
+        "response": "Error executing the MySQL query.",
+        "status": "FAILED"
+    }
+    return batches, columns
+
 if __name__ == "__main__":
     # Start FastAPI application using Uvicorn as the ASGI server
     logger.info("Starting FastAPI server on 0.0.0.0:8000")
@@ -0,0 +1,402 @@
+import asyncio
+import datetime
+import glob
+import hashlib
+import itertools
+import math
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from typing import Any
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+# Directory holding the schema descriptions indexed by the fake vector index
+SCHEMA_TEXT_DIR = os.path.join(os.path.dirname(__file__), "..", "services", "configuration", "schema_text")
+
+class Latency:
+    """
+    Simulated latency of a remote dependency: a fixed mean with uniform jitter.
+    """
+    def __init__(self, mean_ms: float, jitter: float = 0.2, seed: int = 0):
+        self.mean_ms = mean_ms
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def seconds(self) -> float:
+        with self._lock:
+            factor = 1 + self._random.uniform(-self.jitter, self.jitter)
+        return max(self.mean_ms * factor, 0) / 1000
+
+    def sleep(self) -> None:
+        time.sleep(self.seconds())
+
+    async def asleep(self) -> None:
+        await asyncio.sleep(self.seconds())
+
+def question_to_sql(question: str) -> str:
+    """
+    Deterministically maps a benchmark question to the SQL a well-behaved model would produce.
+    """
+    q = question.lower()
+    status = re.search(r"status (\w+)", q)
+    customer = re.search(r"customer (\w+)", q)
+
+    if any(word in q for word in ("delete", "drop", "update")):
+        return "ERROR"
+    if "count" in q and "task" in q:
+        return "SELECT TASK_STATUS, COUNT(*) AS TASK_COUNT FROM POINT_TASK GROUP BY TASK_STATUS"
+    if "task" in q and "order" in q:
+        return ("SELECT * FROM POINT_TASK INNER JOIN POINT_ORDER "
+                "ON POINT_TASK.ORDER_ID = POINT_ORDER.ORDER_ID")
+    if "task" in q:
+        sql = "SELECT * FROM POINT_TASK"
+        if status:
+            sql += f" WHERE TASK_STATUS = '{status.group(1).upper()}'"
+        return sql + (" ORDER BY CREATED_DATE DESC" if "latest" in q else "")
+    sql = "SELECT * FROM POINT_ORDER"
+    if customer:
+        sql += f" WHERE CUSTOMER_NAME = '{customer.group(1).capitalize()}'"
+    elif status:
+        sql += f" WHERE ORDER_STATUS = '{status.group(1).upper()}'"
+    return sql
+
+class FakeChatModel(BaseChatModel):
+    """
+    Stand-in for ChatGoogleGenerativeAI that answers with deterministic SQL after a simulated delay.
+    """
+    latency_ms: float = 800.0
+    jitter: float = 0.2
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-gemini"
+
+    def _respond(self, messages) -> ChatResult:
+        prompt = messages[-1].content
+        question = prompt.rsplit("Natural Language Query:", 1)[-1].strip()
+        sql = question_to_sql(question)
+        message = AIMessage(
+            content=sql,
+            usage_metadata={
+                "input_tokens": len(prompt) // 4,
+                "output_tokens": len(sql) // 4,
+                "total_tokens": (len(prompt) + len(sql)) // 4,
+            }
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        Latency(self.latency_ms, self.jitter).sleep()
+        return self._respond(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        await Latency(self.latency_ms, self.jitter).asleep()
+        return self._respond(messages)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        """
+        Streams the answer a few characters per chunk: a third of the latency passes
+        before the first chunk, the rest is spread over the chunks, and the token
+        usage arrives with the last one, as with Gemini.
+        """
+        message = self._respond(messages).generations[0].message
+        pieces = [message.content[start:start + 8] for start in range(0, len(message.content), 8)] or [""]
+        seconds = Latency(self.latency_ms, self.jitter).seconds()
+        await asyncio.sleep(seconds / 3)
+        for number, piece in enumerate(pieces):
+            await asyncio.sleep(seconds * 2 / 3 / len(pieces))
+            last = number == len(pieces) - 1
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content=piece, usage_metadata=message.usage_metadata if last else None
+            ))
+
+class FakeEmbeddings(Embeddings):
+    """
+    Stand-in for GoogleGenerativeAIEmbeddings: hashed bag-of-words vectors, so similar
+    wording gives similar vectors, returned after a simulated delay.
+    """
+    dimension = 256
+
+    def __init__(self, latency: Latency | None = None, **kwargs):
+        self.latency = latency or Latency(0)
+
+    def _vector(self, text: str) -> list[float]:
+        vector = [0.0] * self.dimension
+        for word in re.findall(r"[a-z0-9]+", text.lower()):
+            word = word.rstrip("s") or word
+            digest = hashlib.md5(word.encode("utf-8")).digest()
+            vector[int.from_bytes(digest[:4], "little") % self.dimension] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_query(self, text: str) -> list[float]:
+        self.latency.sleep()
+        return self._vector(text)
+
+    def embed_documents(self, texts: list[str], *args, **kwargs) -> list[list[float]]:
+        self.latency.sleep()
+        return [self._vector(text) for text in texts]
+
+class FakeIndex:
+    """
+    Stand-in for a Pinecone index holding the schema text files, one chunk per table.
+    """
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        embedder = FakeEmbeddings()
+        self.chunks = []
+        for path in sorted(glob.glob(os.path.join(SCHEMA_TEXT_DIR, "*.txt"))):
+            with open(path, encoding="utf-8") as schema_file:
+                text = schema_file.read()
+            self.chunks.append((embedder._vector(text), text))
+
+    def describe_index_stats(self) -> dict:
+        return {"dimension": FakeEmbeddings.dimension, "total_vector_count": len(self.chunks)}
+
+    def query(self, vector, top_k: int = 4, include_metadata: bool = True) -> dict:
+        self.latency.sleep()
+        scored = sorted(
+            ((sum(a * b for a, b in zip(vector, chunk_vector)), text) for chunk_vector, text in self.chunks),
+            reverse=True
+        )[:top_k]
+        return {"matches": [{"score": score, "metadata": {"text": text}} for score, text in scored]}
+
+class FakePinecone:
+    """
+    Stand-in for the Pinecone client.
+    """
+    index_latency = Latency(0)
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def Index(self, name: str) -> FakeIndex:
+        return FakeIndex(FakePinecone.index_latency)
+
+# ---------------------------------------------------------------------------
+# Local database stand-in: a shared in-memory SQLite database behind a
+# mysql-connector-like connection/cursor interface.
+# ---------------------------------------------------------------------------
+
+DATABASE_URI = "file:nl2sql_bench?mode=memory&cache=shared"
+DATABASE_NAME = "nl2sql_bench"
+
+def seed_database(orders: int, tasks_per_order: int, seed: int = 7) -> sqlite3.Connection:
+    """
+    Creates POINT_ORDER and POINT_TASK in the shared in-memory database and fills them
+    with synthetic rows. The returned connection must stay open to keep the data alive.
+    """
+    rng = random.Random(seed)
+    keeper = sqlite3.connect(DATABASE_URI, uri=True, check_same_thread=False)
+    keeper.executescript("""
+        DROP TABLE IF EXISTS POINT_ORDER;
+        DROP TABLE IF EXISTS POINT_TASK;
+        CREATE TABLE POINT_ORDER (
+            ID INTEGER PRIMARY KEY, ORDER_ID INTEGER, ORDER_NAME TEXT, CUSTOMER_NAME TEXT,
+            CUSTOMER_SEGMENT TEXT, ORDER_TYPE TEXT, ORDER_STATUS TEXT, ORDER_STATE TEXT,
+            REGION TEXT, SERVICE_TYPE TEXT, ORDER_BANDWIDTH TEXT, ORDER_RECEIVED_DATE TEXT
+        );
+        CREATE TABLE POINT_TASK (
+            TASK_ID INTEGER PRIMARY KEY, ORDER_ID INTEGER REFERENCES POINT_ORDER (ORDER_ID), TASK_NAME TEXT, TASK_TYPE TEXT,
+            TASK_STATUS TEXT, TASK_STATE TEXT, CUSTOMER_SEGMENT TEXT, DOMAIN TEXT,
+            OWNER TEXT, CREATED_DATE TEXT, COMPLETED_DATE TEXT
+        );
+        CREATE INDEX POINT_TASK_ORDER_ID ON POINT_TASK (ORDER_ID);
+        CREATE INDEX POINT_TASK_CREATED_DATE ON POINT_TASK (CREATED_DATE);
+    """)
+
+    customers = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka"]
+    start = datetime.datetime(2025, 1, 1)
+    order_rows, task_rows = [], []
+    task_id = 170000
+    for i in range(orders):
+        received = start + datetime.timedelta(minutes=rng.randint(0, 500000))
+        order_rows.append((
+            i + 1, 900 + i, f"ORD-{900 + i}", rng.choice(customers), rng.choice(["INTERNAL", "ENTERPRISE", "SMB"]),
+            rng.choice(["INTERNAL", "CUSTOMER"]), rng.choice(["OPEN", "CLOSED", "CANCELLED"]),
+            rng.choice(["ACTIVATED", "PENDING"]), rng.choice(["EMEA", "APAC", "AMER"]),
+            rng.choice(["MPLS", "INTERNET", "ETHERNET"]), rng.choice(["100Mbps", "1Gbps", "10Gbps"]),
+            received.isoformat(sep=" ")
+        ))
+        for _ in range(tasks_per_order):
+            task_id += 1
+            created = received + datetime.timedelta(minutes=rng.randint(1, 600))
+            task_rows.append((
+                task_id, 900 + i, rng.choice(["ProvTask-RES-REQD", "Activate", "Design"]), "Task",
+                rng.choice(["OPEN", "CLOSED", "FAILED"]), rng.choice(["ACTIVATED", "PENDING"]),
+                rng.choice(["INTERNAL", "ENTERPRISE"]), rng.choice(["ip", "optical"]),
+                rng.choice(["ops", "noc", "design"]), created.isoformat(sep=" "),
+                (created + datetime.timedelta(seconds=rng.randint(1, 9000))).isoformat(sep=" ")
+            ))
+
+    keeper.executemany(f"INSERT INTO POINT_ORDER VALUES ({', '.join('?' * 12)})", order_rows)
+    keeper.executemany(f"INSERT INTO POINT_TASK VALUES ({', '.join('?' * 11)})", task_rows)
+    keeper.commit()
+    return keeper
+
+# Columns of MySQL's tabular EXPLAIN that the query governor reads
+EXPLAIN_COLUMNS = ("id", "table", "type", "key", "ref", "rows", "filtered", "Extra")
+
+class FakeCursor:
+    """
+    mysql-connector-like cursor over SQLite, translating `%s` placeholders and
+    answering MySQL-style EXPLAIN from SQLite's query plan.
+    """
+    def __init__(self, connection: "FakeConnection"):
+        self._connection = connection
+        self._cursor = None
+        self._explain_rows = None
+
+    @property
+    def cursor(self) -> sqlite3.Cursor:
+        # Opened on first use, so a KILL QUERY side connection never touches SQLite
+        if self._cursor is None:
+            self._cursor = self._connection.sqlite.cursor()
+        return self._cursor
+
+    @property
+    def description(self):
+        if self._explain_rows is not None:
+            return [(column,) for column in EXPLAIN_COLUMNS]
+        return self.cursor.description
+
+    def execute(self, sql_query: str, params=()):
+        self._connection.latency.sleep()
+        if params:
+            sql_query = sql_query.replace("%s", "?").replace("%%", "%")
+        self._explain_rows = None
+        kill = re.match(r"KILL QUERY (\d+)", sql_query)
+        if kill:
+            # Interrupt the statement running on the target connection, like MySQL's KILL QUERY
+            FakeConnection.open_connections[int(kill.group(1))].sqlite.interrupt()
+            return
+        if sql_query.upper().startswith("EXPLAIN "):
+            self._explain_rows = self._explain(sql_query[len("EXPLAIN "):], params)
+            return
+        self.cursor.execute(sql_query, tuple(params))
+
+    def _explain(self, sql_query: str, params) -> list[tuple]:
+        """
+        Maps SQLite's EXPLAIN QUERY PLAN to MySQL's tabular EXPLAIN: a SCAN becomes a
+        full scan (type ALL) of the whole table, a SEARCH an index lookup of a few rows.
+        """
+        plan = self.cursor.execute(f"EXPLAIN QUERY PLAN {sql_query}", tuple(params)).fetchall()
+        rows = []
+        for _, _, _, detail in plan:
+            match = re.match(r"(SCAN|SEARCH) (\w+)", detail)
+            if not match:
+                continue
+            access, table = match.groups()
+            if access == "SCAN":
+                table_rows = self._connection.sqlite.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                rows.append((1, table, "ALL", None, None, table_rows, 100.0, "Using where"))
+            else:
+                rows.append((1, table, "ref", "idx", "const", 5, 100.0, None))
+        return rows
+
+    def fetchall(self):
+        if self._explain_rows is not None:
+            return self._explain_rows
+        return self.cursor.fetchall()
+
+    def fetchmany(self, size: int):
+        return self.cursor.fetchmany(size)
+
+    def close(self):
+        if self._cursor is not None:
+            self._cursor.close()
+
+def attach_information_schema(connection: sqlite3.Connection) -> None:
+    """
+    Attaches an `information_schema` database describing the seeded tables, with the
+    TABLES, COLUMNS and KEY_COLUMN_USAGE columns the services read, and a DATABASE()
+    function, so MySQL introspection queries run unchanged.
+    """
+    connection.create_function("DATABASE", 0, lambda: DATABASE_NAME)
+    connection.execute("ATTACH DATABASE ':memory:' AS information_schema")
+    connection.executescript("""
+        CREATE TABLE information_schema.TABLES (
+            TABLE_SCHEMA TEXT, TABLE_NAME TEXT, TABLE_TYPE TEXT, TABLE_ROWS INTEGER, TABLE_COMMENT TEXT
+        );
+        CREATE TABLE information_schema.COLUMNS (
+            TABLE_SCHEMA TEXT, TABLE_NAME TEXT, COLUMN_NAME TEXT, ORDINAL_POSITION INTEGER,
+            COLUMN_TYPE TEXT, COLUMN_KEY TEXT, COLUMN_COMMENT TEXT
+        );
+        CREATE TABLE information_schema.KEY_COLUMN_USAGE (
+            TABLE_SCHEMA TEXT, TABLE_NAME TEXT, COLUMN_NAME TEXT,
+            REFERENCED_TABLE_NAME TEXT, REFERENCED_COLUMN_NAME TEXT
+        );
+    """)
+    tables = [name for (name,) in connection.execute(
+        "SELECT name FROM main.sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    )]
+    for table in tables:
+        table_rows = connection.execute(f"SELECT COUNT(*) FROM main.{table}").fetchone()[0]
+        connection.execute("INSERT INTO information_schema.TABLES VALUES (?, ?, 'BASE TABLE', ?, '')",
+                           (DATABASE_NAME, table, table_rows))
+        for cid, name, column_type, _, _, pk in connection.execute(f"PRAGMA main.table_info({table})"):
+            connection.execute("INSERT INTO information_schema.COLUMNS VALUES (?, ?, ?, ?, ?, ?, '')",
+                               (DATABASE_NAME, table, name, cid + 1, column_type.lower(), "PRI" if pk else ""))
+        for foreign_key in connection.execute(f"PRAGMA main.foreign_key_list({table})").fetchall():
+            connection.execute("INSERT INTO information_schema.KEY_COLUMN_USAGE VALUES (?, ?, ?, ?, ?)",
+                               (DATABASE_NAME, table, foreign_key[3], foreign_key[2], foreign_key[4]))
+
+class FakeConnection:
+    """
+    mysql-connector-like connection to the shared in-memory SQLite database.
+    """
+    # Open connections by connection id, for KILL QUERY
+    open_connections: dict[int, "FakeConnection"] = {}
+    _ids = itertools.count(1)
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self._sqlite = None
+        self.connection_id = next(FakeConnection._ids)
+        FakeConnection.open_connections[self.connection_id] = self
+        self._connected = True
+
+    @property
+    def sqlite(self) -> sqlite3.Connection:
+        if self._sqlite is None:
+            self._sqlite = sqlite3.connect(DATABASE_URI, uri=True, check_same_thread=False)
+            attach_information_schema(self._sqlite)
+        return self._sqlite
+
+    def cursor(self, *args, **kwargs) -> FakeCursor:
+        return FakeCursor(self)
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def ping(self, reconnect: bool = False, attempts: int = 1, delay: int = 0):
+        if not self._connected:
+            raise sqlite3.OperationalError("Not connected.")
+
+    def reset_session(self, *args, **kwargs):
+        pass
+
+    def disconnect(self):
+        self._connected = False
+        FakeConnection.open_connections.pop(self.connection_id, None)
+        if self._sqlite is not None:
+            self._sqlite.close()
+
+    close = disconnect
+
+class FakeMySQL:
+    """
+    Stand-in for `mysql.connector.connect`, opening FakeConnections with a shared latency.
+    """
+    latency = Latency(0)
+
+    @staticmethod
+    def connect(**kwargs) -> FakeConnection:
+        return FakeConnection(FakeMySQL.latency)
@@ -0,0 +1,117 @@
+"""
+Equivalence check and micro-benchmark for the forbidden-keyword matcher.
+
+Compares `Find_Forbidden_Keyword` (one combined pattern) against the previous
+implementation, one `\\bkeyword\\b` pattern per keyword, over a generated corpus of
+benign questions, every keyword in several casings and at word boundaries, near
+misses and random mixes of keyword and ordinary words. Any differing verdict is
+reported and fails the run; then both matchers are timed on the same corpus.
+
+Usage (from the `src` directory):
+
+    python -m benchmarks.keywords
+    python -m benchmarks.keywords --samples 20000 --repeat 5
+"""
+import argparse
+import logging
+import random
+import re
+import sys
+import time
+
+# Ordinary words used to build benign questions and to surround keywords
+BENIGN_WORDS = [
+    "show", "list", "all", "orders", "tasks", "for", "customer", "with", "status", "open",
+    "closed", "latest", "count", "by", "the", "of", "total", "amount", "per", "month",
+    "between", "and", "last", "week", "average", "which", "have", "no", "table", "column",
+    "index", "row", "schema", "addition", "address", "altered", "updates", "drops", "created",
+]
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Forbidden-keyword matcher equivalence check and benchmark.")
+    parser.add_argument("--samples", type=int, default=5000, help="Random mixed queries added to the corpus.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes over the corpus per matcher.")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the generated corpus.")
+    return parser.parse_args(argv)
+
+def build_corpus(keywords: set[str], samples: int, seed: int) -> list[str]:
+    """
+    Builds queries exercising matches, non-matches and word-boundary edge cases.
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for keyword in sorted(keywords):
+        corpus += [
+            keyword,
+            keyword.upper(),
+            keyword.title(),
+            f"please {keyword} now",
+            f"x{keyword}",            # no boundary before
+            f"{keyword}x",            # no boundary after
+            f"re-{keyword}",          # hyphen is a boundary
+            f"({keyword}).",
+            keyword.replace(" ", "  "),  # multi-word keywords need single spaces
+            keyword[:-1],             # truncated
+        ]
+    for _ in range(samples):
+        words = [rng.choice(BENIGN_WORDS) for _ in range(rng.randint(3, 15))]
+        if rng.random() < 0.3:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(sorted(keywords)))
+        corpus.append(" ".join(words))
+    return corpus
+
+def time_matcher(matcher, corpus: list[str], repeat: int) -> float:
+    """
+    Returns the best per-query time in microseconds over `repeat` passes.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for query in corpus:
+            matcher(query)
+        best = min(best, time.perf_counter() - start)
+    return best / len(corpus) * 1e6
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    from services.configuration.keywords import forbidden_keywords, Find_Forbidden_Keyword
+
+    # The previous implementation: one pattern, and one scan of the query, per keyword
+    reference_patterns = [
+        re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE) for keyword in forbidden_keywords
+    ]
+
+    def reference(query: str) -> bool:
+        query = query.strip()
+        return any(pattern.search(query) for pattern in reference_patterns)
+
+    corpus = build_corpus(forbidden_keywords, args.samples, args.seed)
+
+    mismatches = []
+    for query in corpus:
+        expected = reference(query)
+        keyword = Find_Forbidden_Keyword(query)
+        if expected != (keyword is not None) or (keyword is not None and keyword not in forbidden_keywords):
+            mismatches.append((query, expected, keyword))
+
+    flagged = sum(reference(query) for query in corpus)
+    print(f"{len(corpus)} queries, {flagged} flagged, {len(forbidden_keywords)} keywords")
+    for query, expected, keyword in mismatches[:20]:
+        print(f"MISMATCH: {query!r}: per-keyword patterns={expected}, single pass={keyword!r}")
+    if mismatches:
+        print(f"{len(mismatches)} differing verdicts.")
+        return 1
+    print("Verdicts identical.")
+
+    per_keyword = time_matcher(reference, corpus, args.repeat)
+    single_pass = time_matcher(Find_Forbidden_Keyword, corpus, args.repeat)
+    print(f"\n{'matcher':<24}{'us/query':>10}")
+    print(f"{'per-keyword patterns':<24}{per_keyword:>10.2f}")
+    print(f"{'single pass':<24}{single_pass:>10.2f}")
+    print(f"speedup: {per_keyword / single_pass:.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""
+Offline load test for the /data-requests pipeline.
+
+Gemini, the Gemini embeddings, Pinecone and MySQL are replaced with the deterministic
+stand-ins from `benchmarks.fakes`, each with a configurable latency, so the whole
+request path runs without credentials. Requests are driven through the ASGI app at a
+fixed concurrency; per-stage latencies are read from the Server-Timing header.
+
+Usage (from the `src` directory):
+
+    python -m benchmarks.run                      # run and compare against baseline.json
+    python -m benchmarks.run --update-baseline    # run and store the result as the new baseline
+    python -m benchmarks.run --concurrency 64 --requests 1000 --llm-latency 1200
+
+Exits with status 1 when throughput or a stage's p95 regresses beyond the tolerance.
+The timings are wall-clock numbers, so a run is only compared with a baseline recorded
+on the same kind of host (CPU count, architecture, processor and Python version);
+otherwise the comparison is skipped unless `--any-host` is given.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import random
+import sys
+import time
+
+# Directory of this harness, holding the stored baseline
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE_PATH = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+# Stages whose p95 is compared against the baseline (others are reported only)
+COMPARED_STAGES = ("request", "translation", "data_query", "count_query")
+
+# Differences below this many milliseconds are treated as noise when comparing
+NOISE_FLOOR_MS = 5.0
+
+# Question templates for the synthetic workload; placeholders are filled per question
+QUESTION_TEMPLATES = [
+    "Show all orders for customer {customer}",
+    "List orders with status {order_status}",
+    "Show tasks with status {task_status}",
+    "Show the latest tasks with status {task_status}",
+    "Count tasks by status",
+    "Show tasks together with their orders",
+    "Show all orders",
+]
+CUSTOMERS = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka"]
+ORDER_STATUSES = ["OPEN", "CLOSED", "CANCELLED"]
+TASK_STATUSES = ["OPEN", "CLOSED", "FAILED"]
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline load test for /data-requests.")
+    parser.add_argument("--requests", type=int, default=400, help="Total number of requests to send.")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight at once.")
+    parser.add_argument("--distinct", type=int, default=40, help="Number of distinct questions in the workload.")
+    parser.add_argument("--limit", type=int, default=10, help="Page size requested.")
+    parser.add_argument("--llm-latency", type=float, default=800.0, help="Mean fake Gemini latency (ms).")
+    parser.add_argument("--embedding-latency", type=float, default=80.0, help="Mean fake embedding latency (ms).")
+    parser.add_argument("--vector-latency", type=float, default=30.0, help="Mean fake Pinecone query latency (ms).")
+    parser.add_argument("--db-latency", type=float, default=5.0, help="Mean fake MySQL round-trip latency (ms).")
+    parser.add_argument("--orders", type=int, default=5000, help="Synthetic POINT_ORDER rows.")
+    parser.add_argument("--tasks-per-order", type=int, default=4, help="Synthetic POINT_TASK rows per order.")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the workload and fake latencies.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="Path of the stored baseline.")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline.")
+    parser.add_argument("--any-host", action="store_true", help="Compare even with a baseline recorded on another host.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%).")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    parser.add_argument("--verbose", action="store_true", help="Keep the services' INFO logging.")
+    return parser.parse_args(argv)
+
+def install_fakes(args: argparse.Namespace):
+    """
+    Seeds the local database, patches the external clients with the fakes and imports the app.
+    Must run before anything imports `app`, since the app builds its services at import time.
+    """
+    from benchmarks import fakes
+    from services.configuration.config import settings
+
+    settings.SERVER_TIMING = True
+    settings.RETRIEVAL_BACKEND = "pinecone"
+
+    import services.chat_agent as chat_agent
+    import services.mysql_executer as mysql_executer
+    import services.retriever as retriever
+
+    class FakeChat(fakes.FakeChatModel):
+        latency_ms: float = args.llm_latency
+
+    class FakeEmbeddings(fakes.FakeEmbeddings):
+        def __init__(self, **kwargs):
+            super().__init__(latency=fakes.Latency(args.embedding_latency, seed=args.seed))
+
+    fakes.FakePinecone.index_latency = fakes.Latency(args.vector_latency, seed=args.seed)
+    fakes.FakeMySQL.latency = fakes.Latency(args.db_latency, seed=args.seed)
+
+    chat_agent.ChatGoogleGenerativeAI = FakeChat
+    retriever.GoogleGenerativeAIEmbeddings = FakeEmbeddings
+    retriever.Pinecone = fakes.FakePinecone
+    mysql_executer.connect = fakes.FakeMySQL.connect
+
+    keeper = fakes.seed_database(args.orders, args.tasks_per_order, seed=args.seed)
+
+    import app
+    return app.app, keeper
+
+def build_workload(args: argparse.Namespace) -> list[tuple[str, int]]:
+    """
+    Builds the request sequence: `--distinct` questions sampled with repetition,
+    so caches and coalescing see a realistic mix of repeated and new questions.
+    """
+    rng = random.Random(args.seed)
+    questions = []
+    while len(questions) < args.distinct:
+        question = rng.choice(QUESTION_TEMPLATES).format(
+            customer=rng.choice(CUSTOMERS),
+            order_status=rng.choice(ORDER_STATUSES),
+            task_status=rng.choice(TASK_STATUSES),
+        )
+        # Vary page offsets so distinct questions do not collapse onto the same SQL
+        questions.append((question, rng.randrange(0, 5) * args.limit))
+    return [rng.choice(questions) for _ in range(args.requests)]
+
+def parse_server_timing(header: str) -> dict[str, float]:
+    """
+    Parses a Server-Timing header into stage durations in milliseconds.
+    """
+    timings = {}
+    for part in filter(None, (p.strip() for p in header.split(","))):
+        name, _, duration = part.partition(";dur=")
+        if duration:
+            timings[name] = float(duration)
+    return timings
+
+def percentile(values: list[float], pct: float) -> float:
+    """
+    Returns the nearest-rank percentile of the values.
+    """
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+async def drive(asgi_app, workload: list[tuple[str, int]], args: argparse.Namespace) -> dict:
+    """
+    Sends the workload at the configured concurrency and collects per-request timings.
+    """
+    import httpx
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    stage_samples: dict[str, list[float]] = {}
+    client_latencies: list[float] = []
+    statuses: dict[str, int] = {}
+
+    async with asgi_app.router.lifespan_context(asgi_app):
+        transport = httpx.ASGITransport(app=asgi_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+
+            async def send(question: str, offset: int):
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await client.post("/data-requests", json={
+                        "user_query": question, "offset": offset, "limit": args.limit
+                    })
+                    client_latencies.append((time.perf_counter() - start) * 1000)
+
+                status = f"http_{response.status_code}"
+                if response.status_code == 200:
+                    status = str(response.json().get("status", "ok"))
+                statuses[status] = statuses.get(status, 0) + 1
+                for stage, ms in parse_server_timing(response.headers.get("server-timing", "")).items():
+                    stage_samples.setdefault(stage, []).append(ms)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(send(question, offset) for question, offset in workload))
+            elapsed = time.perf_counter() - started
+
+    stage_samples["client"] = client_latencies
+    return {
+        "requests": len(workload),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(workload) / elapsed, 2),
+        "statuses": statuses,
+        "stages": {
+            stage: {
+                "count": len(samples),
+                "p50_ms": round(percentile(samples, 50), 2),
+                "p95_ms": round(percentile(samples, 95), 2),
+                "p99_ms": round(percentile(samples, 99), 2),
+            }
+            for stage, samples in sorted(stage_samples.items())
+        },
+    }
+
+def run_config(args: argparse.Namespace) -> dict:
+    """
+    Returns the parameters that must match for two runs to be comparable.
+    """
+    keys = ("requests", "concurrency", "distinct", "limit", "llm_latency", "embedding_latency",
+            "vector_latency", "db_latency", "orders", "tasks_per_order", "seed")
+    return {key: getattr(args, key) for key in keys}
+
+def host_info() -> dict:
+    """
+    Returns the properties of this host that the wall-clock timings depend on.
+    """
+    return {
+        "cpu_count": os.cpu_count(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "python": platform.python_version(),
+    }
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Compares a run against the baseline.
+
+    Returns:
+        list[str]: One message per regression; empty when the run is within tolerance.
+    """
+    regressions = []
+    floor = baseline["throughput_rps"] * (1 - tolerance)
+    if report["throughput_rps"] < floor:
+        regressions.append(
+            f"throughput {report['throughput_rps']} rps < {baseline['throughput_rps']} rps baseline"
+        )
+
+    for stage in COMPARED_STAGES:
+        current = report["stages"].get(stage)
+        previous = baseline["stages"].get(stage)
+        if not current or not previous:
+            continue
+        allowed = previous["p95_ms"] * (1 + tolerance)
+        if current["p95_ms"] > allowed and current["p95_ms"] - previous["p95_ms"] > NOISE_FLOOR_MS:
+            regressions.append(
+                f"{stage} p95 {current['p95_ms']} ms > {previous['p95_ms']} ms baseline"
+            )
+    return regressions
+
+def print_report(report: dict, baseline: dict | None) -> None:
+    print(f"\n{report['requests']} requests in {report['elapsed_seconds']} s "
+          f"-> {report['throughput_rps']} req/s   statuses: {report['statuses']}")
+    if baseline:
+        print(f"baseline throughput: {baseline['throughput_rps']} req/s")
+    print(f"\n{'stage':<16}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'base p95':>10}")
+    for stage, stats in report["stages"].items():
+        base = (baseline or {}).get("stages", {}).get(stage, {}).get("p95_ms", "")
+        print(f"{stage:<16}{stats['count']:>7}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}{base:>10}")
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+
+    asgi_app, keeper = install_fakes(args)
+    try:
+        report = asyncio.run(drive(asgi_app, build_workload(args), args))
+    finally:
+        keeper.close()
+    report["config"] = run_config(args)
+    report["host"] = host_info()
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, baseline)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump(report, baseline_file, indent=2)
+            baseline_file.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print("\nNo baseline found; run with --update-baseline to store one.")
+        return 0
+    if baseline.get("config") != report["config"]:
+        print("\nRun parameters differ from the baseline; comparison skipped.")
+        return 0
+    if baseline.get("host") != report["host"] and not args.any_host:
+        print(f"\nBaseline was recorded on another host ({baseline.get('host') or 'unknown'}, this host: "
+              f"{report['host']}); comparison skipped. Run with --update-baseline to record one here, "
+              f"or --any-host to compare anyway.")
+        return 0
+
+    regressions = compare(report, baseline, args.tolerance)
+    for message in regressions:
+        print(f"REGRESSION: {message}")
+    if not regressions:
+        print(f"\nNo regressions beyond {args.tolerance:.0%} of the baseline.")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+# Sentinel returned on a cache miss, so that None can be cached as a value
+MISSING = object()
+
+class TTLCache:
+    """
+    A thread-safe, size-bounded LRU cache whose entries expire after a time-to-live.
+    Keeps hit/miss counters so callers can report cache effectiveness.
+    """
+    def __init__(self, max_size: int, ttl: float):
+        """
+        Args:
+            max_size (int): Maximum number of entries kept before evicting the least recently used.
+            ttl (float): Default lifetime of an entry in seconds.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = MISSING, count: bool = True) -> Any:
+        """
+        Returns the cached value for the key, or `default` if it is absent or expired.
+        A successful lookup marks the entry as most recently used. Pass `count=False`
+        for a repeated lookup of a key whose first lookup was already counted.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                if count:
+                    self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            if count:
+                self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """
+        Stores a value, optionally with a per-entry TTL overriding the default.
+        Evicts the least recently used entries once the cache is full.
+        """
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Removes all entries; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the cache size and hit/miss counters.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
@@ -1,12 +1,20 @@
 import asyncio
+import hashlib
 import re
+from contextlib import aclosing
 import google.generativeai as Aimodel
 from services.configuration.config import settings
 from langchain.prompts import PromptTemplate
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.runnables import (RunnablePassthrough, RunnableLambda)
+from langchain_core.runnables import RunnableLambda
 from services.configuration.logger import get_logger
-from services.retriever import get_schema_context_from_rag
+from services.retriever import retrieve_schema_context, get_retriever
+from services.schema_pruning import compact_schema_context
+from services.semantic_cache import SemanticSqlCache
+from services.single_flight import SingleFlight
+from services.deadline import DeadlineExceeded, bounded
+from services.metrics import LLM_IN_FLIGHT, LLM_WAITING, LLM_STREAM_ABORTS, register_cache, record_llm_usage, stage_timer
+from services.cache import TTLCache, MISSING
 from google.api_core.exceptions import GoogleAPIError
 
 # Initialize logger specific to Chat Agent activities
@@ -25,48 +33,73 @@ def clean_sql_query(query: str) -> str:
     query_cleaned = re.sub(r'`|sql', '', query, flags=re.IGNORECASE)  
     return query_cleaned.strip()
 
-class Chat_agent:
+# Pagination keywords the prompt forbids, judged only once the word is complete
+_PAGINATION_KEYWORD = re.compile(r'\b(?:LIMIT|OFFSET|FETCH)\b(?=\W)', re.IGNORECASE)
+
+# String literals, including one that is still being streamed
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*(?:'|$)|\"(?:[^\"\\]|\\.|\"\")*(?:\"|$)")
+
+def sql_rejection(sql_query: str, complete: bool = True) -> str | None:
     """
-    Chat_agent acts as an interface to convert natural language queries into SQL
-    using Google's Gemini language model via LangChain.
+    Returns why cleaned model output must be rejected, or None if it is acceptable.
+
+    Reasons are "error" for an ERROR response, "not_select" when the output does not
+    start with SELECT and "pagination" for LIMIT, OFFSET or FETCH outside string
+    literals. A partial output is only judged on words it has completed, so a prefix
+    rejected mid-stream would also be rejected once complete.
+
+    Args:
+        sql_query (str): The cleaned output, or the prefix received so far.
+        complete (bool): Whether the output is complete.
+
+    Returns:
+        str|None: The rejection reason, or None.
     """
-    def __init__(self):
-        """
-        Initializes the chat agent with Gemini 2.0 Flash model configured to respond deterministically.
-        """
-        logger.info("Initializing Chat agent with Gemini model.")
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash",
-            api_key=api_key,
-            temperature=0 # Zero temperature for consistent outputs
-        )
-        logger.info("Model initialized successfully.")
-    
-    async def nl_to_sql(self,user_query: str) -> str | None:
-        """
-        Converts a natural language query into a valid SQL SELECT statement.
-        
-        Steps:
-        - Fetch schema context using RAG mechanism.
-        - Format the prompt with strict SQL generation rules.
-        - Use LangChain to pass prompt to Gemini model.
-        - Clean and validate the output SQL.
-        
-        Returns:
-        - SQL SELECT query string if valid.
-        - None if the model generates invalid or non-compliant SQL.
-        """
-        logger.info(f"Received user query: '{user_query}'")
+    if "ERROR" in sql_query:
+        return "error"
+    text = sql_query.lstrip() + (" " if complete else "")
 
-        try:
-            # Retrieve relevant table and column schema context based on user query
-            logger.debug("Fetching schema context from RAG for the query.")
-            schema_context = await get_schema_context_from_rag(user_query)
+    # A prefix such as '"ERR' may still turn into an ERROR response
+    if not complete and "ERROR".startswith(text.lstrip("\"'").upper()):
+        return None
+    first_word = re.match(r'\w*', text).group()
+    if first_word.lower() != "select" and len(first_word) < len(text):
+        return "not_select"
+
+    if _PAGINATION_KEYWORD.search(_STRING_LITERAL.sub("''", text)):
+        return "pagination"
+    return None
 
-            # Prompt template defining strict SQL generation rules
-            prompt_template = PromptTemplate(
-                input_variables=["user_query", "schema_context"],
-                template="""
+# Sentence punctuation ending a word; comparison operators, signs and the separators
+# inside numbers, dates and times ("1.5", "1,000", "10:30") change the meaning and are kept
+_SENTENCE_PUNCTUATION = re.compile(r'[?.!,;:]+(?=\s|$)')
+
+def normalize_question(query: str) -> str:
+    """
+    Normalizes a natural language question for translation caching by folding
+    case, sentence punctuation and whitespace.
+    """
+    return " ".join(_SENTENCE_PUNCTUATION.sub(" ", query.lower()).split())
+
+def message_content(message) -> str:
+    """
+    Records the token usage of an LLM response and returns its text content.
+    """
+    record_llm_usage(getattr(message, "usage_metadata", None))
+    return message.content
+
+def schema_fingerprint(schema_context: str) -> str:
+    """
+    Returns a short, stable fingerprint of the retrieved schema context.
+    Re-indexing the schema changes the context and therefore the fingerprint,
+    which invalidates translations made against the old schema.
+    """
+    return hashlib.sha256(str(schema_context).encode("utf-8")).hexdigest()[:16]
+
+# Prompt template defining strict SQL generation rules, built once at import
+SQL_PROMPT_TEMPLATE = PromptTemplate(
+    input_variables=["user_query", "schema_context"],
+    template="""
                     You are a highly skilled SQL query generation tool designed for Mysql enterprise database environments. 
                     Your sole function is to translate natural language requests into valid and efficient SQL SELECT statements. 
                     Adhere strictly to the following rules, and respond ONLY with the generated SQL query.
@@ -135,18 +168,164 @@ class Chat_agent:
 
                     Now convert the following Natural Language Query:
                     {user_query}""")
-            
-            # Define LangChain flow for chaining input, prompt, LLM, and post-processing
-            chain = (
-                {"user_query": RunnablePassthrough(), "schema_context": RunnableLambda(lambda _: schema_context)}
-                | prompt_template
-                | self.llm
-                | RunnableLambda(lambda x: x.content)
-                )
-            
-            # Run the chain in a separate thread to avoid blocking
+
+class Chat_agent:
+    """
+    Chat_agent acts as an interface to convert natural language queries into SQL
+    using Google's Gemini language model via LangChain.
+    """
+    def __init__(self):
+        """
+        Initializes the chat agent with Gemini 2.0 Flash model configured to respond deterministically.
+        """
+        logger.info("Initializing Chat agent with Gemini model.")
+        self.llm = ChatGoogleGenerativeAI(
+            model="gemini-2.0-flash",
+            api_key=api_key,
+            temperature=0 # Zero temperature for consistent outputs
+        )
+
+        # Cache of validated SQL keyed by normalized question and schema fingerprint
+        self.translation_cache = TTLCache(
+            max_size=settings.TRANSLATION_CACHE_SIZE,
+            ttl=settings.TRANSLATION_CACHE_TTL
+        )
+
+        # Nearest-neighbour store of past translations for reusing SQL of paraphrased questions
+        self.semantic_cache = SemanticSqlCache(
+            max_size=settings.SEMANTIC_CACHE_SIZE,
+            threshold=settings.SEMANTIC_CACHE_THRESHOLD
+        )
+
+        # Define LangChain flow for prompt, LLM, and post-processing once for all requests
+        self.chain = SQL_PROMPT_TEMPLATE | self.llm | RunnableLambda(message_content)
+
+        # Streaming flow yielding message chunks, validated as they arrive
+        self.stream_chain = SQL_PROMPT_TEMPLATE | self.llm
+
+        # Bound the number of in-flight LLM calls and track how many are queued behind the limit
+        self.llm_semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        self.llm_waiting = 0
+        self.llm_in_flight = 0
+
+        # Concurrent identical translations share one LLM call
+        self.llm_flight = SingleFlight("llm_translation")
+
+        # Export cache effectiveness and LLM queue depth
+        register_cache("translation", self.translation_cache.stats)
+        register_cache("semantic_sql", self.semantic_cache.stats)
+        LLM_IN_FLIGHT.set_function(lambda: self.llm_in_flight)
+        LLM_WAITING.set_function(lambda: self.llm_waiting)
+        logger.info("Model initialized successfully.")
+
+    async def _invoke_llm(self, inputs: dict) -> str:
+        """
+        Runs the LLM chain with the async API while holding a concurrency slot.
+
+        Args:
+            inputs (dict): Prompt variables (`user_query` and `schema_context`).
+
+        Returns:
+            str: The raw model output.
+        """
+        self.llm_waiting += 1
+        try:
+            with stage_timer("llm_queue"):
+                await self.llm_semaphore.acquire()
+        finally:
+            self.llm_waiting -= 1
+
+        self.llm_in_flight += 1
+        try:
+            with stage_timer("llm"):
+                if settings.LLM_STREAMING_ENABLED:
+                    return await self._stream_llm(inputs)
+                return await self.chain.ainvoke(inputs)
+        finally:
+            self.llm_in_flight -= 1
+            self.llm_semaphore.release()
+
+    async def _stream_llm(self, inputs: dict) -> str:
+        """
+        Streams the model output and stops the generation as soon as the text received
+        so far must be rejected (an ERROR response, a non-SELECT statement or pagination),
+        so refused and malformed translations do not wait for, or pay for, a full completion.
+
+        Args:
+            inputs (dict): Prompt variables (`user_query` and `schema_context`).
+
+        Returns:
+            str: The raw model output, cut short if the generation was stopped.
+        """
+        message = None
+        # Leaving the block closes the stream, which ends the request to the model
+        async with aclosing(self.stream_chain.astream(inputs)) as chunks:
+            async for chunk in chunks:
+                message = chunk if message is None else message + chunk
+                rejection = sql_rejection(clean_sql_query(message.content), complete=False)
+                if rejection:
+                    LLM_STREAM_ABORTS.labels(rejection).inc()
+                    logger.info(f"Stopped LLM generation early ({rejection}) after {len(message.content)} characters.")
+                    break
+        return message_content(message) if message is not None else ""
+    
+    async def nl_to_sql(self,user_query: str) -> str | None:
+        """
+        Converts a natural language query into a valid SQL SELECT statement.
+        
+        Steps:
+        - Fetch schema context using RAG mechanism.
+        - Return a cached translation for the same normalized question and schema, if any.
+        - Reuse the SQL of a near-duplicate question that passes the false-reuse guards
+          (by wording alone for questions whose tables were matched lexically).
+        - Compact the schema context to the relevant tables and columns.
+        - Format the prompt with strict SQL generation rules.
+        - Use LangChain to pass prompt to Gemini model.
+        - Clean and validate the output SQL.
+        
+        Returns:
+        - SQL SELECT query string if valid.
+        - None if the model generates invalid or non-compliant SQL.
+        """
+        logger.info(f"Received user query: '{user_query}'")
+
+        try:
+            # Retrieve relevant table and column schema context based on user query
+            logger.debug("Fetching schema context from RAG for the query.")
+            schema_context, lookup_path = await retrieve_schema_context(user_query)
+
+            # Serve repeated questions against the same schema without calling the LLM
+            cache_key = (normalize_question(user_query), schema_fingerprint(schema_context))
+            cached_sql = self.translation_cache.get(cache_key)
+            if cached_sql is not MISSING:
+                logger.info(f"Translation cache hit for query: '{user_query}'")
+                return cached_sql
+
+            # Reuse the SQL of a previously translated paraphrase when similar enough. Questions
+            # matched to their tables lexically are only compared by wording, so they never
+            # need an embedding; for the others the retrieval's embedding is reused.
+            question_embedding = None
+            if settings.SEMANTIC_CACHE_ENABLED:
+                if lookup_path == "embedding":
+                    question_embedding = await bounded(get_retriever().aembed_query(user_query))
+                reused_sql = self.semantic_cache.lookup(user_query, question_embedding, cache_key[1])
+                if reused_sql:
+                    self.translation_cache.set(cache_key, reused_sql)
+                    return reused_sql
+
+            # Send only the tables, columns and join keys the question needs, one line per table
+            prompt_context = schema_context
+            if settings.SCHEMA_PRUNING_ENABLED:
+                with stage_timer("schema_pruning"):
+                    prompt_context = compact_schema_context(user_query, schema_context)
+
+            # Invoke the chain natively async, bounded by the LLM concurrency limit and the request deadline.
+            # Only callers sending the same prompt share a call: the prompt holds the raw question
             logger.debug("Invoking LLM chain to generate SQL query.")
-            sql_query = await asyncio.to_thread(chain.invoke, user_query)
+            sql_query = await bounded(self.llm_flight.do(
+                (user_query, cache_key[1]),
+                lambda: self._invoke_llm({"user_query": user_query, "schema_context": prompt_context})
+            ))
 
             # Clean unwanted tokens and whitespace from query
             sql_query = clean_sql_query(sql_query)
@@ -158,14 +337,24 @@ class Chat_agent:
             else:
                 logger.info("No semicolon found in generated SQL.")
 
-            # Final validation: Ensure SQL is a valid SELECT and not an error message
-            if "ERROR" in sql_query or not sql_query.lower().startswith("select"):
-                logger.warning(f"Invalid SQL generated: {sql_query}")
+            # Final validation: the checks that also stop a streamed generation early
+            rejection = sql_rejection(sql_query)
+            if rejection:
+                logger.warning(f"Invalid SQL generated ({rejection}): {sql_query}")
+                # Negative results are cached briefly so abusive repeats don't burn quota
+                self.translation_cache.set(cache_key, None, ttl=settings.TRANSLATION_NEGATIVE_TTL)
                 return None
         
             logger.info(f"Generated valid SQL: {sql_query}")
+            self.translation_cache.set(cache_key, sql_query)
+            if settings.SEMANTIC_CACHE_ENABLED:
+                self.semantic_cache.add(user_query, question_embedding, cache_key[1], sql_query)
             return sql_query
         
+        except DeadlineExceeded:
+            logger.warning(f"Deadline exceeded while translating query '{user_query}'.")
+            raise
+
         # Log and raise any failure during the generation process
         except (Exception,GoogleAPIError) as e:
             logger.exception(f"SQL generation failed for query '{user_query}': {e}")
@@ -23,8 +23,62 @@ class Settings(BaseSettings):
     POOL_RESET_SESSION: bool = True               # Whether to reset the session when a connection is reused
     CONNECT_TIMEOUT: int = 10                     # Timeout (in seconds) for establishing DB connections
     POOL_SIZE: int = 6                            # Maximum number of connections in the pool
+    POOL_MIN_SIZE: int = 2                        # Connections kept open even when idle
+    POOL_ACQUIRE_TIMEOUT: float = 10.0            # Seconds a query waits for a free connection before failing
+    POOL_MAX_WAITERS: int = 64                    # Queries allowed to wait for a connection; more fail right away
+    POOL_MAX_IDLE_TIME: int = 300                 # Idle seconds after which connections above POOL_MIN_SIZE are closed
+    POOL_MAX_LIFETIME: int = 1800                 # Age (in seconds) after which a connection is replaced
+    POOL_VALIDATION_INTERVAL: int = 30            # Seconds between background health checks of idle connections
+    POOL_DRAIN_TIMEOUT: float = 10.0              # Seconds shutdown waits for checked-out connections to return
+    BATCH_MAX_ITEMS: int = 500                    # Maximum number of queries accepted by the batch endpoint
+    BATCH_MAX_PARALLELISM: int = 8                # Maximum number of batch items processed concurrently
+    STREAM_BATCH_SIZE: int = 500                  # Rows fetched per round trip by the streaming endpoint
+    STREAM_MAX_ROWS: int = 1000000                # Maximum number of rows a streamed response may return
+    REQUEST_TIMEOUT: float = 60.0                 # Default time budget (in seconds) of a /data-requests call
+    REQUEST_MAX_TIMEOUT: float = 300.0            # Largest time budget a caller may request
+    DISCONNECT_POLL_INTERVAL: float = 0.5         # Seconds between checks for a disconnected client
+    SERVER_TIMING: bool = False                   # Whether to add a per-stage Server-Timing header to responses
+    CURSOR_SECRET: str = ""                       # Key signing pagination cursors (defaults to API_KEY when empty)
+    RESULT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # Memory budget (in bytes) of the query-result cache
+    RESULT_CACHE_TTL: int = 30                    # Default lifetime (in seconds) of a cached query result
+    RESULT_CACHE_TABLE_TTLS: dict[str, int] = {}  # Per-table result TTLs, e.g. {"POINT_ORDER": 10}; 0 disables caching
+    COUNT_MODE: str = "exact"                     # Total-count mode: "exact" or "approximate" (estimates for huge unfiltered scans)
+    COUNT_CACHE_SIZE: int = 1024                  # Maximum number of cached total counts
+    COUNT_CACHE_TTL: int = 60                     # Lifetime (in seconds) of a cached total count
+    APPROX_COUNT_MIN_ROWS: int = 1000000          # Table size above which approximate mode uses row estimates
+    GOVERNOR_ENABLED: bool = True                 # Whether generated SQL is reviewed with EXPLAIN before it runs
+    GOVERNOR_MAX_EXECUTION_MS: int = 30000        # MAX_EXECUTION_TIME hint added to every governed query (0 disables)
+    GOVERNOR_TAG_ROWS: int = 100000               # Full scans of at least this many rows are tagged in the response
+    GOVERNOR_ESTIMATE_COUNT_ROWS: int = 5000000   # Rows examined above which the total count is estimated instead of run
+    GOVERNOR_REJECT_ROWS: int = 50000000          # Rows examined above which a query is rejected
+    GOVERNOR_CARTESIAN_REJECT_ROWS: int = 1000000 # Rows examined above which a join without a condition is rejected
+    GOVERNOR_CACHE_SIZE: int = 1024               # Maximum number of cached governor decisions
+    GOVERNOR_CACHE_TTL: int = 300                 # Lifetime (in seconds) of a cached governor decision
     PINECONE_API_KEY: str                         # API key for Pinecone (vector database)
     INDEX_NAME: str                               # Pinecone index name used in retrieval-augmented generation
+    RETRIEVAL_BACKEND: str = "pinecone"           # Schema vector index backend: "pinecone" or "local"
+    LOCAL_INDEX_PATH: str = ""                    # Path prefix of the local index files (empty uses the bundled location)
+    EMBEDDING_CACHE_SIZE: int = 2048              # Maximum number of query embeddings kept in memory
+    EMBEDDING_CACHE_TTL: int = 3600               # Lifetime (in seconds) of a cached query embedding
+    SCHEMA_CATALOG_ENABLED: bool = True           # Whether to match questions to tables lexically before using embeddings
+    SCHEMA_CATALOG_REFRESH_INTERVAL: int = 300    # Seconds between reloads of the schema from information_schema
+    SCHEMA_SYNONYMS: dict[str, list[str]] = {}    # Extra words per table, e.g. {"POINT_ORDER": ["circuit"]}
+    SCHEMA_LEXICAL_MAX_TABLES: int = 4            # Lexical matches naming more tables than this use embeddings instead
+    SCHEMA_CATALOG_TABLES: list[str] = []         # Tables the catalog may match and describe; empty means those described in schema_text/
+    SCHEMA_PRUNING_ENABLED: bool = True           # Whether to send only the relevant tables and columns, one line per table, to the LLM
+    TRANSLATION_CACHE_SIZE: int = 1024            # Maximum number of NL-to-SQL translations kept in memory
+    TRANSLATION_CACHE_TTL: int = 86400            # Lifetime (in seconds) of a cached SQL translation
+    TRANSLATION_NEGATIVE_TTL: int = 60            # Lifetime (in seconds) of a cached failed translation
+    LLM_MAX_CONCURRENCY: int = 256                # Maximum number of concurrent in-flight LLM calls
+    LLM_STREAMING_ENABLED: bool = True            # Whether to stream LLM output and stop generating once it must be rejected
+    SEMANTIC_CACHE_ENABLED: bool = True           # Whether to reuse SQL of similar previously translated questions
+    SEMANTIC_CACHE_SIZE: int = 1000               # Maximum number of past questions kept for similarity lookup
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95        # Minimum cosine similarity for reusing a past question's SQL
+    SQL_TEMPLATES_ENABLED: bool = True            # Whether to answer recurring question shapes from learned SQL templates
+    SQL_TEMPLATE_CACHE_SIZE: int = 2000           # Maximum number of learned SQL templates
+    SQL_TEMPLATE_TTL: int = 604800                # Lifetime (in seconds) of a template that is neither used nor reinforced
+    SQL_TEMPLATE_MIN_SUPPORT: int = 2             # Distinct values a template must have been learned from before it is used
+    SQL_TEMPLATE_MIN_CONFIDENCE: float = 0.8      # Minimum share of agreeing translations and successful runs of a template
 
     class Config:
         """
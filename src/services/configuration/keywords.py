@@ -87,13 +87,50 @@ forbidden_keywords = {
     "truncate index", "truncate table"
 }
 
-forbidden_patterns = [re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE) for keyword in forbidden_keywords]
+def _trie_pattern(keywords) -> str:
+    """
+    Renders the keywords as one regex alternation nested by shared prefix
+    (e.g. "alter(?: (?:column|table))?"), so every position of the query is tried
+    against all keywords at once instead of once per keyword. Optional suffixes are
+    greedy: the longest keyword starting at a position is tried first.
+    """
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node: dict) -> str:
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return render(trie)
+
+# All forbidden keywords as whole words, compiled once into a single pattern
+forbidden_pattern = re.compile(r'\b(?:' + _trie_pattern(forbidden_keywords) + r')\b', re.IGNORECASE)
+
+def Find_Forbidden_Keyword(query: str) -> str | None:
+    """
+    Scans the query once for any forbidden keyword (whole words, case-insensitive).
+
+    Args:
+        query (str): The natural language query.
+
+    Returns:
+        str|None: The first forbidden keyword found (the longest one at that position), or None.
+    """
+    match = forbidden_pattern.search(query.strip())
+    return match.group(0).lower() if match else None
 
 def Contains_Forbidden_Keywords(query: str) -> bool:
     query = query.strip()
     logger.debug(f"Checking query for forbidden keywords: {query}")
-    for pattern in forbidden_patterns:
-        if pattern.search(query):
-            logger.warning(f"Forbidden keyword detected in query: {query}")
-            return True
+    keyword = Find_Forbidden_Keyword(query)
+    if keyword:
+        logger.warning(f"Forbidden keyword '{keyword}' detected in query: {query}")
+        return True
     return False
@@ -5,13 +5,15 @@ from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_pinecone import PineconeVectorStore
 from pinecone import Pinecone
 from services.configuration.logger import get_logger
+from services.local_index import LocalVectorIndex, DEFAULT_INDEX_PATH
 
 # Initialize logger for document processing
 logger = get_logger("document_processing")
 
 # Initialize Pinecone client with the provided API key
-logger.info("Initializing Pinecone with API key.")
-pc = Pinecone(api_key=settings.PINECONE_API_KEY)
+if settings.RETRIEVAL_BACKEND != "local":
+    logger.info("Initializing Pinecone with API key.")
+    pc = Pinecone(api_key=settings.PINECONE_API_KEY)
 
 # Load all text documents from the specified directory using TextLoader
 logger.info("Loading documents from directory './schema_text/'.")
@@ -37,13 +39,24 @@ embeddings = GoogleGenerativeAIEmbeddings(
     task_type="semantic_similarity"             # Use case for semantic search
 )
 
-# Create a Pinecone vector store and upload the split document embeddings
-logger.info("Creating Pinecone vector store.")
-docsearch = PineconeVectorStore.from_texts(
-    [t.page_content for t in split_documents],  # Extract text content from each chunk
-    embeddings,                                 # Embedding model to vectorize text
-    index_name='nlsql'                          # Pinecone index name where vectors will be stored
-)
+texts = [t.page_content for t in split_documents]  # Extract text content from each chunk
+
+if settings.RETRIEVAL_BACKEND == "local":
+    # Embed the chunks and persist them as a memory-mapped in-process index
+    logger.info("Creating local vector index.")
+    LocalVectorIndex.build(
+        settings.LOCAL_INDEX_PATH or DEFAULT_INDEX_PATH,  # Path prefix for the matrix and sidecar files
+        texts,
+        embeddings.embed_documents(texts)
+    )
+else:
+    # Create a Pinecone vector store and upload the split document embeddings
+    logger.info("Creating Pinecone vector store.")
+    docsearch = PineconeVectorStore.from_texts(
+        texts,
+        embeddings,                                 # Embedding model to vectorize text
+        index_name='nlsql'                          # Pinecone index name where vectors will be stored
+    )
 
 # Completion log
 logger.info("Document processing completed successfully.")
\ No newline at end of file
@@ -0,0 +1,338 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+from services.configuration.logger import get_logger
+from services.metrics import (
+    POOL_ACQUIRE_SECONDS, POOL_CONNECTIONS_IN_USE, POOL_CONNECTIONS_MAX,
+    POOL_CONNECTIONS_OPEN, POOL_CONNECTIONS_RETIRED, POOL_WAITERS
+)
+
+# Initialize logger for the managed connection pool
+logger = get_logger("ConnectionPoolLogger")
+
+class PoolTimeoutError(Exception):
+    """
+    Raised when no connection becomes available within the acquire timeout.
+    """
+
+class PoolQueueFullError(Exception):
+    """
+    Raised when a connection is requested while the wait queue is already full.
+    """
+
+class PoolClosedError(Exception):
+    """
+    Raised when a connection is requested from a pool that is shutting down.
+    """
+
+class _Slot:
+    """
+    A raw driver connection with the bookkeeping the pool needs to recycle it.
+    """
+    __slots__ = ("connection", "created_at", "last_used")
+
+    def __init__(self, connection: Any):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+class PooledConnection:
+    """
+    A checked-out connection. Attribute access is forwarded to the driver
+    connection; close() returns it to the pool instead of closing the socket.
+    """
+    def __init__(self, pool: "ManagedConnectionPool", slot: _Slot):
+        self._pool = pool
+        self._slot = slot
+
+    def __getattr__(self, attr: str):
+        return getattr(self._slot.connection, attr)
+
+    def close(self) -> None:
+        """Returns the connection to the pool. Calling it twice has no effect."""
+        slot, self._slot = self._slot, None
+        if slot is not None:
+            self._pool._release(slot)
+
+class ManagedConnectionPool:
+    """
+    A blocking, self-healing connection pool.
+
+    Connections are opened on demand between `min_size` and `max_size`. When all
+    `max_size` connections are checked out, up to `max_waiters` callers wait in line for up
+    to `acquire_timeout` seconds instead of failing; callers beyond that fail right away.
+    A background thread, checking one idle connection at a time, closes idle
+    connections above `min_size`, retires connections past their lifetime, pings the
+    remaining idle ones and tops the pool back up to `min_size`. Broken connections
+    are replaced whenever they are detected, on checkout or on return.
+    """
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int,
+        max_size: int,
+        acquire_timeout: float,
+        max_idle_time: float,
+        max_lifetime: float,
+        validation_interval: float,
+        max_waiters: int = 64,
+        reset_session: bool = True,
+        name: str = "pool",
+    ):
+        """
+        Args:
+            connect (Callable): Opens and returns a new driver connection.
+            min_size (int): Connections kept open even when idle.
+            max_size (int): Upper bound on open connections.
+            acquire_timeout (float): Default seconds a caller waits for a connection.
+            max_idle_time (float): Idle seconds after which connections above min_size are closed.
+            max_lifetime (float): Age in seconds after which a connection is retired.
+            validation_interval (float): Seconds between maintenance passes; idle connections
+                                         unused for longer are pinged before checkout.
+            max_waiters (int): Callers allowed to wait for a connection at once.
+            reset_session (bool): Whether to reset the session state when a connection is returned.
+            name (str): Name used for the maintenance thread and in logs.
+        """
+        self._connect = connect
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.max_idle_time = max_idle_time
+        self.max_lifetime = max_lifetime
+        self.validation_interval = validation_interval
+        self.max_waiters = max_waiters
+        self.reset_session = reset_session
+        self.name = name
+
+        self._idle: deque[_Slot] = deque()
+        self._size = 0
+        self._in_use = 0
+        self._waiters = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+
+        POOL_CONNECTIONS_MAX.set(max_size)
+        self._fill_to_min()
+        self._maintainer = threading.Thread(target=self._maintain, name=f"{name}-maintenance", daemon=True)
+        self._maintainer.start()
+
+    def get_connection(self, timeout: float | None = None) -> PooledConnection:
+        """
+        Checks out a healthy connection, waiting for one to be returned when the pool is at max size.
+
+        Args:
+            timeout (float|None): Seconds to wait; defaults to the pool's acquire timeout.
+
+        Returns:
+            PooledConnection: The connection; call close() to return it.
+
+        Raises:
+            PoolTimeoutError: If no connection became available in time.
+            PoolQueueFullError: If max_waiters callers are already waiting.
+            PoolClosedError: If the pool is shutting down.
+        """
+        start = time.perf_counter()
+        deadline = time.monotonic() + (self.acquire_timeout if timeout is None else timeout)
+        try:
+            while True:
+                slot = self._reserve(deadline)
+                if slot is None:
+                    # Reserved capacity for a new connection
+                    slot = self._open_reserved()
+                elif not self._validate(slot):
+                    self._retire(slot, "broken")
+                    continue
+                with self._condition:
+                    self._in_use += 1
+                    POOL_CONNECTIONS_IN_USE.set(self._in_use)
+                return PooledConnection(self, slot)
+        finally:
+            POOL_ACQUIRE_SECONDS.observe(time.perf_counter() - start)
+
+    def _reserve(self, deadline: float) -> _Slot | None:
+        """
+        Takes an idle connection, or reserves room for a new one (returning None),
+        waiting in line until either is possible.
+        """
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise PoolClosedError(f"Connection pool {self.name} is closed.")
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    POOL_CONNECTIONS_OPEN.set(self._size)
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"Timed out waiting for a connection from pool {self.name} "
+                        f"({self.max_size} connections in use)."
+                    )
+                if self._waiters >= self.max_waiters:
+                    raise PoolQueueFullError(
+                        f"Connection pool {self.name} is exhausted and {self._waiters} callers are already waiting."
+                    )
+                self._waiters += 1
+                POOL_WAITERS.set(self._waiters)
+                try:
+                    self._condition.wait(remaining)
+                finally:
+                    self._waiters -= 1
+                    POOL_WAITERS.set(self._waiters)
+
+    def _open_reserved(self) -> _Slot:
+        """
+        Opens a connection for capacity already reserved, releasing the reservation on failure.
+        """
+        try:
+            return _Slot(self._connect())
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                POOL_CONNECTIONS_OPEN.set(self._size)
+                self._condition.notify()
+            raise
+
+    def _validate(self, slot: _Slot) -> bool:
+        """
+        Returns whether an idle connection can be handed out, pinging it if it sat idle long.
+        """
+        if time.monotonic() - slot.created_at > self.max_lifetime:
+            return False
+        if time.monotonic() - slot.last_used <= self.validation_interval:
+            return True
+        try:
+            slot.connection.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _release(self, slot: _Slot) -> None:
+        """
+        Takes a connection back, resetting its session, or retires it if it is unusable.
+        """
+        with self._condition:
+            self._in_use -= 1
+            POOL_CONNECTIONS_IN_USE.set(self._in_use)
+
+        healthy = not self._closed and slot.connection.is_connected()
+        if healthy and self.reset_session:
+            try:
+                slot.connection.reset_session()
+            except Exception:
+                healthy = False
+        if self._closed:
+            self._retire(slot, "shutdown")
+            return
+        if not healthy or time.monotonic() - slot.created_at > self.max_lifetime:
+            self._retire(slot, "broken" if not healthy else "lifetime")
+            return
+
+        slot.last_used = time.monotonic()
+        with self._condition:
+            self._idle.append(slot)
+            self._condition.notify()
+
+    def _retire(self, slot: _Slot, reason: str) -> None:
+        """
+        Closes a connection and frees its capacity for a replacement.
+        """
+        try:
+            slot.connection.close()
+        except Exception:
+            pass
+        POOL_CONNECTIONS_RETIRED.labels(reason).inc()
+        with self._condition:
+            self._size -= 1
+            POOL_CONNECTIONS_OPEN.set(self._size)
+            self._condition.notify()
+        logger.debug(f"Retired a pooled connection ({reason}).")
+
+    def _fill_to_min(self) -> None:
+        """
+        Opens connections until the pool holds at least min_size.
+        """
+        while not self._closed:
+            with self._condition:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+                POOL_CONNECTIONS_OPEN.set(self._size)
+            try:
+                slot = self._open_reserved()
+            except Exception as e:
+                logger.warning(f"Could not open a connection for pool {self.name}: {e}")
+                return
+            with self._condition:
+                self._idle.append(slot)
+                self._condition.notify()
+
+    def _maintain(self) -> None:
+        """
+        Background loop recycling idle and stale connections and keeping min_size open.
+        """
+        while not self._stop.wait(self.validation_interval):
+            with self._condition:
+                candidates = list(self._idle)
+
+            # Only the connection being checked is out of the idle queue, so callers keep
+            # being served from the others while a ping is in progress
+            for slot in candidates:
+                with self._condition:
+                    if self._closed or slot not in self._idle:
+                        # Checked out (or the pool closed) since the snapshot
+                        continue
+                    self._idle.remove(slot)
+
+                now = time.monotonic()
+                if now - slot.created_at > self.max_lifetime:
+                    self._retire(slot, "lifetime")
+                elif now - slot.last_used > self.max_idle_time and self._size > self.min_size:
+                    self._retire(slot, "idle")
+                elif not self._validate(slot):
+                    self._retire(slot, "broken")
+                else:
+                    with self._condition:
+                        # Unused since its last return, so it goes back to the least recently used end
+                        self._idle.appendleft(slot)
+                        self._condition.notify()
+            self._fill_to_min()
+
+    def close(self, drain_timeout: float = 10.0) -> None:
+        """
+        Stops handing out connections, waits up to `drain_timeout` seconds for
+        checked-out connections to come back and closes every connection.
+        """
+        self._stop.set()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            deadline = time.monotonic() + drain_timeout
+            while self._in_use and time.monotonic() < deadline:
+                self._condition.wait(deadline - time.monotonic())
+            idle, self._idle = list(self._idle), deque()
+            in_use = self._in_use
+
+        for slot in idle:
+            self._retire(slot, "shutdown")
+        self._maintainer.join(timeout=1)
+        if in_use:
+            logger.warning(f"Pool {self.name} closed with {in_use} connections still checked out.")
+        logger.info(f"Connection pool {self.name} drained and closed.")
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the pool's size, idle and checked-out connections and waiters.
+        """
+        with self._condition:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiters": self._waiters,
+                "max_size": self.max_size,
+            }
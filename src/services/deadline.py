@@ -0,0 +1,52 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Awaitable
+
+# Absolute deadline (time.monotonic()) of the request being processed, if any
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+class DeadlineExceeded(Exception):
+    """
+    Raised when a request's time budget runs out before a pipeline stage completes.
+    """
+
+def start_deadline(seconds: float | None) -> None:
+    """
+    Gives the current request (and every task it starts afterwards) a time budget.
+
+    Args:
+        seconds (float|None): The budget; None removes the deadline.
+    """
+    _deadline.set(time.monotonic() + seconds if seconds else None)
+
+def remaining() -> float | None:
+    """
+    Returns the seconds left before the current deadline, or None if there is none.
+    """
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+async def bounded(awaitable: Awaitable):
+    """
+    Awaits the awaitable within the current request's deadline. When the budget runs
+    out the awaitable is cancelled, so the stage stops holding capacity.
+
+    Raises:
+        DeadlineExceeded: If the deadline has passed or expires while waiting.
+    """
+    budget = remaining()
+    if budget is None:
+        return await awaitable
+    if budget <= 0:
+        # Close un-awaited coroutines so they do not warn, then fail fast
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded("Request deadline exceeded.")
+    try:
+        return await asyncio.wait_for(awaitable, budget)
+    except asyncio.TimeoutError:
+        # A timeout raised by the stage itself is not a deadline expiry
+        if remaining() > 0:
+            raise
+        raise DeadlineExceeded("Request deadline exceeded.")
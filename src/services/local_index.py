@@ -0,0 +1,114 @@
+import json
+import os
+import time
+import numpy as np
+from services.configuration.logger import get_logger
+
+# Initialize logger for the in-process vector index
+logger = get_logger("LocalIndexLogger")
+
+# Default location of the persisted index, next to the schema text it is built from
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(__file__), "configuration", "local_index", "schema")
+
+class LocalVectorIndex:
+    """
+    An in-process vector index for the schema chunks.
+
+    Embeddings are stored L2-normalized in a memory-mapped float32 matrix (`<path>.npy`)
+    with chunk metadata in a JSON sidecar (`<path>.json`), so a top-k lookup is a single
+    matrix-vector product. The query interface mirrors the Pinecone index handle.
+    """
+    def __init__(self, matrix: np.ndarray, metadata: list[dict], built_at: float):
+        self.matrix = matrix
+        self.metadata = metadata
+        self.built_at = built_at
+
+    @staticmethod
+    def build(path: str, texts: list[str], embeddings: list[list[float]]) -> "LocalVectorIndex":
+        """
+        Persists the chunk embeddings and their texts and returns the loaded index.
+
+        Args:
+            path (str): Path prefix for the `.npy` matrix and `.json` sidecar.
+            texts (list[str]): Chunk texts, stored as metadata.
+            embeddings (list[list[float]]): One embedding per chunk.
+
+        Returns:
+            LocalVectorIndex: The index loaded back from disk.
+        """
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1, norms)
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.save(f"{path}.npy", matrix)
+        with open(f"{path}.json", "w", encoding="utf-8") as sidecar:
+            json.dump({
+                "built_at": time.time(),
+                "dimension": int(matrix.shape[1]),
+                "metadata": [{"text": text} for text in texts],
+            }, sidecar)
+
+        logger.info(f"Built local vector index with {len(texts)} chunks at {path}.")
+        return LocalVectorIndex.load(path)
+
+    @staticmethod
+    def load(path: str) -> "LocalVectorIndex":
+        """
+        Memory-maps a persisted index.
+
+        Args:
+            path (str): Path prefix used when the index was built.
+
+        Returns:
+            LocalVectorIndex: The loaded index.
+        """
+        matrix = np.load(f"{path}.npy", mmap_mode="r")
+        with open(f"{path}.json", encoding="utf-8") as sidecar:
+            meta = json.load(sidecar)
+
+        if len(meta["metadata"]) != matrix.shape[0]:
+            raise ValueError(f"Local index at {path} has mismatched matrix and metadata.")
+
+        logger.info(f"Loaded local vector index with {matrix.shape[0]} chunks from {path}.")
+        return LocalVectorIndex(matrix, meta["metadata"], meta.get("built_at", 0.0))
+
+    def describe_index_stats(self) -> dict:
+        """
+        Returns basic index statistics, matching the Pinecone index handle.
+        """
+        return {"dimension": int(self.matrix.shape[1]), "total_vector_count": int(self.matrix.shape[0])}
+
+    def query(self, vector: list[float], top_k: int = 4, include_metadata: bool = True) -> dict:
+        """
+        Returns the top-k chunks by cosine similarity in one vectorized pass.
+
+        Args:
+            vector (list[float]): The query embedding.
+            top_k (int): Number of matches to return.
+            include_metadata (bool): Whether to attach chunk metadata to each match.
+
+        Returns:
+            dict: A Pinecone-shaped response with a `matches` list.
+        """
+        query = np.array(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query /= norm
+
+        scores = self.matrix @ query
+        top_k = min(top_k, scores.shape[0])
+        if top_k <= 0:
+            return {"matches": []}
+
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+
+        return {"matches": [
+            {
+                "id": str(i),
+                "score": float(scores[i]),
+                **({"metadata": self.metadata[i]} if include_metadata else {}),
+            }
+            for i in top
+        ]}
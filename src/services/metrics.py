@@ -0,0 +1,160 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from services.single_flight import FLIGHT_GROUPS
+
+# Latency of each pipeline stage, e.g. keyword_check, embedding, vector_search, llm, data_query
+STAGE_SECONDS = Histogram(
+    "nl2sql_stage_seconds",
+    "Latency of each request pipeline stage in seconds.",
+    ["stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+
+# MySQL connection pool utilization and time spent waiting for a connection
+POOL_CONNECTIONS_IN_USE = Gauge("nl2sql_pool_connections_in_use", "MySQL connections currently checked out.")
+POOL_CONNECTIONS_MAX = Gauge("nl2sql_pool_connections_max", "Maximum number of MySQL connections.")
+POOL_CONNECTIONS_OPEN = Gauge("nl2sql_pool_connections_open", "MySQL connections currently open.")
+POOL_CONNECTIONS_RETIRED = Counter(
+    "nl2sql_pool_connections_retired_total",
+    "MySQL connections closed by the pool, by reason (idle, lifetime, broken, shutdown).",
+    ["reason"]
+)
+POOL_WAITERS = Gauge("nl2sql_pool_waiters", "Callers waiting for a MySQL connection.")
+POOL_ACQUIRE_SECONDS = Histogram(
+    "nl2sql_pool_acquire_seconds",
+    "Time taken to check out a MySQL connection in seconds.",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10)
+)
+POOL_WAIT_SECONDS = Histogram(
+    "nl2sql_pool_wait_seconds",
+    "Time a query waited for a MySQL executor worker in seconds.",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10)
+)
+
+# Gemini token usage by kind (input / output) and LLM concurrency
+LLM_TOKENS = Counter("nl2sql_llm_tokens_total", "LLM tokens consumed.", ["kind"])
+LLM_IN_FLIGHT = Gauge("nl2sql_llm_in_flight", "LLM calls currently in flight.")
+LLM_WAITING = Gauge("nl2sql_llm_waiting", "LLM calls queued behind the concurrency limit.")
+LLM_STREAM_ABORTS = Counter(
+    "nl2sql_llm_stream_aborts_total",
+    "LLM generations stopped mid-stream, by reason (error, not_select, pagination).",
+    ["reason"]
+)
+
+# Schema context lookups by path (lexical catalog match or embedding search)
+SCHEMA_LOOKUPS = Counter("nl2sql_schema_lookups_total", "Schema context lookups.", ["path"])
+
+# Estimated tokens of the schema context as retrieved and as sent in the prompt
+SCHEMA_CONTEXT_TOKENS = Histogram(
+    "nl2sql_schema_context_tokens",
+    "Estimated tokens of the schema context, as retrieved and as placed in the prompt.",
+    ["version"],
+    buckets=(50, 100, 250, 500, 1000, 1500, 2000, 3000, 4000, 6000, 8000)
+)
+
+# Pre-execution cost governor decisions by action (accept, tag, estimate_count, reject)
+GOVERNOR_DECISIONS = Counter("nl2sql_governor_decisions_total", "Query governor decisions.", ["action"])
+
+# Per-request stage timings, collected for the Server-Timing header
+_request_timings: ContextVar[dict | None] = ContextVar("request_timings", default=None)
+
+def record_stage(stage: str, seconds: float) -> None:
+    """
+    Records a stage duration in the histogram and in the current request's timings.
+    """
+    STAGE_SECONDS.labels(stage).observe(seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+@contextmanager
+def stage_timer(stage: str):
+    """
+    Times the enclosed block as one pipeline stage.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+async def timed(stage: str, awaitable: Awaitable):
+    """
+    Awaits the awaitable and records its duration as one pipeline stage.
+    Useful for stages that run concurrently under asyncio.gather.
+    """
+    with stage_timer(stage):
+        return await awaitable
+
+def start_request_timings() -> dict:
+    """
+    Starts collecting stage timings for the current request and returns the collection.
+    """
+    timings = {}
+    _request_timings.set(timings)
+    return timings
+
+def server_timing_header(timings: dict) -> str:
+    """
+    Formats collected stage timings as a Server-Timing header value (milliseconds).
+    """
+    return ", ".join(f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in timings.items())
+
+def record_llm_usage(usage: dict | None) -> None:
+    """
+    Adds the token counts of one LLM response to the token counter.
+    """
+    if not usage:
+        return
+    LLM_TOKENS.labels("input").inc(usage.get("input_tokens", 0))
+    LLM_TOKENS.labels("output").inc(usage.get("output_tokens", 0))
+
+# Statistics sources polled on every scrape, keyed by cache name
+_cache_sources: dict[str, Callable[[], dict]] = {}
+
+def register_cache(name: str, stats: Callable[[], dict]) -> None:
+    """
+    Registers a cache whose `stats()` snapshot is exported on every scrape.
+    """
+    _cache_sources[name] = stats
+
+class _StatsCollector:
+    """
+    Exports cache hit ratios, false-reuse guard rejections and single-flight coalescing ratios from the
+    services' own counters at scrape time.
+    """
+    def collect(self):
+        hits = CounterMetricFamily("nl2sql_cache_hits", "Cache hits.", labels=["cache"])
+        misses = CounterMetricFamily("nl2sql_cache_misses", "Cache misses.", labels=["cache"])
+        ratio = GaugeMetricFamily("nl2sql_cache_hit_ratio", "Cache hit ratio.", labels=["cache"])
+        size = GaugeMetricFamily("nl2sql_cache_entries", "Entries held by the cache.", labels=["cache"])
+        rejections = CounterMetricFamily(
+            "nl2sql_cache_guard_rejections", "Cache reuses blocked by a false-reuse guard.", labels=["cache", "guard"]
+        )
+        for name, source in list(_cache_sources.items()):
+            stats = source()
+            cache_hits = stats["hits"]
+            cache_misses = stats.get("misses", stats.get("lookups", 0) - cache_hits)
+            hits.add_metric([name], cache_hits)
+            misses.add_metric([name], cache_misses)
+            ratio.add_metric([name], cache_hits / (cache_hits + cache_misses) if cache_hits + cache_misses else 0.0)
+            size.add_metric([name], stats["size"])
+            for guard, count in stats.get("guard_rejections", {}).items():
+                rejections.add_metric([name, guard], count)
+        yield from (hits, misses, ratio, size, rejections)
+
+        calls = CounterMetricFamily("nl2sql_single_flight_calls", "Calls entering a coalescing group.", labels=["stage"])
+        coalesced = CounterMetricFamily("nl2sql_single_flight_coalesced", "Calls served by an in-flight call.", labels=["stage"])
+        coalescing = GaugeMetricFamily("nl2sql_single_flight_coalescing_ratio", "Share of coalesced calls.", labels=["stage"])
+        for group in FLIGHT_GROUPS:
+            stats = group.stats()
+            calls.add_metric([group.name], stats["calls"])
+            coalesced.add_metric([group.name], stats["coalesced"])
+            coalescing.add_metric([group.name], stats["coalescing_ratio"])
+        yield from (calls, coalesced, coalescing)
+
+REGISTRY.register(_StatsCollector())
@@ -1,10 +1,53 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
 from services.configuration.config import settings
-from mysql.connector import pooling, Error
+from mysql.connector import connect, Error
 from services.configuration.logger import get_logger
+from services.cache import MISSING
+from services.result_cache import QueryResultCache
+from services.single_flight import SingleFlight
+from services.deadline import bounded
+from services.connection_pool import ManagedConnectionPool
+from services.metrics import POOL_WAIT_SECONDS, register_cache
 
 # Initialize logger for MysqlExecutionLogger logging
 logger = get_logger("MysqlExecutionLogger")
 
+class QueryCancelled(Exception):
+    """
+    Raised on the executor worker when its query was cancelled before it started.
+    """
+
+class RunningQuery:
+    """
+    Links an async caller to the statement its executor worker runs, so an
+    abandoned statement can be stopped with KILL QUERY from a side connection.
+
+    The worker attaches the connection id before executing and detaches it before
+    returning the connection to the pool. Cancellation holds the same lock while it
+    kills, so a KILL can never reach a connection that has moved on to other work.
+    """
+    def __init__(self):
+        self.connection_id: int | None = None
+        self.cancelled = False
+        self.lock = threading.Lock()
+
+    def attach(self, connection_id: int) -> bool:
+        """Records the worker's connection; returns False if already cancelled."""
+        with self.lock:
+            if self.cancelled:
+                return False
+            self.connection_id = connection_id
+            return True
+
+    def detach(self) -> None:
+        """Forgets the connection once its statement has finished."""
+        with self.lock:
+            self.connection_id = None
+
 class MysqlDB:
     """
     MysqlDB manages connections to a MySQL database using a connection pool.
@@ -12,43 +55,84 @@ class MysqlDB:
     """
     def __init__(self):
         """
-        Initializes the MySQL connection pool upon object creation.
+        Initializes the MySQL connection pool upon object creation,
+        along with a dedicated executor sized to the pool for async callers.
         """
         self.pool = None
+        self.executor = ThreadPoolExecutor(max_workers=settings.POOL_SIZE, thread_name_prefix="mysql")
+        self.result_cache = QueryResultCache(
+            max_bytes=settings.RESULT_CACHE_MAX_BYTES,
+            default_ttl=settings.RESULT_CACHE_TTL,
+            table_ttls=settings.RESULT_CACHE_TABLE_TTLS
+        )
+
+        # Concurrent identical queries share one execution
+        self.query_flight = SingleFlight("sql_execution")
+        register_cache("query_result", self.result_cache.stats)
         self.initialize_pool()
 
     def initialize_pool(self):
         """
         Sets up a MySQL connection pool using parameters from the settings module.
-        Ensures optimized reuse of connections for concurrent access.
+        The pool grows from POOL_MIN_SIZE to POOL_SIZE connections under load, makes
+        callers wait (up to POOL_ACQUIRE_TIMEOUT, at most POOL_MAX_WAITERS of them) instead
+        of failing when exhausted, and replaces idle, stale or broken connections in the background.
+        """
+        self.pool = ManagedConnectionPool(
+            connect=self._connect,
+            min_size=settings.POOL_MIN_SIZE,
+            max_size=settings.POOL_SIZE,
+            acquire_timeout=settings.POOL_ACQUIRE_TIMEOUT,
+            max_idle_time=settings.POOL_MAX_IDLE_TIME,
+            max_lifetime=settings.POOL_MAX_LIFETIME,
+            validation_interval=settings.POOL_VALIDATION_INTERVAL,
+            max_waiters=settings.POOL_MAX_WAITERS,
+            reset_session=settings.POOL_RESET_SESSION,
+            name=settings.POOL_NAME,
+        )
+        logger.info("Initialized MySQL connection pool.")
+
+    @staticmethod
+    def _connect():
+        """
+        Opens one MySQL connection for the pool.
         """
-        self.pool = pooling.MySQLConnectionPool(
-            pool_name=settings.POOL_NAME,
-            pool_size=settings.POOL_SIZE,
-            pool_reset_session=settings.POOL_RESET_SESSION,
+        return connect(
             host=settings.HOST_NAME,
             user=settings.USER_NAME,
             password=settings.PASSWORD,
             database=settings.DATABASE_NAME,
-            connect_timeout=10,
+            connect_timeout=settings.CONNECT_TIMEOUT,
         )
-        logger.info("Initialized MySQL connection pool.")
 
-    def Execute_Query(self, sql_query: str, params=None) -> list[dict]:
+    def Execute_Query(self, sql_query: str, params=None, columnar: bool = False,
+                      running: RunningQuery | None = None, count_cache_lookup: bool = True) -> list[dict] | dict:
         """
         Executes a SQL query using a pooled MySQL connection.
 
         Parameters:
             sql_query (str): The SQL query to execute.
             params (tuple|None): Optional parameters for parameterized queries.
+            columnar (bool): Return `{"columns": [...], "rows": [[...]]}` built straight
+                             from the cursor tuples instead of one dict per row.
+            running (RunningQuery|None): Handle through which an async caller can kill the statement.
+            count_cache_lookup (bool): False when the caller already counted its result-cache lookup.
 
         Returns:
             list[dict]: Result set represented as a list of dictionaries (column-value pairs).
                         Returns None if the query yields no results.
+            dict: The columnar result when `columnar` is set (with empty rows if there are none).
 
         Raises:
             Exception/Error: If query execution fails due to connection or SQL issues.
         """
+        # Serve repeated queries from memory without taking a pooled connection
+        cache_key = QueryResultCache.make_key(sql_query, params, columnar)
+        cached = self.result_cache.get(cache_key, count=count_cache_lookup)
+        if cached is not MISSING:
+            logger.info("Query result served from cache.")
+            return cached
+
         if not self.pool:
             logger.error("MySQL connection pool is not initialized.")
             raise
@@ -56,32 +140,208 @@ class MysqlDB:
         cursor=None
         try:
             connection = self.pool.get_connection()
+            if running and not running.attach(connection.connection_id):
+                raise QueryCancelled("Query cancelled before execution.")
             cursor = connection.cursor()
             cursor.execute(sql_query, params or ())
             columns = [col[0] for col in cursor.description]
+            if columnar:
+                rows = [list(row) for row in cursor.fetchall()]
+                logger.info(f"Query returned {len(rows)} rows.")
+                result = {"columns": columns, "rows": rows}
+                self.result_cache.set(cache_key, result)
+                return result
+
             results = [dict(zip(columns, row)) for row in cursor.fetchall()]
 
             if not results:
                 logger.info(f"No results found for query: {sql_query}")
+                self.result_cache.set(cache_key, None)
                 return None
 
             logger.info(f"Query returned {len(results)} rows.")
+            self.result_cache.set(cache_key, results)
             return results
 
         except (Exception,Error) as e:
-            logger.exception(f"Error executing query: {sql_query}")
+            if running and running.cancelled:
+                logger.info(f"Cancelled query stopped: {sql_query}")
+            else:
+                logger.exception(f"Error executing query: {sql_query}")
             raise
         
         finally:
-            if connection and connection.is_connected():
+            if running:
+                running.detach()
+            if cursor and connection.is_connected():
                 cursor.close()
+            if connection:
+                # Returns healthy connections to the pool; broken ones are replaced
                 connection.close()
                 logger.debug("MySQL connection returned to pool.")
 
+    def Stream_Query(self, sql_query: str, params=None, batch_size: int = 500,
+                     running: RunningQuery | None = None):
+        """
+        Executes a SQL query on an unbuffered cursor and yields its result incrementally.
+
+        The first item yielded is the list of column names; every following item is a
+        batch of up to `batch_size` row tuples fetched with `fetchmany`, so memory stays
+        flat regardless of the result size. The pooled connection is held until the
+        generator is exhausted or closed.
+
+        Parameters:
+            sql_query (str): The SQL query to execute.
+            params (tuple|None): Optional parameters for parameterized queries.
+            batch_size (int): Number of rows fetched per round trip.
+            running (RunningQuery|None): Handle through which an async caller can kill the
+                                         statement until its column names have been read.
+
+        Yields:
+            list[str] first, then list[tuple] batches of rows.
+        """
+        if not self.pool:
+            logger.error("MySQL connection pool is not initialized.")
+            raise RuntimeError("MySQL connection pool is not initialized.")
+        connection = self.pool.get_connection()
+        cursor = None
+        exhausted = False
+        try:
+            if running and not running.attach(connection.connection_id):
+                raise QueryCancelled("Query cancelled before execution.")
+            cursor = connection.cursor(buffered=False)
+            cursor.execute(sql_query, params or ())
+            columns = [col[0] for col in cursor.description]
+            # From here on the caller stops the stream by closing the generator
+            if running:
+                running.detach()
+            yield columns
+
+            streamed = 0
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                streamed += len(rows)
+                yield rows
+            exhausted = True
+            logger.info(f"Streamed {streamed} rows.")
+
+        except (Exception,Error) as e:
+            if running and running.cancelled:
+                logger.info(f"Cancelled stream query stopped: {sql_query}")
+            else:
+                logger.exception(f"Error streaming query: {sql_query}")
+            raise
+
+        finally:
+            if running:
+                running.detach()
+            if not exhausted:
+                # Unread rows would block session reset; drop the socket and let the pool reconnect it
+                logger.info("Stream closed before completion, discarding its connection.")
+                connection.disconnect()
+            else:
+                cursor.close()
+            connection.close()
+
+    async def Execute_Query_Async(self, sql_query: str, params=None, columnar: bool = False) -> list[dict] | dict:
+        """
+        Executes a SQL query without blocking the event loop.
+
+        The blocking driver call runs on the dedicated MySQL executor, which has one
+        worker per pooled connection, so queries queue for a worker instead of failing
+        on pool exhaustion. A worker holds exactly one connection for the duration of
+        one statement, so callers running several statements concurrently (e.g. a page
+        and its count) can never deadlock waiting for each other's connections.
+        Concurrent identical queries share one execution. The wait is bounded by the
+        request deadline, and a statement nobody waits for any more is killed.
+        The result contract is the same as Execute_Query.
+
+        Parameters:
+            sql_query (str): The SQL query to execute.
+            params (tuple|None): Optional parameters for parameterized queries.
+            columnar (bool): Return the columnar result format.
+
+        Returns:
+            list[dict] | dict: Same as Execute_Query.
+        """
+        cache_key = QueryResultCache.make_key(sql_query, params, columnar)
+        cached = self.result_cache.get(cache_key)
+        if cached is not MISSING:
+            return cached
+
+        # The request deadline bounds the wait; once every caller of the shared
+        # execution is gone, the running statement is killed
+        return await bounded(self.query_flight.do(
+            cache_key,
+            lambda: self._execute_cancellable(sql_query, params, columnar)
+        ))
+
+    async def _execute_cancellable(self, sql_query: str, params, columnar: bool):
+        """
+        Runs Execute_Query on the executor. If cancelled, a queued query never starts
+        and a running one is stopped with KILL QUERY on a side connection.
+        """
+        loop = asyncio.get_running_loop()
+        running = RunningQuery()
+        submitted = time.perf_counter()
+        try:
+            return await loop.run_in_executor(
+                self.executor, self._execute_queued, submitted, sql_query, params, columnar, running
+            )
+        except asyncio.CancelledError:
+            # Killing may need a fresh connection, so it must not wait behind the MySQL executor
+            loop.run_in_executor(None, self.kill_query, running)
+            raise
+
+    def _execute_queued(self, submitted: float, sql_query: str, params, columnar: bool,
+                        running: RunningQuery | None = None):
+        """
+        Runs Execute_Query on an executor worker, recording how long it waited for one.
+        Execute_Query_Async has already counted the result-cache lookup.
+        """
+        POOL_WAIT_SECONDS.observe(time.perf_counter() - submitted)
+        return self.Execute_Query(sql_query, params, columnar, running, count_cache_lookup=False)
+
+    def kill_query(self, running: RunningQuery) -> None:
+        """
+        Marks the query cancelled and, if its statement is executing, stops it with
+        KILL QUERY on a separate connection. The worker then returns its pooled
+        connection as usual.
+        """
+        with running.lock:
+            running.cancelled = True
+            if running.connection_id is None:
+                return
+            side_connection = None
+            try:
+                side_connection = self._connect()
+                cursor = side_connection.cursor()
+                cursor.execute(f"KILL QUERY {int(running.connection_id)}")
+                cursor.close()
+                logger.info(f"Killed abandoned query on connection {running.connection_id}.")
+            except (Exception, Error) as e:
+                logger.warning(f"Could not kill query on connection {running.connection_id}: {e}")
+            finally:
+                if side_connection:
+                    side_connection.close()
+
+    def invalidate_tables(self, tables: Iterable[str]) -> int:
+        """
+        Drops cached results of every query that reads any of the given tables.
+        Call after the tables' data changes outside of their TTL.
+        """
+        return self.result_cache.invalidate_tables(tables)
+
     def close_pool(self):
         """
-        Closes the connection pool by dereferencing it.
+        Stops the query executor, then drains the connection pool: waits up to
+        POOL_DRAIN_TIMEOUT for checked-out connections and closes every socket.
         Intended to be called during application shutdown or cleanup.
         """
+        self.executor.shutdown(wait=True)
+        if self.pool:
+            self.pool.close(drain_timeout=settings.POOL_DRAIN_TIMEOUT)
         self.pool = None
         logger.info("MySQL connection pool closed.")
\ No newline at end of file
@@ -0,0 +1,191 @@
+import base64
+import glob
+import hashlib
+import hmac
+import json
+import os
+import re
+from dataclasses import dataclass
+from services.configuration.config import settings
+from services.configuration.logger import get_logger
+from sqlglot import exp
+from services.sql_utils import DIALECT, single_table_select
+
+# Initialize logger for keyset pagination
+logger = get_logger("PaginationLogger")
+
+# Directory holding the schema descriptions the primary keys are read from
+SCHEMA_TEXT_DIR = os.path.join(os.path.dirname(__file__), "configuration", "schema_text")
+
+def load_primary_keys(schema_dir: str = SCHEMA_TEXT_DIR) -> dict[str, str]:
+    """
+    Reads the primary key column of each table from the schema description files.
+
+    Returns:
+        dict[str, str]: Upper-cased table name mapped to its primary key column.
+    """
+    primary_keys = {}
+    for path in sorted(glob.glob(os.path.join(schema_dir, "*.txt"))):
+        with open(path, encoding="utf-8") as schema_file:
+            text = schema_file.read()
+        table = re.search(r'^Table\s+\d+:\s*(\w+)', text, re.MULTILINE)
+        key = re.search(r'^\s*-\s*(\w+)\s*\([^)]*PRIMARY KEY[^)]*\)', text, re.MULTILINE)
+        if table and key:
+            primary_keys[table.group(1).upper()] = key.group(1)
+    return primary_keys
+
+PRIMARY_KEYS = load_primary_keys()
+
+@dataclass
+class KeysetPlan:
+    """
+    A keyset-paginated form of a generated query: the query without its ORDER BY,
+    the ordering key columns (unique as a whole) and the sort direction.
+    """
+    base_sql: str
+    key_columns: list[str]
+    direction: str
+
+    def page_query(self, after: list | None, limit: int) -> tuple[str, tuple]:
+        """
+        Builds the SQL and parameters for the page following the `after` key values.
+
+        Args:
+            after (list|None): Key values of the last row of the previous page, or None for the first page.
+            limit (int): Page size.
+
+        Returns:
+            tuple[str, tuple]: The page SQL and its parameters.
+        """
+        order_by = ", ".join(f"keyset_page.`{column}` {self.direction}" for column in self.key_columns)
+        base_sql, where, params = self.base_sql, "", ()
+
+        if after is not None:
+            # Expanded row comparison: (k1 > v1) OR (k1 = v1 AND k2 > v2) ...
+            branches = []
+            for i, column in enumerate(self.key_columns):
+                equal, branch_params = [], ()
+                for c, value in zip(self.key_columns[:i], after[:i]):
+                    if value is None:
+                        equal.append(f"keyset_page.`{c}` IS NULL")
+                    else:
+                        equal.append(f"keyset_page.`{c}` = %s")
+                        branch_params += (value,)
+                beyond = self._beyond(column, after[i])
+                if beyond is None:
+                    continue
+                condition, value_params = beyond
+                branches.append("(" + " AND ".join(equal + [condition]) + ")")
+                params += branch_params + value_params
+            where = " WHERE " + (" OR ".join(branches) if branches else "FALSE")
+            # Literal percent signs (e.g. LIKE patterns) must be escaped once parameters are bound
+            base_sql = base_sql.replace("%", "%%")
+
+        return (
+            f"SELECT * FROM ({base_sql}) AS keyset_page{where} ORDER BY {order_by} LIMIT {int(limit)}",
+            params
+        )
+
+    def _beyond(self, column: str, value) -> tuple[str, tuple] | None:
+        """
+        Returns the condition (and its parameters) for a column value sorting after
+        `value`, or None if none can. MySQL sorts NULLs first in ascending and last in
+        descending order, and a plain comparison with NULL matches no row.
+        """
+        if self.direction == "DESC":
+            if value is None:
+                return None
+            return f"(keyset_page.`{column}` < %s OR keyset_page.`{column}` IS NULL)", (value,)
+        if value is None:
+            return f"keyset_page.`{column}` IS NOT NULL", ()
+        return f"keyset_page.`{column}` > %s", (value,)
+
+    def next_after(self, last_row: dict) -> list | None:
+        """
+        Returns the key values of the last row of a page, or None if a key column is
+        not among the row's columns. Key columns are named as written in the query, so
+        they are matched against the result's columns case-insensitively.
+        """
+        columns = {str(column).upper(): column for column in last_row}
+        after = []
+        for column in self.key_columns:
+            if column.upper() not in columns:
+                logger.warning(f"Keyset column '{column}' not found in the result columns; no cursor issued.")
+                return None
+            after.append(last_row[columns[column.upper()]])
+        return after
+
+def keyset_plan(sql_query: str) -> KeysetPlan | None:
+    """
+    Finds a stable ordering key for a generated query.
+
+    The key is the table's primary key, preceded by the query's own ORDER BY column
+    when there is one. Only single-table scans whose output includes the key columns
+    qualify; other shapes return None and are paged with LIMIT/OFFSET.
+
+    Args:
+        sql_query (str): The generated SQL without pagination.
+
+    Returns:
+        KeysetPlan | None: The keyset plan, or None if no stable key is available.
+    """
+    scan = single_table_select(sql_query)
+    if scan is None:
+        return None
+    tree, table_name = scan
+    primary_key = PRIMARY_KEYS.get(table_name.upper())
+    if not primary_key or tree.args.get("limit"):
+        return None
+
+    key_columns = [primary_key]
+    direction = "ASC"
+    base_sql = sql_query
+    order = tree.args.get("order")
+    if order:
+        # Only a single plain column can be extended into a unique key
+        if len(order.expressions) != 1 or not isinstance(order.expressions[0].this, exp.Column):
+            return None
+        ordered = order.expressions[0]
+        direction = "DESC" if ordered.args.get("desc") else "ASC"
+        if ordered.this.name.upper() != primary_key.upper():
+            key_columns.insert(0, ordered.this.name)
+        base = tree.copy()
+        base.set("order", None)
+        base_sql = base.sql(dialect=DIALECT)
+
+    output_columns = {projection.alias_or_name.upper() for projection in tree.expressions}
+    if not any(projection.is_star for projection in tree.expressions) and not all(
+        column.upper() in output_columns for column in key_columns
+    ):
+        return None
+
+    return KeysetPlan(base_sql=base_sql, key_columns=key_columns, direction=direction)
+
+def _cursor_key() -> bytes:
+    return (settings.CURSOR_SECRET or settings.API_KEY).encode("utf-8")
+
+def encode_cursor(payload: dict) -> str:
+    """
+    Serializes and signs a cursor payload into an opaque token.
+    The signature prevents clients from tampering with the embedded SQL.
+    """
+    body = base64.urlsafe_b64encode(json.dumps(payload, default=str).encode("utf-8")).decode("ascii")
+    signature = hmac.new(_cursor_key(), body.encode("ascii"), hashlib.sha256).hexdigest()
+    return f"{body}.{signature}"
+
+def decode_cursor(token: str) -> dict:
+    """
+    Verifies and deserializes a cursor token.
+
+    Raises:
+        ValueError: If the token is malformed or its signature does not match.
+    """
+    try:
+        body, signature = token.rsplit(".", 1)
+    except ValueError:
+        raise ValueError("Malformed pagination cursor.")
+
+    expected = hmac.new(_cursor_key(), body.encode("ascii"), hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(signature, expected):
+        raise ValueError("Invalid pagination cursor signature.")
+    return json.loads(base64.urlsafe_b64decode(body.encode("ascii")))
@@ -0,0 +1,207 @@
+import re
+from dataclasses import dataclass, field
+from services.cache import TTLCache, MISSING
+from services.configuration.config import settings
+from services.configuration.logger import get_logger
+from services.deadline import DeadlineExceeded
+from services.metrics import GOVERNOR_DECISIONS, register_cache
+
+# Initialize logger for the pre-execution cost governor
+logger = get_logger("QueryGovernorLogger")
+
+# Table of the EXPLAIN row that merges UNION branches, e.g. `<union1,2,3>`
+_UNION_RESULT = re.compile(r'^<union([\d,]+)')
+
+# Leading SELECT of a statement (optionally inside the parenthesis of a UNION branch)
+_LEADING_SELECT = re.compile(r'^\s*\(?\s*SELECT\b', re.IGNORECASE)
+
+def add_execution_hint(sql_query: str, max_execution_ms: int | None) -> str:
+    """
+    Adds a `/*+ MAX_EXECUTION_TIME(ms) */` optimizer hint after the statement's first SELECT,
+    so MySQL aborts the statement once the budget is spent.
+
+    Args:
+        sql_query (str): The statement to be executed.
+        max_execution_ms (int|None): Time budget in milliseconds; None or 0 leaves the SQL unchanged.
+
+    Returns:
+        str: The statement with the hint.
+    """
+    if not max_execution_ms or "MAX_EXECUTION_TIME" in sql_query.upper():
+        return sql_query
+    match = _LEADING_SELECT.match(sql_query)
+    if not match:
+        return sql_query
+    return f"{sql_query[:match.end()]} /*+ MAX_EXECUTION_TIME({int(max_execution_ms)}) */{sql_query[match.end():]}"
+
+@dataclass
+class GovernorDecision:
+    """
+    The governor's verdict on one generated query.
+
+    `action` is one of:
+        accept  - cheap enough, executed as is (with the time budget hint)
+        tag     - executed, but the plan shows warning signs listed in `tags`
+        estimate_count - executed, but its total count is the plan estimate instead of a COUNT(*) query
+        reject  - not executed
+    """
+    action: str
+    estimated_rows: int | None = None
+    estimated_result_rows: int | None = None
+    tags: list[str] = field(default_factory=list)
+    reason: str | None = None
+    max_execution_ms: int | None = None
+
+    @property
+    def rejected(self) -> bool:
+        return self.action == "reject"
+
+    def apply(self, sql_query: str) -> str:
+        """
+        Returns the statement with this decision's execution time budget.
+        """
+        return add_execution_hint(sql_query, self.max_execution_ms)
+
+    def report(self) -> dict:
+        """
+        Returns the decision as reported in API responses.
+        """
+        report = {"decision": self.action, "estimated_rows": self.estimated_rows, "tags": self.tags}
+        if self.reason:
+            report["reason"] = self.reason
+        return report
+
+def estimate_plan(plan: list[dict]) -> tuple[int, int, list[str], bool]:
+    """
+    Estimates the cost of a tabular MySQL EXPLAIN.
+
+    Within each SELECT (EXPLAIN `id`), tables are joined as nested loops: each table is
+    examined once per row produced by the tables before it. SELECTs of a UNION or
+    subquery add up. The result rows are those of the outer SELECT or, for a UNION,
+    the sum of its top-level branches (an upper bound when the UNION removes duplicates).
+
+    Args:
+        plan (list[dict]): EXPLAIN rows (id, table, type, ref, rows, filtered, Extra).
+
+    Returns:
+        tuple: (estimated rows examined, estimated result rows of the outer SELECT,
+                warning tags, whether a join has no join condition at all).
+    """
+    selects: dict = {}
+    for row in plan:
+        selects.setdefault(row.get("id"), []).append(row)
+
+    # A top-level UNION lists its branches in the UNION RESULT row that includes SELECT 1
+    outer_ids = {1}
+    for row in plan:
+        union = _UNION_RESULT.match(str(row.get("table") or ""))
+        if union:
+            branch_ids = {int(select_id) for select_id in union.group(1).split(",") if select_id}
+            if 1 in branch_ids:
+                outer_ids = branch_ids
+
+    examined, result_rows, tags, cartesian = 0, 0, [], False
+    for select_id, rows in selects.items():
+        produced = 1.0
+        for position, row in enumerate(rows):
+            table_rows = float(row.get("rows") or 0)
+            extra = row.get("Extra") or ""
+            examined += produced * table_rows
+
+            if row.get("type") == "ALL" and table_rows >= settings.GOVERNOR_TAG_ROWS:
+                tags.append(f"full_scan:{row.get('table')}")
+            if position > 0 and row.get("type") == "ALL" and not row.get("ref") and "join buffer" in extra \
+                    and "Using where" not in extra:
+                cartesian = True
+                tags.append(f"cartesian_join:{row.get('table')}")
+            if "Using filesort" in extra and "filesort" not in tags:
+                tags.append("filesort")
+            if "Using temporary" in extra and "temporary" not in tags:
+                tags.append("temporary")
+
+            produced *= max(table_rows * float(row.get("filtered") or 100) / 100, 1.0)
+        if select_id in outer_ids:
+            result_rows += produced
+
+    return int(examined), int(result_rows), tags, cartesian
+
+class QueryGovernor:
+    """
+    Reviews generated SQL with EXPLAIN before it runs.
+
+    The plan of each distinct query is read once and its decision cached. Queries
+    estimated to examine more than GOVERNOR_REJECT_ROWS rows, or joining without any
+    join condition beyond GOVERNOR_CARTESIAN_REJECT_ROWS, are rejected. Queries above
+    GOVERNOR_ESTIMATE_COUNT_ROWS run unchanged, but their total count is the plan estimate.
+    Plans with full scans, filesorts or temporary tables are tagged. Every query that
+    runs gets a MAX_EXECUTION_TIME hint of GOVERNOR_MAX_EXECUTION_MS.
+    """
+    def __init__(self, db):
+        """
+        Args:
+            db (MysqlDB): Database used to run EXPLAIN.
+        """
+        self.db = db
+        self.cache = TTLCache(max_size=settings.GOVERNOR_CACHE_SIZE, ttl=settings.GOVERNOR_CACHE_TTL)
+        register_cache("governor", self.cache.stats)
+
+    async def review(self, sql_query: str, params=None) -> GovernorDecision:
+        """
+        Returns the governor's decision for a generated query (before pagination).
+
+        Args:
+            sql_query (str): The generated SQL.
+            params (tuple|None): Optional parameters of the query.
+
+        Returns:
+            GovernorDecision: The decision; always "accept" when the governor is disabled.
+        """
+        if not settings.GOVERNOR_ENABLED:
+            return GovernorDecision(action="accept")
+
+        cache_key = (sql_query, tuple(params or ()))
+        decision = self.cache.get(cache_key)
+        if decision is MISSING:
+            decision = await self._decide(sql_query, params)
+            self.cache.set(cache_key, decision)
+        GOVERNOR_DECISIONS.labels(decision.action).inc()
+        return decision
+
+    async def _decide(self, sql_query: str, params) -> GovernorDecision:
+        budget = settings.GOVERNOR_MAX_EXECUTION_MS
+        try:
+            plan = await self.db.Execute_Query_Async(f"EXPLAIN {sql_query}", params)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            # The query itself is likely invalid; let execution report the error, under the time budget
+            logger.warning(f"EXPLAIN failed, executing unreviewed: {e}")
+            return GovernorDecision(action="accept", tags=["unexplained"], max_execution_ms=budget)
+
+        examined, result_rows, tags, cartesian = estimate_plan(plan or [])
+
+        if examined > settings.GOVERNOR_REJECT_ROWS:
+            reason = f"estimated {examined} rows examined exceeds the limit of {settings.GOVERNOR_REJECT_ROWS}"
+        elif cartesian and examined > settings.GOVERNOR_CARTESIAN_REJECT_ROWS:
+            reason = f"join without a join condition examines an estimated {examined} rows"
+        else:
+            reason = None
+
+        if reason:
+            logger.warning(f"Governor rejected query ({reason}): {sql_query}")
+            return GovernorDecision(action="reject", estimated_rows=examined, tags=tags, reason=reason)
+
+        if examined > settings.GOVERNOR_ESTIMATE_COUNT_ROWS:
+            action = "estimate_count"
+            reason = "total count estimated from the query plan"
+        else:
+            action = "tag" if tags else "accept"
+        logger.info(f"Governor decision {action} (estimated {examined} rows examined).")
+        return GovernorDecision(
+            action=action,
+            estimated_rows=examined,
+            estimated_result_rows=result_rows,
+            tags=tags,
+            reason=reason,
+            max_execution_ms=budget
+        )
@@ -0,0 +1,138 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable
+from services.cache import MISSING
+from services.configuration.logger import get_logger
+from services.sql_utils import referenced_tables
+
+# Initialize logger for the query-result cache
+logger = get_logger("ResultCacheLogger")
+
+def estimate_size(value) -> int:
+    """
+    Approximates the memory footprint of a query result in bytes.
+    """
+    if value is None:
+        return 0
+    if isinstance(value, dict):
+        if "rows" in value and "columns" in value:
+            return estimate_size(value["columns"]) + estimate_size(value["rows"])
+        return sys.getsizeof(value) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(
+            estimate_size(item) if isinstance(item, (list, tuple, dict)) else sys.getsizeof(item)
+            for item in value
+        )
+    return sys.getsizeof(value)
+
+class QueryResultCache:
+    """
+    A thread-safe cache of query results keyed by the exact SQL text and parameters.
+
+    The cache is bounded by the estimated total size of its results rather than by entry
+    count, evicting least recently used results first. Each entry's TTL is the shortest
+    TTL of the tables it reads, and entries can be invalidated by table name.
+    """
+    def __init__(self, max_bytes: int, default_ttl: float, table_ttls: dict[str, float] | None = None):
+        """
+        Args:
+            max_bytes (int): Maximum estimated size of all cached results.
+            default_ttl (float): TTL in seconds for tables without a specific TTL.
+            table_ttls (dict|None): Per-table TTLs in seconds, keyed by table name.
+        """
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.table_ttls = {table.upper(): ttl for table, ttl in (table_ttls or {}).items()}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._tables: dict[str, set] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(sql_query: str, params=None, columnar: bool = False) -> tuple:
+        return (sql_query, tuple(params or ()), columnar)
+
+    def get(self, key: tuple, count: bool = True):
+        """
+        Returns the cached result for the key, or MISSING if absent or expired.
+        Pass `count=False` for a repeated lookup whose first lookup was already counted.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                if count:
+                    self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            if count:
+                self.hits += 1
+            return entry[1]
+
+    def set(self, key: tuple, result) -> None:
+        """
+        Caches a result, evicting least recently used results to stay within max_bytes.
+        Results larger than a quarter of the budget are not cached.
+        """
+        size = estimate_size(result)
+        if size > self.max_bytes // 4:
+            return
+
+        tables = referenced_tables(key[0])
+        ttl = min((self.table_ttls.get(table, self.default_ttl) for table in tables), default=self.default_ttl)
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, result, size, tables)
+            self.total_bytes += size
+            for table in tables:
+                self._tables.setdefault(table, set()).add(key)
+
+            while self.total_bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_tables(self, tables: Iterable[str]) -> int:
+        """
+        Drops every cached result that reads any of the given tables.
+
+        Returns:
+            int: Number of invalidated entries.
+        """
+        with self._lock:
+            keys = set().union(*(self._tables.get(table.upper(), set()) for table in tables))
+            for key in keys:
+                self._remove(key)
+        logger.info(f"Invalidated {len(keys)} cached results for tables: {', '.join(tables)}")
+        return len(keys)
+
+    def _remove(self, key: tuple) -> None:
+        # Caller must hold the lock
+        _, _, size, tables = self._entries.pop(key)
+        self.total_bytes -= size
+        for table in tables:
+            keys = self._tables.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tables[table]
+
+    def stats(self) -> dict:
+        """
+        Returns the cache size in entries and bytes, and hit/miss counters.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
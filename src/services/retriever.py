@@ -2,43 +2,154 @@ from services.configuration.config import settings
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from pinecone import Pinecone
 import asyncio
+from services.cache import TTLCache, MISSING
+from services.single_flight import SingleFlight
+from services.deadline import bounded
+from services.metrics import SCHEMA_LOOKUPS, register_cache, stage_timer
+from services.schema_catalog import get_schema_catalog
+from services.local_index import LocalVectorIndex, DEFAULT_INDEX_PATH
 from services.configuration.logger import get_logger
 
 # Initialize logger for schema retrieval operations
 logger = get_logger("SchemaRetrievalLogger") 
 
+# Process-wide retriever, created once by the application lifespan
+_retriever = None
+
+# Concurrent identical embedding and retrieval calls share one pending future
+_embedding_flight = SingleFlight("embedding")
+_retrieval_flight = SingleFlight("retrieval")
+
+def normalize_query(query: str) -> str:
+    """
+    Normalizes query text for cache keys by folding case and collapsing whitespace.
+    """
+    return " ".join(query.lower().split())
+
 class SemanticSearchHelper:
     """
     A helper class that performs semantic search operations using Pinecone
-    and Google Generative AI embeddings for retrieving schema-relevant context.
+    (or the in-process local index) and Google Generative AI embeddings
+    for retrieving schema-relevant context.
     """
     def __init__(self):
         """
-        Initialize the Pinecone client, index, and the embedding model.
+        Initialize the vector index selected by RETRIEVAL_BACKEND and the embedding model.
         """
-        # Instantiate Pinecone client and index
-        self.pc = Pinecone(settings.PINECONE_API_KEY)
-        self.index = self.pc.Index(settings.INDEX_NAME)
+        if settings.RETRIEVAL_BACKEND == "local":
+            # Memory-mapped local index, no network hop per search
+            self.index = LocalVectorIndex.load(settings.LOCAL_INDEX_PATH or DEFAULT_INDEX_PATH)
+        else:
+            # Instantiate Pinecone client and index
+            self.pc = Pinecone(settings.PINECONE_API_KEY)
+            self.index = self.pc.Index(settings.INDEX_NAME)
 
         self.embeddings = GoogleGenerativeAIEmbeddings(
             model="models/gemini-embedding-exp-03-07",
             task_type="semantic_similarity"
         )
 
-    def semantic_search(self, query: str, top_k: int = 4) -> list:
+        # Bounded LRU+TTL cache of query embeddings keyed on normalized query text
+        self.embedding_cache = TTLCache(
+            max_size=settings.EMBEDDING_CACHE_SIZE,
+            ttl=settings.EMBEDDING_CACHE_TTL
+        )
+        register_cache("embedding", self.embedding_cache.stats)
+
+    def warm_up(self):
         """
-        Performs a semantic similarity search in the Pinecone index.
+        Opens the index connection and primes the embedding client so that
+        the first user request does not pay the connection setup cost.
+        """
+        try:
+            self.index.describe_index_stats()
+            self.embed_query("warm up")
+            logger.info("Schema retriever warmed up.")
+        except Exception as e:
+            logger.warning(f"Schema retriever warm-up failed: {e}")
+
+    def embed_query(self, query: str) -> list[float]:
+        """
+        Returns the embedding of the query, served from the cache when the
+        same normalized text was embedded recently.
+
+        Args:
+            query (str): The user's natural language query.
+
+        Returns:
+            list[float]: The query embedding vector.
+        """
+        return self._embed(query, count_cache_lookup=True)
+
+    def _embed(self, query: str, count_cache_lookup: bool) -> list[float]:
+        """
+        Implements embed_query; `count_cache_lookup` is False when the caller already
+        counted its embedding-cache lookup.
+        """
+        key = normalize_query(query)
+        embedding = self.embedding_cache.get(key, count=count_cache_lookup)
+        if embedding is not MISSING:
+            logger.debug(f"Embedding cache hit for query: {query}")
+            return embedding
+
+        embedding = self.embeddings.embed_query(key)
+        self.embedding_cache.set(key, embedding)
+        return embedding
+
+    async def aembed_query(self, query: str) -> list[float]:
+        """
+        Async variant of embed_query. Cache misses run off the event loop, and
+        concurrent misses for the same normalized text share one embedding call.
+        """
+        key = normalize_query(query)
+        embedding = self.embedding_cache.get(key)
+        if embedding is not MISSING:
+            return embedding
+        with stage_timer("embedding"):
+            return await _embedding_flight.do(key, lambda: asyncio.to_thread(self._embed, query, False))
+
+    async def aembed_queries(self, queries: list[str]) -> list[list[float]]:
+        """
+        Embeds many queries at once. Queries missing from the cache are embedded
+        with a single batched `embed_documents` call and then cached, so later
+        per-query lookups are served from memory.
+
+        Args:
+            queries (list[str]): Natural language queries.
+
+        Returns:
+            list[list[float]]: One embedding per query, in input order.
+        """
+        keys = [normalize_query(query) for query in queries]
+        embeddings = {key: self.embedding_cache.get(key) for key in keys}
+        missing = list(dict.fromkeys(key for key, embedding in embeddings.items() if embedding is MISSING))
+
+        if missing:
+            logger.info(f"Embedding {len(missing)} queries in one batch.")
+            with stage_timer("embedding_batch"):
+                vectors = await asyncio.to_thread(self.embeddings.embed_documents, missing)
+            for key, vector in zip(missing, vectors):
+                self.embedding_cache.set(key, vector)
+                embeddings[key] = vector
+
+        return [embeddings[key] for key in keys]
+
+    def semantic_search(self, query: str, top_k: int = 4, query_embedding: list[float] | None = None) -> list:
+        """
+        Performs a semantic similarity search in the configured vector index.
 
         Args:
             query (str): The user's natural language query.
             top_k (int): Number of top matching results to retrieve.
+            query_embedding (list[float]|None): Precomputed embedding of the query, if available.
 
         Returns:
             list: List of metadata from top-k matching documents.
         """
         try:
-            logger.debug(f"Embedding query for semantic search: {query}")
-            query_embedding = self.embeddings.embed_query(query)
+            if query_embedding is None:
+                logger.debug(f"Embedding query for semantic search: {query}")
+                query_embedding = self.embed_query(query)
 
             response = self.index.query(
                 vector=query_embedding,
@@ -47,7 +158,7 @@ class SemanticSearchHelper:
             )
 
             matches = response.get('matches', [])
-            logger.info(f"Found {len(matches)} results from Pinecone for query: '{query}'")
+            logger.info(f"Found {len(matches)} results from {settings.RETRIEVAL_BACKEND} index for query: '{query}'")
 
             return [match['metadata'] for match in matches]
 
@@ -78,20 +189,77 @@ class SemanticSearchHelper:
         return cleaned_text
 
 
+def init_retriever() -> SemanticSearchHelper:
+    """
+    Creates and warms up the process-wide retriever.
+    Called once from the application lifespan on startup.
+    """
+    global _retriever
+    if _retriever is None:
+        logger.info("Initializing process-wide schema retriever.")
+        _retriever = SemanticSearchHelper()
+        _retriever.warm_up()
+    return _retriever
+
+def get_retriever() -> SemanticSearchHelper:
+    """
+    Returns the process-wide retriever, creating it lazily if the lifespan has not run.
+    """
+    return _retriever or init_retriever()
+
 async def get_schema_context_from_rag(query: str) -> str:
     """
-    Retrieves schema-relevant context using semantic search with RAG.
+    Retrieves schema-relevant context for a query (see retrieve_schema_context).
+    """
+    schema_context, _ = await retrieve_schema_context(query)
+    return schema_context
+
+def matches_lexically(query: str) -> bool:
+    """
+    Returns whether the schema catalog names the query's tables unambiguously, in which
+    case retrieve_schema_context answers it without an embedding.
+    """
+    catalog = get_schema_catalog()
+    return catalog is not None and bool(catalog.match(query))
+
+async def retrieve_schema_context(query: str) -> tuple[str, str]:
+    """
+    Retrieves schema-relevant context for a query, and how it was found.
+
+    Questions that name their tables unambiguously are answered from the local schema
+    catalog without any remote call. Otherwise the context comes from semantic search
+    with RAG; concurrent requests for the same normalized query share one retrieval,
+    and the wait is bounded by the request deadline.
 
     Args:
         query (str): The natural language query for which to fetch schema context.
 
     Returns:
-        str: Combined and cleaned schema information retrieved from Pinecone.
+        tuple[str, str]: Combined and cleaned schema information of the relevant tables,
+        and the lookup path, "lexical" or "embedding".
+    """
+    catalog = get_schema_catalog()
+    if catalog is not None:
+        with stage_timer("schema_lookup"):
+            tables = catalog.match(query)
+        if tables:
+            SCHEMA_LOOKUPS.labels("lexical").inc()
+            logger.info(f"Schema context for query '{query}' matched lexically: {', '.join(tables)}")
+            return "\n".join(SemanticSearchHelper.clean_rag_text(catalog.describe(table)) for table in tables), "lexical"
+
+    SCHEMA_LOOKUPS.labels("embedding").inc()
+    return await bounded(_retrieval_flight.do(normalize_query(query), lambda: _retrieve_schema_context(query))), "embedding"
+
+async def _retrieve_schema_context(query: str) -> str:
+    """
+    Embeds the query and runs the vector search for retrieve_schema_context.
     """
-    helper = SemanticSearchHelper()
+    helper = get_retriever()
 
     logger.info(f"Starting retrieval of schema context for query: '{query}'")
-    results = await asyncio.to_thread(helper.semantic_search, query)
+    query_embedding = await helper.aembed_query(query)
+    with stage_timer("vector_search"):
+        results = await asyncio.to_thread(helper.semantic_search, query, 4, query_embedding)
 
     combined = "\n".join(
         helper.clean_rag_text(item['text']) for item in results if 'text' in item
@@ -0,0 +1,82 @@
+from services.cache import TTLCache, MISSING
+from services.configuration.config import settings
+from services.configuration.logger import get_logger
+from services.metrics import register_cache
+from services.query_governor import add_execution_hint
+from services.sql_utils import count_source_query, unfiltered_scan_table
+
+# Initialize logger for total-count computation
+logger = get_logger("RowCounterLogger")
+
+def build_count_query(sql_query: str, parameterized: bool = False) -> str:
+    """
+    Wraps the generated query in a derived table so the count honours its
+    WHERE clause, JOINs, UNIONs and GROUP BY exactly. The derived table selects a
+    constant instead of the query's columns where that leaves the row count unchanged.
+    """
+    return f"SELECT COUNT(*) AS total_count FROM ({count_source_query(sql_query, parameterized)}) AS count_source"
+
+class RowCounter:
+    """
+    Computes the total number of rows a generated query returns, for pagination metadata.
+
+    Counts are derived from the query itself, cached per (SQL, parameters) so that
+    paging through a result set does not recount, and optionally estimated from
+    `information_schema` statistics for unfiltered scans of very large tables.
+    """
+    def __init__(self, db):
+        """
+        Args:
+            db (MysqlDB): Database used to run count and statistics queries.
+        """
+        self.db = db
+        self.cache = TTLCache(max_size=settings.COUNT_CACHE_SIZE, ttl=settings.COUNT_CACHE_TTL)
+        register_cache("row_count", self.cache.stats)
+
+    async def _estimate(self, table_name: str) -> int | None:
+        """
+        Returns the optimizer's row estimate for a table, or None if it is unavailable.
+        """
+        result = await self.db.Execute_Query_Async(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            (table_name,)
+        )
+        if not result or result[0]["TABLE_ROWS"] is None:
+            return None
+        return int(result[0]["TABLE_ROWS"])
+
+    async def count(self, sql_query: str, params=None, max_execution_ms: int | None = None) -> tuple[int, bool]:
+        """
+        Returns the total row count of the (unpaginated) query.
+
+        Args:
+            sql_query (str): The generated SQL before LIMIT/OFFSET is applied.
+            params (tuple|None): Optional parameters of the query.
+            max_execution_ms (int|None): Optional MAX_EXECUTION_TIME budget for the count query.
+
+        Returns:
+            tuple[int, bool]: The row count and whether it is exact (False for estimates).
+        """
+        cache_key = (sql_query, tuple(params or ()))
+        cached = self.cache.get(cache_key)
+        if cached is not MISSING:
+            logger.debug(f"Count cache hit for query: {sql_query}")
+            return cached
+
+        counted = None
+        if settings.COUNT_MODE == "approximate":
+            table_name = unfiltered_scan_table(sql_query)
+            if table_name:
+                estimate = await self._estimate(table_name)
+                if estimate is not None and estimate >= settings.APPROX_COUNT_MIN_ROWS:
+                    logger.info(f"Using estimated row count {estimate} for table {table_name}.")
+                    counted = (estimate, False)
+
+        if counted is None:
+            count_query = add_execution_hint(build_count_query(sql_query, parameterized=bool(params)), max_execution_ms)
+            result = await self.db.Execute_Query_Async(count_query, params)
+            counted = (int(result[0]["total_count"]) if result else 0, True)
+
+        self.cache.set(cache_key, counted)
+        return counted
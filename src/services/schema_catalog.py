@@ -0,0 +1,266 @@
+import glob
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from services.configuration.config import settings
+from services.configuration.logger import get_logger
+from services.text_utils import tokenize
+
+# Initialize logger for schema introspection and lexical table matching
+logger = get_logger("SchemaCatalogLogger")
+
+# Curated table descriptions (the same files that are embedded for RAG)
+SCHEMA_TEXT_DIR = os.path.join(os.path.dirname(__file__), "configuration", "schema_text")
+
+# Header line of a description file, e.g. "Table 4: POINT_ORDER"
+_DESCRIPTION_HEADER = re.compile(r'^\s*Table\s+\d+\s*:\s*(\w+)', re.IGNORECASE)
+
+# Process-wide catalog, created once by the application lifespan
+_catalog = None
+
+@dataclass
+class ColumnInfo:
+    name: str
+    column_type: str
+    key: str = ""                  # PRI, UNI or MUL, as reported by information_schema
+    comment: str = ""
+    references: str | None = None  # "TABLE.COLUMN" for foreign keys
+
+@dataclass
+class TableInfo:
+    name: str
+    comment: str = ""
+    columns: list[ColumnInfo] = field(default_factory=list)
+
+    @property
+    def primary_key(self) -> list[str]:
+        return [column.name for column in self.columns if column.key == "PRI"]
+
+    def describe(self) -> str:
+        """
+        Renders the table in the layout of the curated schema descriptions.
+        """
+        lines = [f"Table: {self.name}"]
+        if self.comment:
+            lines.append(f"Description: {self.comment}")
+        lines.append("Columns:")
+        for column in self.columns:
+            attributes = [column.column_type.upper()]
+            if column.key == "PRI":
+                attributes.append("PRIMARY KEY")
+            if column.references:
+                attributes.append(f"FOREIGN KEY -> {column.references}")
+            line = f" - {column.name} ({', '.join(attributes)})"
+            lines.append(f"{line}: {column.comment}" if column.comment else line)
+        return "\n".join(lines)
+
+def load_descriptions(directory: str = SCHEMA_TEXT_DIR) -> dict[str, str]:
+    """
+    Reads the curated schema description files, keyed by upper-cased table name.
+    """
+    descriptions = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.txt"))):
+        with open(path, encoding="utf-8") as description_file:
+            text = description_file.read()
+        match = _DESCRIPTION_HEADER.match(text)
+        if match:
+            descriptions[match.group(1).upper()] = text
+    return descriptions
+
+class SchemaCatalog:
+    """
+    An in-memory copy of the database schema, read from `information_schema`, with an
+    inverted index from table names, column names and configured synonyms to tables.
+    Only the tables exposed to the LLM are loaded: those listed in `allowed_tables` or,
+    without a list, those with a curated description in schema_text/.
+
+    `match()` answers "which tables does this question mean?" without an embedding or
+    vector search when the question names its tables unambiguously. The catalog is
+    reloaded every SCHEMA_CATALOG_REFRESH_INTERVAL seconds by a background thread;
+    each load builds a new snapshot that replaces the previous one in a single
+    assignment, so lookups never see a half-built index.
+    """
+    def __init__(self, db, refresh_interval: float, synonyms: dict[str, list[str]] | None = None,
+                 allowed_tables: list[str] | None = None):
+        """
+        Args:
+            db (MysqlDB): Database whose schema is introspected.
+            refresh_interval (float): Seconds between reloads.
+            synonyms (dict|None): Extra words per table, e.g. {"POINT_ORDER": ["circuit"]}.
+            allowed_tables (list|None): Tables that may be matched; None or empty means the curated ones.
+        """
+        self.db = db
+        self.refresh_interval = refresh_interval
+        self.synonyms = {table.upper(): words for table, words in (synonyms or {}).items()}
+        self.descriptions = load_descriptions()
+        self.allowed_tables = {table.upper() for table in allowed_tables} if allowed_tables else set(self.descriptions)
+        self.loaded_at = None
+
+        # (tables, name words per table, name index, column index), replaced as a whole on every load
+        self._snapshot: tuple[dict, dict[str, set[str]], dict[str, set[str]], dict[str, set[str]]] = ({}, {}, {}, {})
+        self._stop = threading.Event()
+        self._refresher = threading.Thread(target=self._refresh_loop, name="schema-catalog-refresh", daemon=True)
+
+    @property
+    def tables(self) -> dict[str, TableInfo]:
+        return self._snapshot[0]
+
+    def start(self) -> None:
+        """
+        Loads the catalog and starts the periodic refresh.
+        """
+        self.load()
+        self._refresher.start()
+
+    def stop(self) -> None:
+        """
+        Stops the periodic refresh.
+        """
+        self._stop.set()
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            self.load()
+
+    def load(self) -> bool:
+        """
+        Reads tables, columns, keys and foreign keys of the current database and
+        rebuilds the index. On failure the previous snapshot is kept.
+
+        Returns:
+            bool: Whether the catalog was loaded.
+        """
+        try:
+            table_rows = self.db.Execute_Query(
+                "SELECT TABLE_NAME, TABLE_COMMENT FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_TYPE = 'BASE TABLE'"
+            ) or []
+            column_rows = self.db.Execute_Query(
+                "SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, COLUMN_KEY, COLUMN_COMMENT "
+                "FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() "
+                "ORDER BY TABLE_NAME, ORDINAL_POSITION"
+            ) or []
+            foreign_key_rows = self.db.Execute_Query(
+                "SELECT TABLE_NAME, COLUMN_NAME, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME "
+                "FROM information_schema.KEY_COLUMN_USAGE "
+                "WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME IS NOT NULL"
+            ) or []
+        except Exception as e:
+            logger.warning(f"Could not load the schema catalog: {e}")
+            return False
+
+        tables = {
+            row["TABLE_NAME"].upper(): TableInfo(name=row["TABLE_NAME"], comment=row["TABLE_COMMENT"] or "")
+            for row in table_rows
+            if row["TABLE_NAME"].upper() in self.allowed_tables
+        }
+        references = {
+            (row["TABLE_NAME"].upper(), row["COLUMN_NAME"].upper()):
+                f"{row['REFERENCED_TABLE_NAME']}.{row['REFERENCED_COLUMN_NAME']}"
+            for row in foreign_key_rows
+        }
+        for row in column_rows:
+            table = tables.get(row["TABLE_NAME"].upper())
+            if table is None:
+                continue
+            table.columns.append(ColumnInfo(
+                name=row["COLUMN_NAME"],
+                column_type=row["COLUMN_TYPE"] or "",
+                key=row["COLUMN_KEY"] or "",
+                comment=row["COLUMN_COMMENT"] or "",
+                references=references.get((row["TABLE_NAME"].upper(), row["COLUMN_NAME"].upper()))
+            ))
+
+        self._snapshot = (tables, *self._build_index(tables))
+        self.loaded_at = time.time()
+        logger.info(f"Schema catalog loaded: {len(tables)} tables, {sum(len(table.columns) for table in tables.values())} columns.")
+        return True
+
+    def _build_index(self, tables: dict[str, TableInfo]) -> tuple[dict, dict, dict]:
+        """
+        Maps each word of a table name or synonym, and each word of a column name,
+        to the tables it occurs in.
+        """
+        name_words = {key: tokenize(table.name) for key, table in tables.items()}
+        name_index: dict[str, set[str]] = {}
+        column_index: dict[str, set[str]] = {}
+        for key, table in tables.items():
+            for word in name_words[key].union(*(tokenize(s) for s in self.synonyms.get(key, []))):
+                name_index.setdefault(word, set()).add(key)
+            for column in table.columns:
+                for word in tokenize(column.name):
+                    column_index.setdefault(word, set()).add(key)
+        return name_words, name_index, column_index
+
+    def match(self, question: str) -> list[str] | None:
+        """
+        Returns the tables a question refers to, or None when the words are ambiguous.
+
+        A table is matched when the question contains a word that appears in that table's
+        name or synonyms and in no other table's, every word of its name, or a word found
+        in the column names of that table alone. Questions matching no table this way, or
+        more than SCHEMA_LEXICAL_MAX_TABLES tables, are left to the embedding search.
+
+        Args:
+            question (str): The natural language question.
+
+        Returns:
+            list[str]|None: Upper-cased table names in a stable order, or None.
+        """
+        tables, name_words, name_index, column_index = self._snapshot
+        if not tables:
+            return None
+
+        words = tokenize(question)
+        matched = set()
+        for word in words:
+            named = name_index.get(word, ())
+            if len(named) == 1:
+                matched |= named
+            elif not named and len(column_index.get(word, ())) == 1:
+                matched |= column_index[word]
+        matched |= {key for key, name in name_words.items() if name and name <= words}
+
+        if not matched or len(matched) > settings.SCHEMA_LEXICAL_MAX_TABLES:
+            return None
+        return sorted(matched)
+
+    def describe(self, table_key: str) -> str:
+        """
+        Returns the schema context of one table: its curated description if there is
+        one, otherwise the description rendered from information_schema.
+        """
+        return self.descriptions.get(table_key) or self.tables[table_key].describe()
+
+def init_schema_catalog(db) -> SchemaCatalog | None:
+    """
+    Creates, loads and starts refreshing the process-wide schema catalog.
+    Called once from the application lifespan on startup.
+    """
+    global _catalog
+    if not settings.SCHEMA_CATALOG_ENABLED:
+        return None
+    if _catalog is None:
+        logger.info("Initializing the schema catalog.")
+        _catalog = SchemaCatalog(
+            db, settings.SCHEMA_CATALOG_REFRESH_INTERVAL, settings.SCHEMA_SYNONYMS, settings.SCHEMA_CATALOG_TABLES
+        )
+        _catalog.start()
+    return _catalog
+
+def get_schema_catalog() -> SchemaCatalog | None:
+    """
+    Returns the process-wide schema catalog, or None if it is disabled or not started.
+    """
+    return _catalog
+
+def close_schema_catalog() -> None:
+    """
+    Stops the catalog refresh on shutdown.
+    """
+    global _catalog
+    if _catalog is not None:
+        _catalog.stop()
+        _catalog = None
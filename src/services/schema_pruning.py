@@ -0,0 +1,203 @@
+import re
+from dataclasses import dataclass, field
+from services.configuration.logger import get_logger
+from services.metrics import SCHEMA_CONTEXT_TOKENS
+from services.text_utils import tokenize
+
+# Initialize logger for schema context compaction
+logger = get_logger("SchemaPruningLogger")
+
+# "Table 4: POINT_ORDER" in the curated descriptions, "Table: POINT_ORDER" in catalog renderings
+_TABLE_HEADER = re.compile(r'^\s*Table(?:\s+\d+)?\s*:\s*(\w+)', re.IGNORECASE)
+
+# " - COMPLETED_DATE (DATETIME(6)): The date ..." / " - TASK_ID (BIGINT, FOREIGN KEY -> T.C)"
+_COLUMN_LINE = re.compile(r'^\s*-\s*(\w+)\s*\((.*?)\)\s*(?::\s*(.*))?$')
+
+# Example values quoted in a column description, e.g. "(e.g., pending, in-progress, completed)"
+_EXAMPLES = re.compile(r'\(e\.g\.,?\s*([^)]*)\)', re.IGNORECASE)
+
+# Question words asking for a date or time condition or ordering
+_TEMPORAL_WORDS = {
+    "latest", "recent", "oldest", "newest", "earliest", "last", "first", "when", "date", "time",
+    "today", "yesterday", "day", "week", "month", "year", "before", "after", "since", "between", "ago",
+}
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of prompt tokens of a text (about four characters per token).
+    """
+    return (len(text) + 3) // 4
+
+@dataclass
+class SchemaColumn:
+    name: str
+    data_type: str
+    primary_key: bool = False
+    foreign_key: bool = False
+    references: str | None = None
+    examples: list[str] = field(default_factory=list)
+
+    @property
+    def temporal(self) -> bool:
+        return self.data_type.startswith(("DATE", "TIME"))
+
+@dataclass
+class SchemaTable:
+    name: str
+    columns: list[SchemaColumn] = field(default_factory=list)
+
+def parse_schema_context(schema_context: str) -> list[SchemaTable] | None:
+    """
+    Parses retrieved schema chunks into tables and columns.
+
+    Returns:
+        list[SchemaTable]|None: The tables in retrieval order, or None if the text has
+        column lines outside any table (e.g. a chunk split mid-table) or no tables at all.
+    """
+    tables: dict[str, SchemaTable] = {}
+    current = None
+    for line in str(schema_context).splitlines():
+        header = _TABLE_HEADER.match(line)
+        if header:
+            current = tables.setdefault(header.group(1).upper(), SchemaTable(name=header.group(1)))
+            continue
+        column = _COLUMN_LINE.match(line)
+        if not column:
+            continue
+        if current is None:
+            return None
+        name, attributes, description = column.groups()
+        attributes = attributes.upper()
+        references = attributes.split("->", 1)[1].strip() if "->" in attributes else None
+        examples = _EXAMPLES.search(description or "")
+        current.columns.append(SchemaColumn(
+            name=name,
+            data_type=re.split(r'[\s,(]', attributes.strip(), 1)[0],
+            primary_key="PRIMARY KEY" in attributes,
+            foreign_key="FOREIGN KEY" in attributes,
+            references=references,
+            examples=[value.strip() for value in examples.group(1).split(",") if value.strip()] if examples else []
+        ))
+    return list(tables.values()) or None
+
+def prune_schema(tables: list[SchemaTable], question: str) -> list[SchemaTable] | None:
+    """
+    Keeps the tables and columns a question needs.
+
+    A table is kept when the question mentions a word of its name or, for tables the
+    question does not name, a word found only in its column names (e.g. "region").
+    Example values in column descriptions never select a table. Within a kept table
+    whose columns the question names, by column name or example value (ignoring the
+    words of the table's own name, so "orders" does not select every ORDER_* column of
+    POINT_ORDER, and neither do the words naming other tables), those columns are kept together with the primary key, foreign keys,
+    `_ID` columns shared with another kept table (join keys) and, for date/time
+    questions, the date/time columns. A table of which the question names no column
+    ("which tasks failed", "orders placed by Acme") keeps every column, since the
+    column it filters on cannot be known.
+
+    Returns:
+        list[SchemaTable]|None: The pruned tables, or None if no table matched.
+    """
+    words = tokenize(question)
+    temporal = bool(words & _TEMPORAL_WORDS)
+
+    # Words naming a table do not name columns ("order" in "tasks and their orders")
+    table_words = [tokenize(table.name) for table in tables]
+    naming_words = words & set().union(*table_words)
+
+    candidates = []
+    for table, own_words in zip(tables, table_words):
+        name_hits, example_hits = {}, {}
+        for column in table.columns:
+            name_hits[id(column)] = (tokenize(column.name) - own_words - naming_words) & words
+            example_hits[id(column)] = (set().union(*map(tokenize, column.examples)) - own_words - naming_words) & words
+        candidates.append((table, own_words & words, name_hits, example_hits))
+
+    # Words the named tables already account for do not pull in further tables
+    covered = set()
+    for _, named, name_hits, example_hits in candidates:
+        if named:
+            covered |= named.union(*name_hits.values(), *example_hits.values())
+    any_named = any(named for _, named, _, _ in candidates)
+    relevant = []
+    for table, named, name_hits, example_hits in candidates:
+        column_words = set().union(*name_hits.values())
+        if named or (column_words - covered if any_named else column_words):
+            relevant.append((table, name_hits, example_hits))
+    if not relevant:
+        return None
+
+    id_columns: dict[str, int] = {}
+    for table, _, _ in relevant:
+        for column in table.columns:
+            if column.name.upper().endswith("_ID"):
+                id_columns[column.name.upper()] = id_columns.get(column.name.upper(), 0) + 1
+
+    pruned = []
+    for table, name_hits, example_hits in relevant:
+        mentioned = {
+            id(column) for column in table.columns
+            if (name_hits[id(column)] or example_hits[id(column)])
+            and not (column.primary_key or column.foreign_key)
+        }
+        if not mentioned:
+            pruned.append(table)
+            continue
+        columns = [
+            column for column in table.columns
+            if id(column) in mentioned or column.primary_key or column.foreign_key
+            or id_columns.get(column.name.upper(), 0) > 1 or (temporal and column.temporal)
+        ]
+        pruned.append(SchemaTable(name=table.name, columns=columns))
+    return pruned
+
+def render_schema(tables: list[SchemaTable]) -> str:
+    """
+    Renders tables one per line: `TABLE(COLUMN TYPE [PK|FK[->T.C]] [e.g. a/b/c], ...)`.
+    """
+    lines = ["One table per line as TABLE(COLUMN TYPE ...); PK = primary key, FK = foreign key."]
+    for table in tables:
+        columns = []
+        for column in table.columns:
+            parts = [column.name, column.data_type]
+            if column.primary_key:
+                parts.append("PK")
+            if column.foreign_key or column.references:
+                parts.append(f"FK->{column.references}" if column.references else "FK")
+            if column.examples:
+                parts.append("e.g. " + "/".join(column.examples))
+            columns.append(" ".join(parts))
+        lines.append(f"{table.name}({', '.join(columns)})")
+    return "\n".join(lines)
+
+def compact_schema_context(question: str, schema_context: str) -> str:
+    """
+    Shrinks retrieved schema context to the tables and columns relevant to the question,
+    in the dense one-line-per-table format, and records the prompt-token reduction.
+    Context that cannot be parsed, or that no table of matches, is returned unchanged.
+
+    Args:
+        question (str): The natural language question.
+        schema_context (str): The schema context from retrieval.
+
+    Returns:
+        str: The schema context to put in the prompt.
+    """
+    before = estimate_tokens(str(schema_context))
+    tables = parse_schema_context(schema_context)
+    pruned = prune_schema(tables, question) if tables else None
+    compacted = render_schema(pruned) if pruned else str(schema_context)
+    after = estimate_tokens(compacted)
+
+    SCHEMA_CONTEXT_TOKENS.labels("retrieved").observe(before)
+    SCHEMA_CONTEXT_TOKENS.labels("prompt").observe(after)
+    if pruned:
+        kept = sum(len(table.columns) for table in pruned)
+        total = sum(len(table.columns) for table in tables)
+        logger.info(
+            f"Schema context compacted from ~{before} to ~{after} tokens "
+            f"({(before - after) / before:.0%} smaller, {kept}/{total} columns kept)."
+        )
+    else:
+        logger.info(f"Schema context left as retrieved (~{before} tokens): no table matched the question.")
+    return compacted
@@ -0,0 +1,171 @@
+import math
+import re
+import threading
+import numpy as np
+from services.cache import TTLCache, MISSING
+from services.configuration.logger import get_logger
+from services.text_utils import tokenize
+
+# Initialize logger for semantic SQL reuse
+logger = get_logger("SemanticCacheLogger")
+
+# Literal-like tokens (quoted strings, numbers/dates/IDs, capitalized names) that must match exactly
+_LITERAL_PATTERN = re.compile(r"'[^']*'|\"[^\"]*\"|\b\w*\d\w*(?:[-/:.]\w+)*\b|(?<=\s)[A-Z][\w-]*")
+
+# Words that flip the meaning of an otherwise similar question
+_NEGATION_WORDS = {"not", "no", "without", "except", "excluding", "never", "none", "exclude"}
+
+# Words that do not change what a question asks for (beyond the tokenizer's stop words)
+_FILLER_WORDS = {
+    "can", "data", "detail", "display", "each", "entire", "every", "fetch", "find", "how", "information",
+    "please", "record", "retrieve", "row", "see", "view", "want", "what", "which", "you",
+}
+
+# Words that ask for the same thing, folded to one spelling
+_SYNONYMS = {"newest": "latest", "recent": "latest", "many": "count", "number": "count"}
+
+def content_words(question: str) -> frozenset:
+    """
+    Returns the stemmed words of a question that carry meaning, with stop and filler
+    words removed and synonyms folded, so "show all orders" and "list every order"
+    agree while "status open" and "status closed" do not.
+    """
+    return frozenset(_SYNONYMS.get(word, word) for word in tokenize(question) if word not in _FILLER_WORDS)
+
+def question_signature(question: str) -> tuple[frozenset, bool, frozenset]:
+    """
+    Extracts the parts of a question that embeddings are poor at distinguishing:
+    its literal values, whether it is negated and its content words.
+
+    Args:
+        question (str): The natural language question.
+
+    Returns:
+        tuple: (set of literal tokens, negation flag, set of content words).
+    """
+    literals = frozenset(token.strip("'\"").lower() for token in _LITERAL_PATTERN.findall(question))
+    negated = bool(_NEGATION_WORDS & set(re.findall(r"[a-z]+", question.lower())))
+    return literals, negated, content_words(question)
+
+class SemanticSqlCache:
+    """
+    An in-memory nearest-neighbour store of previously translated questions.
+
+    Each entry holds a normalized question embedding, the schema fingerprint it was
+    translated against, its literal/negation signature and the validated SQL. A lookup
+    returns the stored SQL of the most similar question above the threshold, provided it
+    passes the false-reuse guards (same schema, same literals, same negation and the
+    same content words, so lower-case values such as "open"/"closed" or keywords such
+    as "ascending"/"descending" are never swapped).
+
+    Since a reuse requires the same content words, every translation is also indexed
+    by (schema fingerprint, signature): a question worded like a stored one is found
+    there first, without an embedding, which questions matched to their tables
+    lexically never compute.
+    """
+    def __init__(self, max_size: int, threshold: float):
+        """
+        Args:
+            max_size (int): Maximum number of stored questions; the oldest is replaced when full.
+            threshold (float): Minimum cosine similarity for reuse.
+        """
+        self.max_size = max_size
+        self.threshold = threshold
+        self._matrix: np.ndarray | None = None
+        self._entries: list[tuple[str, tuple[frozenset, bool, frozenset], str]] = []
+        self._next_slot = 0
+        self._by_wording = TTLCache(max_size=max_size, ttl=math.inf)
+        self._lock = threading.Lock()
+
+        self.lookups = 0
+        self.hits = 0
+        self.guard_rejections = {"schema": 0, "literals": 0, "negation": 0, "wording": 0}
+
+    @staticmethod
+    def _normalize(embedding: list[float]) -> np.ndarray:
+        vector = np.array(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, question: str, embedding: list[float] | None, fingerprint: str) -> str | None:
+        """
+        Returns the SQL of a stored near-duplicate question, or None.
+
+        Args:
+            question (str): The incoming natural language question.
+            embedding (list[float]|None): Embedding of the question; None looks up the wording only.
+            fingerprint (str): Fingerprint of the schema context for this question.
+
+        Returns:
+            str | None: Reusable SQL if a similar enough question passes all guards.
+        """
+        signature = question_signature(question)
+        with self._lock:
+            self.lookups += 1
+            sql = self._by_wording.get((fingerprint, signature))
+            if sql is not MISSING:
+                self.hits += 1
+                logger.info("Reusing SQL of a question with the same wording.")
+                return sql
+            if embedding is None or not self._entries:
+                return None
+
+            scores = self._matrix[:len(self._entries)] @ self._normalize(embedding)
+            candidates = np.flatnonzero(scores >= self.threshold)
+            if candidates.size == 0:
+                return None
+
+            for i in candidates[np.argsort(-scores[candidates])]:
+                entry_fingerprint, entry_signature, sql = self._entries[i]
+                if entry_fingerprint != fingerprint:
+                    self.guard_rejections["schema"] += 1
+                elif entry_signature[0] != signature[0]:
+                    self.guard_rejections["literals"] += 1
+                elif entry_signature[1] != signature[1]:
+                    self.guard_rejections["negation"] += 1
+                elif entry_signature[2] != signature[2]:
+                    self.guard_rejections["wording"] += 1
+                else:
+                    self.hits += 1
+                    logger.info(f"Reusing SQL of a similar question (similarity {scores[i]:.3f}).")
+                    return sql
+            return None
+
+    def add(self, question: str, embedding: list[float] | None, fingerprint: str, sql: str) -> None:
+        """
+        Stores a validated translation, replacing the oldest entry when full.
+        Without an embedding, the translation is only indexed by its wording.
+        """
+        if self.max_size <= 0:
+            return
+        signature = question_signature(question)
+        self._by_wording.set((fingerprint, signature), sql)
+        if embedding is None:
+            return
+        vector = self._normalize(embedding)
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != vector.shape[0]:
+                self._matrix = np.zeros((self.max_size, vector.shape[0]), dtype=np.float32)
+                self._entries = []
+                self._next_slot = 0
+
+            entry = (fingerprint, signature, sql)
+            slot = self._next_slot
+            self._matrix[slot] = vector
+            if slot < len(self._entries):
+                self._entries[slot] = entry
+            else:
+                self._entries.append(entry)
+            self._next_slot = (slot + 1) % self.max_size
+
+    def stats(self) -> dict:
+        """
+        Returns reuse counters, the reuse rate and how often each guard blocked a reuse.
+        """
+        return {
+            "size": len(self._by_wording),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "reuse_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "guard_rejections": dict(self.guard_rejections),
+        }
@@ -0,0 +1,59 @@
+import datetime
+import decimal
+import io
+import orjson
+from fastapi.responses import JSONResponse
+from services.configuration.logger import get_logger
+
+# Initialize logger for response serialization
+logger = get_logger("SerializationLogger")
+
+def _orjson_default(value):
+    """
+    Handles the types orjson does not serialize natively, matching jsonable_encoder.
+    """
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, datetime.timedelta):
+        # MySQL TIME columns are returned as timedelta
+        return value.total_seconds()
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", errors="replace")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dumps(content) -> bytes:
+    """
+    Serializes content to JSON bytes with orjson.
+    """
+    return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson, which serializes datetimes natively in C
+    instead of walking every value with jsonable_encoder.
+    """
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+def to_arrow_ipc(columns: list[str], rows: list[list]) -> bytes:
+    """
+    Encodes a columnar result as an Arrow IPC stream. Columns are passed by position,
+    so duplicate names (e.g. `SELECT *` over a JOIN) are kept, as in the columnar JSON.
+
+    Requires the optional `pyarrow` package.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_arrays(
+        [pa.array([row[i] for row in rows]) for i in range(len(columns))],
+        names=columns
+    )
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
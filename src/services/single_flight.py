@@ -0,0 +1,83 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable
+from services.configuration.logger import get_logger
+
+# Initialize logger for in-flight request coalescing
+logger = get_logger("SingleFlightLogger")
+
+# Every coalescing group created by the services, for metrics reporting
+FLIGHT_GROUPS: list["SingleFlight"] = []
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into one pending future.
+
+    The first caller for a key starts the work; callers arriving while it is in flight
+    await the same future and receive the same result or the same exception. A waiter
+    being cancelled does not cancel the shared work for the others; once every waiter
+    has gone (client disconnects, expired deadlines) the abandoned work is cancelled.
+    """
+    def __init__(self, name: str):
+        """
+        Args:
+            name (str): Pipeline stage the group coalesces (used in metrics).
+        """
+        self.name = name
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        self._waiters: dict[Hashable, int] = {}
+        FLIGHT_GROUPS.append(self)
+
+    async def do(self, key: Hashable, work: Callable[[], Awaitable]):
+        """
+        Runs `work()` for the key, or joins the identical call already in flight.
+
+        Args:
+            key (Hashable): Identity of the call; equal keys are coalesced.
+            work (Callable): Factory returning the awaitable that computes the result.
+
+        Returns:
+            The result of the shared call.
+        """
+        self.calls += 1
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(work())
+            self._in_flight[key] = future
+            self._waiters[key] = 0
+            future.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+            logger.debug(f"Coalesced concurrent {self.name} call.")
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if self._in_flight.get(key) is future and self._waiters[key] == 1 and not future.done():
+                logger.info(f"Cancelling abandoned {self.name} call.")
+                future.cancel()
+            raise
+        finally:
+            if self._in_flight.get(key) is future:
+                self._waiters[key] -= 1
+
+    def _finish(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+            del self._waiters[key]
+        # Mark the exception as retrieved even if every waiter was cancelled
+        if not future.cancelled():
+            future.exception()
+
+    def stats(self) -> dict:
+        """
+        Returns call counters and the share of calls served by an in-flight call.
+        """
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "coalescing_ratio": self.coalesced / self.calls if self.calls else 0.0,
+            "in_flight": len(self._in_flight),
+        }
@@ -0,0 +1,266 @@
+import re
+import threading
+from dataclasses import dataclass, field
+from services.cache import TTLCache, MISSING
+from services.configuration.logger import get_logger
+from services.metrics import register_cache
+
+# Initialize logger for the learned SQL template layer
+logger = get_logger("SqlTemplateLogger")
+
+# Literal-like spans of a question that may vary between questions of the same shape:
+# quoted strings, tokens containing digits (numbers, dates, IDs) and runs of capitalized
+# words after the first word (names such as "Acme Corp", codes such as "OPEN")
+_QUESTION_LITERAL = re.compile(
+    r"'[^']+'|\"[^\"]+\"|\b\w*\d[\w\-/:.]*\b|(?<=\s)[A-Z][\w-]*(?:\s+[A-Z][\w-]*)*"
+)
+
+# Literals of a SQL statement: quoted strings and numbers that are not part of an identifier
+_SQL_LITERAL = re.compile(
+    r"(?P<string>'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\")|(?P<number>(?<![\w.])\d+(?:\.\d+)?(?![\w.]))"
+)
+
+def _span_kind(text: str) -> str:
+    if text[0] in "'\"":
+        return "quoted"
+    if any(char.isdigit() for char in text):
+        return "number"
+    return "name"
+
+def _span_value(text: str) -> str:
+    return text[1:-1] if text[0] in "'\"" else text
+
+def question_shape(question: str) -> tuple[str, list[str]]:
+    """
+    Splits a question into its shape and its literal values.
+
+    The shape is the question in lower case with every literal-like span replaced by a
+    marker of its kind, so "Show orders for customer Acme" and "show orders for
+    customer Globex?" share the shape "show orders for customer {name}".
+
+    Returns:
+        tuple: (shape, literal values in question order).
+    """
+    question = " ".join(question.split()).rstrip("?.! ")
+    parts, values, position = [], [], 0
+    for match in _QUESTION_LITERAL.finditer(question):
+        parts.append(question[position:match.start()].lower())
+        parts.append("{" + _span_kind(match.group()) + "}")
+        values.append(_span_value(match.group()))
+        position = match.end()
+    parts.append(question[position:].lower())
+    return "".join(parts), values
+
+def _case_of(question_value: str, sql_value: str) -> str | None:
+    """
+    Returns how the SQL spells a question value: as is, upper, lower or title case.
+    """
+    for case in ("same", "upper", "lower", "title"):
+        if _apply_case(question_value, case) == sql_value:
+            return case
+    return None
+
+def _apply_case(value: str, case: str) -> str:
+    return {"same": value, "upper": value.upper(), "lower": value.lower(), "title": value.title()}[case]
+
+@dataclass
+class Slot:
+    """
+    How one question value becomes one bound parameter, e.g. value "acme" with
+    case "title" and prefix/suffix "%" becomes the LIKE pattern "%Acme%".
+    """
+    source: int                # index of the question value
+    case: str = "same"
+    prefix: str = ""
+    suffix: str = ""
+    numeric: bool = False      # bound as a number rather than a string
+
+    def bind(self, values: list[str]):
+        value = values[self.source]
+        if self.numeric:
+            return float(value) if "." in value else int(value)
+        return f"{self.prefix}{_apply_case(value, self.case)}{self.suffix}"
+
+@dataclass
+class SqlTemplate:
+    """
+    A parameterized statement learned from translated questions of one shape.
+
+    `constants` holds the question values that are not parameters and must therefore
+    match exactly. `observed` holds the distinct parameter tuples whose translation
+    produced exactly this statement; `conflicts` counts translations of the same shape
+    that produced a different statement and `failures` executions that failed.
+    """
+    shape: str
+    sql: str
+    slots: list[Slot]
+    constants: dict[int, str]
+    observed: set = field(default_factory=set)
+    conflicts: int = 0
+    failures: int = 0
+    hits: int = 0
+
+    @property
+    def support(self) -> int:
+        return len(self.observed)
+
+    @property
+    def confidence(self) -> float:
+        return self.support / (self.support + self.conflicts + self.failures)
+
+@dataclass
+class TemplateMatch:
+    template: SqlTemplate
+    sql: str
+    params: tuple
+
+def build_template(question: str, sql_query: str) -> tuple[SqlTemplate, tuple] | None:
+    """
+    Turns a (question, SQL) pair into a template by finding each question value among
+    the SQL literals. Every value found in exactly one literal (and sharing that literal
+    with no other value) becomes a `%s` placeholder; all other `%` signs are escaped as
+    `%%` for the driver.
+
+    Returns:
+        tuple|None: (template, the parameters of this pair), or None if no value of the
+        question appears in the SQL.
+    """
+    shape, values = question_shape(question)
+    literals = list(_SQL_LITERAL.finditer(sql_query))
+
+    slots: dict[int, Slot] = {}
+    for index, value in enumerate(values):
+        candidates = []
+        for position, literal in enumerate(literals):
+            if literal.group("number"):
+                if literal.group() == value:
+                    candidates.append((position, Slot(source=index, numeric=True)))
+                continue
+            inner = literal.group()[1:-1]
+            found = inner.lower().find(value.lower())
+            if found < 0 or inner.lower().find(value.lower(), found + 1) >= 0:
+                continue
+            case = _case_of(value, inner[found:found + len(value)])
+            if case:
+                candidates.append((position, Slot(source=index, case=case, prefix=inner[:found],
+                                                  suffix=inner[found + len(value):])))
+        if len(candidates) == 1 and candidates[0][0] not in slots:
+            slots[candidates[0][0]] = candidates[0][1]
+    if not slots:
+        return None
+
+    parts, position = [], 0
+    for number, literal in enumerate(literals):
+        parts.append(sql_query[position:literal.start()].replace("%", "%%"))
+        parts.append("%s" if number in slots else literal.group().replace("%", "%%"))
+        position = literal.end()
+    parts.append(sql_query[position:].replace("%", "%%"))
+
+    ordered = [slots[number] for number in sorted(slots)]
+    sources = {slot.source for slot in ordered}
+    template = SqlTemplate(
+        shape=shape,
+        sql="".join(parts),
+        slots=ordered,
+        constants={index: value.lower() for index, value in enumerate(values) if index not in sources}
+    )
+    return template, tuple(slot.bind(values) for slot in ordered)
+
+class SqlTemplateStore:
+    """
+    Learned question-shape templates in front of the LLM.
+
+    Successful translations are mined into templates keyed by question shape. A new
+    question with a known shape is answered by binding its values into the template's
+    parameters, without retrieval or a Gemini call, once the template has been seen
+    with at least `min_support` distinct values and its confidence (agreeing
+    translations over all translations and failed executions) is at least
+    `min_confidence`. Everything else falls back to the LLM.
+    """
+    def __init__(self, max_size: int, ttl: float, min_support: int, min_confidence: float):
+        """
+        Args:
+            max_size (int): Maximum number of templates (least recently used are dropped).
+            ttl (float): Seconds a template is kept without being used or reinforced.
+            min_support (int): Distinct values a template must have been seen with.
+            min_confidence (float): Minimum share of agreeing observations.
+        """
+        self.templates = TTLCache(max_size=max_size, ttl=ttl)
+        self.min_support = min_support
+        self.min_confidence = min_confidence
+        self._lock = threading.Lock()
+
+        self.lookups = 0
+        self.hits = 0
+        self.low_confidence = 0
+        self.learned = 0
+        register_cache("sql_template", self.stats)
+
+    def match(self, question: str, count: bool = True) -> TemplateMatch | None:
+        """
+        Returns the statement and parameters for a question of a trusted shape, or None.
+        Pass `count=False` to look ahead without recording the lookup in the hit-rate stats.
+        """
+        if count:
+            self.lookups += 1
+        shape, values = question_shape(question)
+        template = self.templates.get(shape, count=count)
+        if template is MISSING or any(values[index].lower() != value for index, value in template.constants.items()):
+            return None
+        if template.support < self.min_support or template.confidence < self.min_confidence:
+            if count:
+                self.low_confidence += 1
+            return None
+        try:
+            params = tuple(slot.bind(values) for slot in template.slots)
+        except ValueError:
+            return None
+        if count:
+            template.hits += 1
+            self.hits += 1
+        return TemplateMatch(template=template, sql=template.sql, params=params)
+
+    def learn(self, question: str, sql_query: str) -> None:
+        """
+        Records a question and the SQL that was successfully executed for it.
+        """
+        built = build_template(question, sql_query)
+        if built is None:
+            return
+        template, params = built
+        with self._lock:
+            existing = self.templates.get(template.shape)
+            if existing is MISSING:
+                template.observed.add(params)
+                self.templates.set(template.shape, template)
+                self.learned += 1
+                logger.info(f"Learned SQL template for question shape '{template.shape}'.")
+            elif existing.sql == template.sql and existing.constants == template.constants:
+                existing.observed.add(params)
+                self.templates.set(template.shape, existing)
+            else:
+                existing.conflicts += 1
+                logger.info(f"Conflicting translation for question shape '{template.shape}' "
+                            f"(confidence now {existing.confidence:.2f}).")
+
+    def report_failure(self, match: TemplateMatch) -> None:
+        """
+        Lowers the confidence of a template whose statement failed to execute.
+        """
+        with self._lock:
+            match.template.failures += 1
+        logger.warning(f"Template query failed for shape '{match.template.shape}' "
+                       f"(confidence now {match.template.confidence:.2f}).")
+
+    def stats(self) -> dict:
+        """
+        Returns the number of templates, lookups, hits, the hit rate and low-confidence misses.
+        """
+        return {
+            "size": len(self.templates),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "low_confidence": self.low_confidence,
+            "learned": self.learned,
+        }
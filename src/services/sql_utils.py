@@ -0,0 +1,243 @@
+import re
+from functools import lru_cache
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+from services.configuration.logger import get_logger
+
+# Initialize logger for SQL parsing and rewriting
+logger = get_logger("SqlUtilsLogger")
+
+# Dialect of the generated SQL
+DIALECT = "mysql"
+
+# Fallback for SQL the parser rejects: identifiers following FROM or JOIN
+_TABLE_PATTERN = re.compile(r'\b(?:FROM|JOIN)\s+`?([a-zA-Z0-9_]+)`?', re.IGNORECASE)
+
+# Driver placeholders and escaped percent signs of parameterized SQL
+_DRIVER_MARKERS = re.compile(r'%%|%s')
+
+def _as_qmark(sql_query: str) -> str:
+    """
+    Rewrites driver `%s` placeholders as `?`, which the parser reads as parameter markers.
+    """
+    return _DRIVER_MARKERS.sub(lambda marker: "?" if marker.group() == "%s" else "%%", sql_query)
+
+@lru_cache(maxsize=2048)
+def _parse(sql_query: str) -> exp.Expression | None:
+    """
+    Parses one MySQL statement, or returns None if it cannot be parsed.
+    Cached, so the pipeline's stages share one parse per generated query.
+    Callers must copy the tree before modifying it.
+    """
+    try:
+        statements = sqlglot.parse(sql_query, read=DIALECT)
+    except SqlglotError as e:
+        logger.warning(f"Could not parse generated SQL: {e}")
+        return None
+    if len(statements) != 1 or statements[0] is None:
+        return None
+    return statements[0]
+
+def referenced_tables(sql_query: str) -> set[str]:
+    """
+    Returns the upper-cased names of every base table the query reads, including
+    tables in subqueries, JOINs and UNION branches but not CTE or derived-table aliases.
+    """
+    # Driver placeholders are read as parameter markers; the tree is only inspected, never rendered
+    tree = _parse(_as_qmark(sql_query))
+    if tree is None:
+        return {table.upper() for table in _TABLE_PATTERN.findall(sql_query)}
+    cte_names = {cte.alias_or_name.upper() for cte in tree.find_all(exp.CTE)}
+    return {
+        table.name.upper()
+        for table in tree.find_all(exp.Table)
+        if table.name and table.name.upper() not in cte_names
+    }
+
+def _is_aggregate(select: exp.Select) -> bool:
+    """
+    Returns whether a SELECT's own projection aggregates (ignoring window functions
+    and aggregates inside subqueries), as opposed to a column merely named e.g. TOTAL.
+    """
+    for projection in select.expressions:
+        for function in projection.find_all(exp.AggFunc):
+            node = function
+            while node is not projection and not isinstance(node.parent, (exp.Window, exp.Subquery, exp.Select)):
+                node = node.parent
+            if node is projection and not isinstance(projection, exp.Window):
+                return True
+    return False
+
+def is_single_row(select: exp.Expression) -> bool:
+    """
+    Returns whether a query always yields exactly one row: an aggregate without GROUP BY.
+    """
+    return isinstance(select, exp.Select) and _is_aggregate(select) and not select.args.get("group")
+
+def single_table_select(sql_query: str) -> tuple[exp.Select, str] | None:
+    """
+    Returns the parsed SELECT and its table if the query reads one base table without
+    joins, subqueries, grouping, DISTINCT or aggregation (filters and ORDER BY allowed).
+    """
+    tree = _parse(sql_query)
+    if not isinstance(tree, exp.Select) or tree.args.get("with_"):
+        return None
+    if tree.args.get("joins") or tree.args.get("group") or tree.args.get("having") or tree.args.get("distinct"):
+        return None
+    source = tree.args.get("from_")
+    if source is None or not isinstance(source.this, exp.Table) or _is_aggregate(tree):
+        return None
+    if any(isinstance(node, exp.Subquery) or (isinstance(node, exp.Select) and node is not tree)
+           for node in tree.walk()):
+        return None
+    return tree, source.this.name
+
+def unfiltered_scan_table(sql_query: str) -> str | None:
+    """
+    Returns the table name if the query reads every row of a single table
+    (no filters, joins, unions, limits or aggregation), otherwise None.
+    """
+    scan = single_table_select(sql_query)
+    if scan is None:
+        return None
+    tree, table_name = scan
+    if tree.args.get("where") or tree.args.get("limit"):
+        return None
+    return table_name
+
+def _render(tree: exp.Expression, parameterized: bool) -> str:
+    """
+    Renders a rewritten tree, turning parameter markers back into driver `%s` placeholders.
+    """
+    if parameterized:
+        for placeholder in list(tree.find_all(exp.Placeholder)):
+            placeholder.replace(exp.var("%s"))
+    return tree.sql(dialect=DIALECT)
+
+def _ordinal_reference(node: exp.Expression) -> bool:
+    """
+    Returns whether a GROUP BY or ORDER BY of the node refers to a column by position
+    (`GROUP BY 1`), which a constant projection would turn into a constant.
+    """
+    clauses = [node.args.get("group"), node.args.get("order")]
+    return any(
+        isinstance(item.this if isinstance(item, exp.Ordered) else item, exp.Literal)
+        for clause in clauses if clause is not None
+        for item in clause.expressions
+    )
+
+def _constant_projection(node: exp.Expression) -> bool:
+    """
+    Replaces, in place, the columns of every SELECT of a query by the constant 1 and
+    drops ORDER BY clauses that no LIMIT depends on. Returns False, leaving the caller
+    to discard the copy, when the row count depends on the columns: DISTINCT, UNION
+    without ALL, HAVING (which may refer to column aliases), LIMIT (whose ORDER BY may
+    too), GROUP BY on a column alias, GROUP BY or ORDER BY on a column position and
+    single-row aggregates.
+    """
+    if _ordinal_reference(node):
+        return False
+    if isinstance(node, exp.Union):
+        if node.args.get("distinct") or node.args.get("limit"):
+            return False
+        node.set("order", None)
+        return _constant_projection(node.left) and _constant_projection(node.right)
+    if isinstance(node, exp.Subquery):
+        return _constant_projection(node.this)
+    if isinstance(node, exp.Select):
+        if node.args.get("distinct") or node.args.get("having") or node.args.get("limit") or is_single_row(node):
+            return False
+        aliases = {projection.alias.upper() for projection in node.expressions if projection.alias}
+        group = node.args.get("group")
+        if group and any(not column.table and column.name.upper() in aliases for column in group.find_all(exp.Column)):
+            return False
+        node.set("order", None)
+        node.set("expressions", [exp.Literal.number(1)])
+        return True
+    return False
+
+def count_source_query(sql_query: str, parameterized: bool = False) -> str:
+    """
+    Returns the statement whose rows are counted for a generated query.
+
+    Each SELECT's columns are replaced by a constant, so the statement can be used as a
+    derived table even when its columns have duplicate names (`SELECT *` over a JOIN,
+    which MySQL rejects in a derived table), and the server need not read them. Queries
+    whose row count depends on their columns, and SQL that cannot be parsed, are
+    returned unchanged.
+
+    Args:
+        sql_query (str): The generated SQL without pagination.
+        parameterized (bool): Whether the SQL has driver `%s` placeholders, kept as such.
+
+    Returns:
+        str: The statement to count the rows of.
+    """
+    tree = _parse(_as_qmark(sql_query) if parameterized else sql_query)
+    if tree is None:
+        return sql_query
+    source = tree.copy()
+    if not _constant_projection(source):
+        return sql_query
+    return _render(source, parameterized)
+
+def _limit(value: int) -> exp.Limit:
+    return exp.Limit(expression=exp.Literal.number(int(value)))
+
+def _push_branch_limits(node: exp.Expression, row_cap: int) -> None:
+    """
+    Caps every branch of a UNION ALL tree at `row_cap` rows, since no branch can
+    contribute more rows than the page needs. Branches with their own LIMIT or
+    ORDER BY, single-row aggregates and DISTINCT unions are left untouched.
+    """
+    if isinstance(node, exp.Union):
+        if node.args.get("distinct") or node.args.get("limit") or node.args.get("order"):
+            return
+        _push_branch_limits(node.left, row_cap)
+        _push_branch_limits(node.right, row_cap)
+    elif isinstance(node, exp.Subquery):
+        _push_branch_limits(node.this, row_cap)
+    elif isinstance(node, exp.Select) and not node.args.get("limit") and not is_single_row(node):
+        node.set("limit", _limit(row_cap))
+
+def paginate_query(sql_query: str, offset: int, limit: int, parameterized: bool = False) -> str:
+    """
+    Applies LIMIT/OFFSET pagination to a generated query, using its parsed form.
+
+    - Single-row aggregates (e.g. a bare COUNT(*)) are returned unchanged.
+    - Plain SELECTs, including grouped aggregates, get LIMIT/OFFSET appended.
+    - UNIONs get the outer LIMIT/OFFSET, and, without an outer ORDER BY, each
+      UNION ALL branch is also capped at offset + limit rows.
+    - Queries that already carry a LIMIT are paginated as a derived table.
+    - Unparseable SQL is wrapped as a derived table, so it is still bounded.
+
+    Args:
+        sql_query (str): The generated SQL without pagination.
+        offset (int): Number of rows to skip.
+        limit (int): Page size.
+        parameterized (bool): Whether the SQL has driver `%s` placeholders, kept as such.
+
+    Returns:
+        str: The paginated SQL.
+    """
+    offset, limit = int(offset), int(limit)
+    tree = _parse(_as_qmark(sql_query) if parameterized else sql_query)
+
+    if tree is not None and is_single_row(tree):
+        logger.debug("Single-row aggregate detected, skipping pagination.")
+        return sql_query
+
+    logger.info(f"Applying pagination with LIMIT {limit} and OFFSET {offset}.")
+    if tree is None or tree.args.get("limit") or not isinstance(tree, (exp.Select, exp.Union)):
+        return f"SELECT * FROM ({sql_query}) AS page_source LIMIT {limit} OFFSET {offset}"
+
+    if isinstance(tree, exp.Select):
+        return f"{sql_query} LIMIT {limit} OFFSET {offset}"
+
+    union = tree.copy()
+    if not union.args.get("order"):
+        _push_branch_limits(union, offset + limit)
+    union.set("limit", _limit(limit))
+    union.set("offset", exp.Offset(expression=exp.Literal.number(offset)))
+    return _render(union, parameterized)
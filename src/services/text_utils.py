@@ -0,0 +1,27 @@
+import re
+
+# Question words that also occur in column names but say nothing about the table
+STOP_WORDS = {
+    "a", "all", "an", "and", "are", "as", "at", "by", "for", "from", "get", "give", "i", "in", "is",
+    "it", "list", "me", "my", "need", "no", "not", "of", "on", "or", "show", "the", "their", "to", "with",
+}
+
+def _stem(word: str) -> str:
+    """
+    Folds simple plurals so "orders" matches ORDER and "entries" matches ENTRY.
+    """
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+def tokenize(text: str) -> set[str]:
+    """
+    Splits a question or identifier into stemmed lower-case words (underscores separate
+    words), without stop words. Shared by schema matching, pruning and semantic reuse.
+    """
+    return {
+        _stem(word) for word in re.findall(r'[a-z][a-z0-9]*', text.lower())
+        if word not in STOP_WORDS
+    }
@@ -0,0 +1,16 @@
+import pytest
+from services.chat_agent import normalize_question
+
+def test_case_whitespace_and_sentence_punctuation_are_folded():
+    assert normalize_question("  Show ALL orders,  please?! ") == normalize_question("show all orders please")
+
+@pytest.mark.parametrize("first, second", [
+    ("orders with amount > 100", "orders with amount < 100"),
+    ("orders with amount = 100", "orders with amount >= 100"),
+    ("orders with amount <= 100", "orders with amount <> 100"),
+    ("orders with balance -5", "orders with balance 5"),
+    ("orders with amount 1.5", "orders with amount 15"),
+    ("tasks started at 10:30", "tasks started at 1030"),
+])
+def test_questions_with_different_meaning_get_different_keys(first, second):
+    assert normalize_question(first) != normalize_question(second)
@@ -0,0 +1,109 @@
+import threading
+import time
+import pytest
+from benchmarks.fakes import FakeConnection, Latency
+from services.connection_pool import ManagedConnectionPool, PoolQueueFullError, PoolTimeoutError
+
+def make_pool(**overrides) -> ManagedConnectionPool:
+    options = dict(
+        connect=lambda: FakeConnection(Latency(0)), min_size=1, max_size=2, acquire_timeout=0.2,
+        max_idle_time=300, max_lifetime=1800, validation_interval=300, name="test_pool",
+    )
+    options.update(overrides)
+    return ManagedConnectionPool(**options)
+
+def test_pool_opens_min_size_and_grows_under_load_up_to_max_size():
+    pool = make_pool(min_size=1, max_size=3)
+    try:
+        assert pool.stats()["size"] == 1
+        connections = [pool.get_connection() for _ in range(3)]
+        assert pool.stats()["size"] == 3 and pool.stats()["in_use"] == 3
+        for connection in connections:
+            connection.close()
+        assert pool.stats()["idle"] == 3 and pool.stats()["in_use"] == 0
+    finally:
+        pool.close()
+
+def test_exhausted_pool_times_out_after_the_acquire_timeout():
+    pool = make_pool()
+    try:
+        held = [pool.get_connection(), pool.get_connection()]
+        start = time.monotonic()
+        with pytest.raises(PoolTimeoutError):
+            pool.get_connection(timeout=0.1)
+        assert time.monotonic() - start >= 0.1
+        for connection in held:
+            connection.close()
+    finally:
+        pool.close()
+
+def test_waiter_gets_a_connection_returned_while_it_waits():
+    pool = make_pool(max_size=1, acquire_timeout=2)
+    try:
+        held = pool.get_connection()
+        threading.Timer(0.05, held.close).start()
+        pool.get_connection().close()
+    finally:
+        pool.close()
+
+def test_callers_beyond_max_waiters_fail_right_away():
+    pool = make_pool(max_size=1, acquire_timeout=0.5, max_waiters=1)
+    try:
+        held = pool.get_connection()
+        outcome = []
+
+        def wait():
+            try:
+                pool.get_connection()
+            except PoolTimeoutError as e:
+                outcome.append(e)
+
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+        time.sleep(0.05)
+        start = time.monotonic()
+        with pytest.raises(PoolQueueFullError):
+            pool.get_connection()
+        assert time.monotonic() - start < 0.1
+        waiter.join()
+        assert len(outcome) == 1
+        held.close()
+    finally:
+        pool.close()
+
+def test_connection_broken_while_checked_out_is_replaced():
+    pool = make_pool(min_size=1, max_size=1)
+    try:
+        connection = pool.get_connection()
+        broken_id = connection.connection_id
+        connection.disconnect()
+        connection.close()
+        assert pool.stats()["size"] == 0
+
+        replacement = pool.get_connection()
+        assert replacement.connection_id != broken_id and replacement.is_connected()
+        replacement.close()
+    finally:
+        pool.close()
+
+def test_idle_connection_that_fails_its_ping_is_replaced_on_checkout():
+    pool = make_pool(min_size=1, max_size=1, validation_interval=0)
+    try:
+        connection = pool.get_connection()
+        broken_id = connection.connection_id
+        connection.close()
+        FakeConnection.open_connections[broken_id].disconnect()
+
+        replacement = pool.get_connection()
+        assert replacement.connection_id != broken_id
+        replacement.close()
+    finally:
+        pool.close()
+
+def test_connections_past_their_lifetime_are_retired_on_return():
+    pool = make_pool(min_size=0, max_size=1, max_lifetime=0)
+    try:
+        pool.get_connection().close()
+        assert pool.stats()["size"] == 0
+    finally:
+        pool.close()
@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+from services.deadline import DeadlineExceeded, bounded, remaining, start_deadline
+
+async def answer(delay: float = 0):
+    await asyncio.sleep(delay)
+    return 42
+
+def test_without_a_deadline_bounded_awaits_directly():
+    async def main():
+        start_deadline(None)
+        assert remaining() is None
+        return await bounded(answer(0.01))
+
+    assert asyncio.run(main()) == 42
+
+def test_stage_finishing_within_the_budget_returns_its_result():
+    async def main():
+        start_deadline(1)
+        return await bounded(answer())
+
+    assert asyncio.run(main()) == 42
+
+def test_stage_outliving_the_budget_is_cancelled():
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    async def main():
+        start_deadline(0.05)
+        await bounded(slow())
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(main())
+    assert cancelled == [1]
+
+def test_expired_budget_fails_without_starting_the_stage():
+    async def main():
+        start_deadline(0.01)
+        await asyncio.sleep(0.02)
+        stage = answer()
+        with pytest.raises(DeadlineExceeded):
+            await bounded(stage)
+        return stage.cr_frame
+
+    assert asyncio.run(main()) is None
+
+def test_deadline_is_inherited_by_tasks_started_afterwards():
+    async def main():
+        start_deadline(0.05)
+        return await asyncio.create_task(bounded(answer(1)))
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(main())
+
+def test_stage_timeout_with_budget_left_is_not_a_deadline_expiry():
+    async def stage():
+        raise asyncio.TimeoutError()
+
+    async def main():
+        start_deadline(5)
+        await bounded(stage())
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(main())
@@ -0,0 +1,50 @@
+import re
+import pytest
+from services.configuration.keywords import Find_Forbidden_Keyword, forbidden_keywords
+
+# The matcher Find_Forbidden_Keyword replaced: one `\bkeyword\b` pattern, and one scan, per keyword
+REFERENCE_PATTERNS = [
+    re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE) for keyword in forbidden_keywords
+]
+
+def reference_verdict(query: str) -> bool:
+    query = query.strip()
+    return any(pattern.search(query) for pattern in REFERENCE_PATTERNS)
+
+def mixed_case(text: str) -> str:
+    return "".join(char.upper() if i % 2 else char.lower() for i, char in enumerate(text))
+
+def boundary_cases(keyword: str) -> list[str]:
+    return [
+        keyword,
+        mixed_case(keyword),
+        f"show orders then {keyword.upper()} them",
+        f"x{keyword}",            # prefixed
+        f"{keyword}x",            # suffixed
+        f"{keyword}s",
+        f"_{keyword}",            # underscores are word characters
+        f"{keyword}_",
+        f"order_{keyword}_count",
+        f"re-{keyword}",          # a hyphen is a boundary
+        f"({keyword}).",
+        f"  {keyword}  ",
+        keyword.replace(" ", "  "),
+        keyword[:-1],
+    ]
+
+@pytest.mark.parametrize("keyword", sorted(forbidden_keywords))
+def test_single_pass_matches_per_keyword_patterns(keyword):
+    for query in boundary_cases(keyword):
+        found = Find_Forbidden_Keyword(query)
+        assert (found is not None) == reference_verdict(query), query
+        assert found is None or found in forbidden_keywords
+
+@pytest.mark.parametrize("query", [
+    "show all orders for customer Acme",
+    "list tasks with status open between last week and today",
+    "total amount per month of the latest orders",
+    "which addresses were updated_at yesterday",
+])
+def test_benign_questions_are_not_flagged(query):
+    assert not reference_verdict(query)
+    assert Find_Forbidden_Keyword(query) is None
@@ -0,0 +1,75 @@
+import pytest
+from services.pagination import KeysetPlan, keyset_plan
+
+def test_single_table_scan_is_keyed_by_its_primary_key():
+    assert keyset_plan("SELECT * FROM POINT_ORDER WHERE STATUS = 'PAID'") == KeysetPlan(
+        base_sql="SELECT * FROM POINT_ORDER WHERE STATUS = 'PAID'", key_columns=["ID"], direction="ASC"
+    )
+
+def test_order_by_column_is_prepended_to_the_key():
+    plan = keyset_plan("SELECT ID, CREATED_AT FROM POINT_ORDER ORDER BY CREATED_AT DESC")
+    assert plan == KeysetPlan(
+        base_sql="SELECT ID, CREATED_AT FROM POINT_ORDER", key_columns=["CREATED_AT", "ID"], direction="DESC"
+    )
+
+def test_order_by_primary_key_keeps_a_single_key_column():
+    plan = keyset_plan("SELECT * FROM POINT_ORDER ORDER BY ID DESC")
+    assert plan.key_columns == ["ID"] and plan.direction == "DESC"
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM POINT_ORDER o JOIN POINT_TASK t ON o.ID = t.ORDER_ID",
+    "SELECT STATUS, COUNT(*) FROM POINT_ORDER GROUP BY STATUS",
+    "SELECT COUNT(*) FROM POINT_ORDER",
+    "SELECT DISTINCT STATUS FROM POINT_ORDER",
+    "SELECT * FROM POINT_ORDER LIMIT 5",
+    "SELECT * FROM POINT_ORDER WHERE ID IN (SELECT ORDER_ID FROM POINT_TASK)",
+    "SELECT ID FROM POINT_ORDER UNION ALL SELECT ID FROM POINT_TASK",
+    "SELECT * FROM POINT_ORDER ORDER BY STATUS, CREATED_AT",
+    # The key columns must be part of the output to build the next cursor
+    "SELECT NAME FROM POINT_ORDER",
+    "SELECT ID FROM POINT_ORDER ORDER BY CREATED_AT",
+    # No known primary key
+    "SELECT * FROM UNKNOWN_TABLE",
+])
+def test_queries_without_a_stable_key_are_not_eligible(sql):
+    assert keyset_plan(sql) is None
+
+def test_first_page_has_no_key_condition():
+    plan = KeysetPlan(base_sql="SELECT * FROM POINT_ORDER", key_columns=["ID"], direction="ASC")
+    assert plan.page_query(None, 10) == (
+        "SELECT * FROM (SELECT * FROM POINT_ORDER) AS keyset_page ORDER BY keyset_page.`ID` ASC LIMIT 10", ()
+    )
+
+def test_next_page_uses_an_expanded_row_comparison():
+    plan = KeysetPlan(base_sql="SELECT * FROM POINT_ORDER", key_columns=["CREATED_AT", "ID"], direction="ASC")
+    sql, params = plan.page_query(["2024-01-01", 5], 10)
+    assert "WHERE (keyset_page.`CREATED_AT` > %s) OR (keyset_page.`CREATED_AT` = %s AND keyset_page.`ID` > %s)" in sql
+    assert params == ("2024-01-01", "2024-01-01", 5)
+
+@pytest.mark.parametrize("direction, where", [
+    # NULLs sort first ascending: every non-NULL value follows
+    ("ASC", "WHERE (keyset_page.`CREATED_AT` IS NOT NULL) OR "
+            "(keyset_page.`CREATED_AT` IS NULL AND keyset_page.`ID` > %s)"),
+    # NULLs sort last descending: only the remaining NULL rows follow
+    ("DESC", "WHERE (keyset_page.`CREATED_AT` IS NULL AND "
+             "(keyset_page.`ID` < %s OR keyset_page.`ID` IS NULL))"),
+])
+def test_next_page_after_a_null_key_value(direction, where):
+    plan = KeysetPlan(base_sql="SELECT * FROM POINT_ORDER", key_columns=["CREATED_AT", "ID"], direction=direction)
+    sql, params = plan.page_query([None, 5], 10)
+    assert where in sql
+    assert params == (5,)
+
+def test_literal_percent_signs_are_escaped_once_parameters_are_bound():
+    plan = KeysetPlan(base_sql="SELECT * FROM POINT_ORDER WHERE NAME LIKE '5%'", key_columns=["ID"], direction="ASC")
+    sql, _ = plan.page_query([1], 10)
+    assert "LIKE '5%%'" in sql
+    assert plan.page_query(None, 10)[0].count("%") == 1
+
+def test_next_after_matches_key_columns_case_insensitively():
+    plan = keyset_plan("SELECT * FROM POINT_ORDER ORDER BY `created_at`")
+    assert plan.next_after({"ID": 7, "CREATED_AT": "2024-01-01", "NAME": "x"}) == ["2024-01-01", 7]
+
+def test_next_after_without_the_key_columns_issues_no_cursor():
+    plan = keyset_plan("SELECT * FROM POINT_ORDER ORDER BY CREATED_AT")
+    assert plan.next_after({"ID": 7, "NAME": "x"}) is None
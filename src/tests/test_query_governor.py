@@ -0,0 +1,86 @@
+import asyncio
+from services.configuration.config import settings
+from services.query_governor import QueryGovernor, add_execution_hint, estimate_plan
+
+def plan_row(select_id, table, rows, filtered=100, type="ALL", ref=None, extra=""):
+    return {"id": select_id, "table": table, "type": type, "ref": ref, "rows": rows, "filtered": filtered, "Extra": extra}
+
+def test_union_result_rows_sum_the_top_level_branches():
+    plan = [
+        plan_row(1, "POINT_ORDER", 100),
+        plan_row(2, "POINT_TASK", 50, filtered=10, extra="Using where"),
+        plan_row(None, "<union1,2>", None, filtered=None, extra="Using temporary"),
+    ]
+    examined, result_rows, _, _ = estimate_plan(plan)
+    assert (examined, result_rows) == (150, 105)
+
+def test_subquery_rows_are_examined_but_not_returned():
+    plan = [
+        plan_row(1, "POINT_ORDER", 100, extra="Using where"),
+        plan_row(2, "POINT_TASK", 5, type="ref", ref="const"),
+    ]
+    examined, result_rows, _, _ = estimate_plan(plan)
+    assert (examined, result_rows) == (105, 100)
+
+class ExplainDB:
+    """
+    Answers EXPLAIN with a fixed plan and counts the calls.
+    """
+    def __init__(self, plan=None, error=None):
+        self.plan, self.error, self.calls = plan, error, 0
+
+    async def Execute_Query_Async(self, sql_query, params=None):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return self.plan
+
+def review(db, sql_query="SELECT * FROM POINT_ORDER"):
+    return asyncio.run(QueryGovernor(db).review(sql_query))
+
+def test_cheap_query_is_accepted_with_the_time_budget():
+    decision = review(ExplainDB([plan_row(1, "POINT_ORDER", 10, type="ref", ref="const")]))
+    assert decision.action == "accept" and not decision.tags
+    assert decision.max_execution_ms == settings.GOVERNOR_MAX_EXECUTION_MS
+
+def test_large_full_scan_is_tagged():
+    decision = review(ExplainDB([plan_row(1, "POINT_ORDER", settings.GOVERNOR_TAG_ROWS, extra="Using filesort")]))
+    assert decision.action == "tag"
+    assert decision.tags == ["full_scan:POINT_ORDER", "filesort"]
+
+def test_query_above_the_estimate_threshold_gets_an_estimated_count():
+    decision = review(ExplainDB([plan_row(1, "POINT_ORDER", settings.GOVERNOR_ESTIMATE_COUNT_ROWS + 1)]))
+    assert decision.action == "estimate_count" and not decision.rejected
+
+def test_query_examining_too_many_rows_is_rejected():
+    decision = review(ExplainDB([plan_row(1, "POINT_ORDER", settings.GOVERNOR_REJECT_ROWS + 1)]))
+    assert decision.rejected and "exceeds the limit" in decision.reason
+
+def test_join_without_a_condition_is_rejected_above_its_own_threshold():
+    plan = [
+        plan_row(1, "POINT_ORDER", 2000),
+        plan_row(1, "POINT_TASK", 1000, extra="Using join buffer (hash join)"),
+    ]
+    decision = review(ExplainDB(plan))
+    assert decision.rejected and "cartesian_join:POINT_TASK" in decision.tags
+
+def test_query_failing_explain_runs_unreviewed():
+    decision = review(ExplainDB(error=RuntimeError("syntax error")))
+    assert decision.action == "accept" and decision.tags == ["unexplained"]
+
+def test_decisions_are_cached_per_query():
+    db = ExplainDB([plan_row(1, "POINT_ORDER", 10)])
+    governor = QueryGovernor(db)
+
+    async def main():
+        for _ in range(3):
+            await governor.review("SELECT * FROM POINT_ORDER")
+        await governor.review("SELECT * FROM POINT_TASK")
+
+    asyncio.run(main())
+    assert db.calls == 2
+
+def test_execution_hint_follows_the_first_select():
+    assert add_execution_hint("(SELECT 1) UNION (SELECT 2)", 500) == "(SELECT /*+ MAX_EXECUTION_TIME(500) */ 1) UNION (SELECT 2)"
+    assert add_execution_hint("SELECT 1", None) == "SELECT 1"
+    assert add_execution_hint("SELECT /*+ MAX_EXECUTION_TIME(10) */ 1", 500) == "SELECT /*+ MAX_EXECUTION_TIME(10) */ 1"
@@ -0,0 +1,54 @@
+import time
+from services.cache import MISSING
+from services.result_cache import QueryResultCache, estimate_size
+
+def key(sql_query: str):
+    return QueryResultCache.make_key(sql_query)
+
+def rows(count: int) -> list[dict]:
+    return [{"ID": i, "NAME": f"order {i}"} for i in range(count)]
+
+def test_results_are_served_until_invalidated_by_table():
+    cache = QueryResultCache(max_bytes=1_000_000, default_ttl=60)
+    orders, tasks = key("SELECT * FROM POINT_ORDER"), key("SELECT * FROM POINT_TASK t JOIN POINT_ORDER o ON o.ID = t.ORDER_ID")
+    other = key("SELECT * FROM ADDITIONAL_END_POINTS")
+    for entry in (orders, tasks, other):
+        cache.set(entry, rows(2))
+
+    assert cache.get(orders) == rows(2)
+    assert cache.invalidate_tables(["point_order"]) == 2
+    assert cache.get(orders) is MISSING and cache.get(tasks) is MISSING
+    assert cache.get(other) == rows(2)
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 2
+
+def test_least_recently_used_results_are_evicted_to_stay_within_the_byte_bound():
+    size = estimate_size(rows(10))
+    cache = QueryResultCache(max_bytes=size * 4, default_ttl=60)
+    for i in range(4):
+        cache.set(key(f"SELECT * FROM POINT_ORDER WHERE ID > {i}"), rows(10))
+    cache.get(key("SELECT * FROM POINT_ORDER WHERE ID > 0"))
+    cache.set(key("SELECT * FROM POINT_ORDER WHERE ID > 4"), rows(10))
+
+    assert cache.stats()["bytes"] <= size * 4
+    assert cache.get(key("SELECT * FROM POINT_ORDER WHERE ID > 1")) is MISSING
+    assert cache.get(key("SELECT * FROM POINT_ORDER WHERE ID > 0")) is not MISSING
+
+def test_results_larger_than_a_quarter_of_the_budget_are_not_cached():
+    cache = QueryResultCache(max_bytes=estimate_size(rows(10)) * 3, default_ttl=60)
+    cache.set(key("SELECT * FROM POINT_ORDER"), rows(10))
+    assert cache.get(key("SELECT * FROM POINT_ORDER")) is MISSING
+
+def test_entries_expire_after_the_shortest_ttl_of_their_tables():
+    cache = QueryResultCache(max_bytes=1_000_000, default_ttl=60, table_ttls={"POINT_TASK": 0.05})
+    joined = key("SELECT * FROM POINT_TASK t JOIN POINT_ORDER o ON o.ID = t.ORDER_ID")
+    orders = key("SELECT * FROM POINT_ORDER")
+    cache.set(joined, rows(1))
+    cache.set(orders, rows(1))
+    time.sleep(0.1)
+    assert cache.get(joined) is MISSING
+    assert cache.get(orders) == rows(1)
+
+def test_tables_with_a_zero_ttl_are_never_cached():
+    cache = QueryResultCache(max_bytes=1_000_000, default_ttl=60, table_ttls={"POINT_TASK": 0})
+    cache.set(key("SELECT * FROM POINT_TASK"), rows(1))
+    assert cache.get(key("SELECT * FROM POINT_TASK")) is MISSING
@@ -0,0 +1,60 @@
+from services.schema_pruning import compact_schema_context, parse_schema_context, prune_schema, render_schema
+
+SCHEMA_CONTEXT = """Table 1: POINT_TASK
+Columns:
+ - TASK_ID (BIGINT, PRIMARY KEY): Unique identifier for each task.
+ - TASK_STATE (VARCHAR, 255): The current state of the task (e.g., pending, in-progress, completed).
+ - TASK_NAME (VARCHAR, 255): The name or title of the task.
+ - COMPLETED_DATE (DATETIME(6)): The date and time when the task was completed.
+ - ORDER_ID (BIGINT): The identifier of the order associated with the task.
+
+Table 2: POINT_ORDER
+Columns:
+ - ORDER_ID (BIGINT, PRIMARY KEY): Unique identifier for each order.
+ - CUSTOMER_NAME (VARCHAR, 255): Name of the customer who placed the order.
+ - REGION (VARCHAR, 255): Sales region of the order (e.g., EMEA, APAC).
+ - CREATED_DATE (DATETIME(6)): The date and time when the order was created.
+"""
+
+def prune(question: str) -> dict[str, list[str]] | None:
+    tables = prune_schema(parse_schema_context(SCHEMA_CONTEXT), question)
+    return None if tables is None else {table.name: [column.name for column in table.columns] for table in tables}
+
+def test_schema_text_is_parsed_into_tables_and_columns():
+    task, order = parse_schema_context(SCHEMA_CONTEXT)
+    assert task.name == "POINT_TASK" and len(task.columns) == 5
+    assert task.columns[0].primary_key and task.columns[3].temporal
+    assert task.columns[1].examples == ["pending", "in-progress", "completed"]
+    assert order.columns[2].data_type == "VARCHAR"
+
+def test_table_without_named_columns_keeps_every_column():
+    assert prune("which tasks failed") == {
+        "POINT_TASK": ["TASK_ID", "TASK_STATE", "TASK_NAME", "COMPLETED_DATE", "ORDER_ID"],
+    }
+
+def test_named_columns_keep_keys_and_join_columns():
+    assert prune("task state and customer of orders") == {
+        "POINT_TASK": ["TASK_ID", "TASK_STATE", "ORDER_ID"],
+        "POINT_ORDER": ["ORDER_ID", "CUSTOMER_NAME"],
+    }
+
+def test_temporal_questions_keep_date_columns():
+    assert prune("latest task state") == {"POINT_TASK": ["TASK_ID", "TASK_STATE", "COMPLETED_DATE"]}
+
+def test_column_words_select_a_table_the_question_does_not_name():
+    assert list(prune("totals by region")) == ["POINT_ORDER"]
+
+def test_example_values_never_select_a_table():
+    assert prune("everything in emea") is None
+
+def test_unparseable_or_unmatched_context_is_returned_unchanged():
+    fragment = " - TASK_ID (BIGINT, PRIMARY KEY): Unique identifier for each task."
+    assert parse_schema_context(fragment) is None
+    assert compact_schema_context("which tasks failed", fragment) == fragment
+    assert compact_schema_context("what is the weather", SCHEMA_CONTEXT) == SCHEMA_CONTEXT
+
+def test_compacted_context_is_smaller_and_dense():
+    compacted = compact_schema_context("which tasks failed", SCHEMA_CONTEXT)
+    assert compacted == render_schema(parse_schema_context(SCHEMA_CONTEXT)[:1])
+    assert "TASK_STATE VARCHAR e.g. pending/in-progress/completed" in compacted
+    assert len(compacted) < len(SCHEMA_CONTEXT)
@@ -0,0 +1,19 @@
+import datetime
+import decimal
+import pytest
+from services.serialization import dumps, to_arrow_ipc
+
+def test_dumps_matches_jsonable_encoder_types():
+    row = {
+        "at": datetime.datetime(2024, 1, 2, 3, 4, 5), "day": datetime.date(2024, 1, 2),
+        "amount": decimal.Decimal("1.5"), "raw": b"x", "duration": datetime.timedelta(minutes=1), "none": None,
+    }
+    assert dumps(row) == (
+        b'{"at":"2024-01-02T03:04:05","day":"2024-01-02","amount":1.5,"raw":"x","duration":60.0,"none":null}'
+    )
+
+def test_arrow_ipc_keeps_duplicate_column_names():
+    pa = pytest.importorskip("pyarrow")
+    table = pa.ipc.open_stream(to_arrow_ipc(["ID", "NAME", "ID"], [[1, "a", 10], [2, None, 20]])).read_all()
+    assert table.column_names == ["ID", "NAME", "ID"]
+    assert [column.to_pylist() for column in table.columns] == [[1, 2], ["a", None], [10, 20]]
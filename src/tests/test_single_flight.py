@@ -0,0 +1,66 @@
+import asyncio
+from services.single_flight import SingleFlight
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", work) for _ in range(5)), flight.do("other", work))
+
+    assert asyncio.run(main()) == ["result"] * 6
+    assert len(calls) == 2
+    assert flight.stats()["calls"] == 6 and flight.stats()["coalesced"] == 4
+
+def test_waiters_receive_the_same_exception():
+    flight = SingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(flight.do("key", work), flight.do("key", work), return_exceptions=True)
+
+    assert [type(result) for result in asyncio.run(main())] == [ValueError, ValueError]
+
+def test_cancelled_waiter_does_not_cancel_the_shared_work_for_the_others():
+    flight = SingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("key", work))
+        second = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, first.cancelled()
+
+    assert asyncio.run(main()) == ("result", True)
+
+def test_work_is_cancelled_once_every_waiter_has_gone():
+    flight = SingleFlight("test")
+    finished = []
+
+    async def work():
+        await asyncio.sleep(0.05)
+        finished.append(1)
+
+    async def main():
+        waiters = [asyncio.ensure_future(flight.do("key", work)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.sleep(0.1)
+        # A new call after the abandoned one starts fresh work
+        await flight.do("key", work)
+
+    asyncio.run(main())
+    assert finished == [1]
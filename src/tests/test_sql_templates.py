@@ -0,0 +1,46 @@
+from services.sql_templates import SqlTemplateStore, question_shape
+
+SQL = "SELECT * FROM POINT_ORDER WHERE CUSTOMER_NAME LIKE '%{}%' AND ORDER_COUNT > {}"
+
+def make_store(**overrides) -> SqlTemplateStore:
+    options = dict(max_size=16, ttl=60, min_support=2, min_confidence=0.9)
+    options.update(overrides)
+    return SqlTemplateStore(**options)
+
+def test_questions_with_different_values_share_a_shape():
+    shape, values = question_shape("Show orders for customer Acme Corp with more than 5 lines?")
+    assert shape == "show orders for customer {name} with more than {number} lines"
+    assert values == ["Acme Corp", "5"]
+    assert question_shape("show orders for customer Globex with more than 12 lines")[0] == shape
+
+def test_template_is_used_only_after_min_support_distinct_values():
+    store = make_store()
+    store.learn("Show orders for customer Acme with more than 5 lines", SQL.format("Acme", 5))
+    assert store.match("Show orders for customer Initech with more than 7 lines") is None
+
+    store.learn("Show orders for customer Globex with more than 12 lines", SQL.format("Globex", 12))
+    match = store.match("Show orders for customer Initech with more than 7 lines")
+    assert match.sql == "SELECT * FROM POINT_ORDER WHERE CUSTOMER_NAME LIKE %s AND ORDER_COUNT > %s"
+    assert match.params == ("%Initech%", 7)
+    assert store.stats()["hits"] == 1 and store.stats()["learned"] == 1
+
+def test_conflicting_translations_and_failures_lower_confidence():
+    store = make_store()
+    store.learn("Show orders for customer Acme with more than 5 lines", SQL.format("Acme", 5))
+    store.learn("Show orders for customer Globex with more than 12 lines", SQL.format("Globex", 12))
+    match = store.match("Show orders for customer Initech with more than 7 lines")
+
+    store.report_failure(match)
+    assert store.match("Show orders for customer Initech with more than 7 lines") is None
+    assert store.stats()["low_confidence"] == 1
+
+def test_questions_without_values_in_the_sql_are_not_learned():
+    store = make_store()
+    store.learn("How many orders are there", "SELECT COUNT(*) FROM POINT_ORDER")
+    assert store.stats()["size"] == 0
+
+def test_look_ahead_match_does_not_count_in_the_stats():
+    store = make_store(min_support=1)
+    store.learn("Show orders for customer Acme with more than 5 lines", SQL.format("Acme", 5))
+    assert store.match("Show orders for customer Globex with more than 9 lines", count=False) is not None
+    assert store.stats()["lookups"] == 0 and store.stats()["hits"] == 0
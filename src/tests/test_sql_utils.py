@@ -0,0 +1,105 @@
+import pytest
+from services.sql_utils import _parse, count_source_query, is_single_row, paginate_query, referenced_tables
+
+def test_union_all_branches_are_capped_at_offset_plus_limit():
+    sql = "SELECT ID FROM POINT_ORDER UNION ALL SELECT ID FROM POINT_TASK"
+    assert paginate_query(sql, 20, 10) == (
+        "(SELECT ID FROM POINT_ORDER LIMIT 30) UNION ALL (SELECT ID FROM POINT_TASK LIMIT 30) LIMIT 10 OFFSET 20"
+    )
+
+@pytest.mark.parametrize("sql", [
+    # An outer ORDER BY needs every row of each branch
+    "SELECT ID FROM POINT_ORDER UNION ALL SELECT ID FROM POINT_TASK ORDER BY ID",
+    # A DISTINCT union may drop rows, so a branch may have to contribute more than a page
+    "SELECT ID FROM POINT_ORDER UNION SELECT ID FROM POINT_TASK",
+])
+def test_union_branches_are_not_capped_when_the_page_depends_on_all_rows(sql):
+    assert paginate_query(sql, 20, 10) == f"{sql} LIMIT 10 OFFSET 20"
+
+def test_union_branch_with_single_row_aggregate_is_not_capped():
+    sql = "SELECT COUNT(*) FROM POINT_ORDER UNION ALL SELECT ID FROM POINT_TASK"
+    assert paginate_query(sql, 0, 10) == (
+        "SELECT COUNT(*) FROM POINT_ORDER UNION ALL (SELECT ID FROM POINT_TASK LIMIT 10) LIMIT 10 OFFSET 0"
+    )
+
+def test_column_named_like_an_aggregate_is_paginated():
+    sql = "SELECT ID, TOTAL_AMOUNT FROM POINT_ORDER"
+    assert paginate_query(sql, 0, 10) == f"{sql} LIMIT 10 OFFSET 0"
+
+def test_grouped_aggregate_is_paginated():
+    sql = "SELECT STATUS, COUNT(*) FROM POINT_ORDER GROUP BY STATUS"
+    assert paginate_query(sql, 40, 20) == f"{sql} LIMIT 20 OFFSET 40"
+
+def test_single_row_aggregate_is_returned_unchanged():
+    sql = "SELECT SUM(TOTAL_AMOUNT) FROM POINT_ORDER WHERE STATUS = 'PAID'"
+    assert paginate_query(sql, 0, 10) == sql
+
+def test_query_with_its_own_limit_is_paginated_as_a_derived_table():
+    assert paginate_query("SELECT ID FROM POINT_ORDER LIMIT 5", 0, 10) == (
+        "SELECT * FROM (SELECT ID FROM POINT_ORDER LIMIT 5) AS page_source LIMIT 10 OFFSET 0"
+    )
+
+def test_unparseable_sql_is_still_bounded():
+    assert paginate_query("SELEC nonsense", 0, 10) == (
+        "SELECT * FROM (SELEC nonsense) AS page_source LIMIT 10 OFFSET 0"
+    )
+
+def test_placeholders_and_escaped_percent_signs_round_trip():
+    sql = (
+        "SELECT ID FROM POINT_ORDER WHERE NAME LIKE '50%%' AND ID = %s "
+        "UNION ALL SELECT ID FROM POINT_TASK WHERE ID = %s"
+    )
+    assert paginate_query(sql, 0, 10, parameterized=True) == (
+        "(SELECT ID FROM POINT_ORDER WHERE NAME LIKE '50%%' AND ID = %s LIMIT 10) "
+        "UNION ALL (SELECT ID FROM POINT_TASK WHERE ID = %s LIMIT 10) LIMIT 10 OFFSET 0"
+    )
+
+def test_parameterized_single_row_aggregate_is_returned_unchanged():
+    sql = "SELECT COUNT(*) FROM POINT_ORDER WHERE NAME LIKE '%%x' AND ID > %s"
+    assert paginate_query(sql, 0, 10, parameterized=True) == sql
+
+def test_referenced_tables_excludes_cte_names():
+    sql = "WITH recent AS (SELECT * FROM POINT_ORDER) SELECT * FROM recent JOIN point_task ON 1 = 1"
+    assert referenced_tables(sql) == {"POINT_ORDER", "POINT_TASK"}
+
+def test_referenced_tables_includes_subqueries_and_union_branches():
+    sql = (
+        "SELECT ID FROM POINT_ORDER WHERE ID IN (SELECT ORDER_ID FROM POINT_TASK) "
+        "UNION ALL SELECT ID FROM ADDITIONAL_END_POINTS"
+    )
+    assert referenced_tables(sql) == {"POINT_ORDER", "POINT_TASK", "ADDITIONAL_END_POINTS"}
+
+def test_referenced_tables_reads_parameterized_sql():
+    assert referenced_tables("SELECT * FROM POINT_ORDER WHERE ID = %s") == {"POINT_ORDER"}
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT SUM(TOTAL_AMOUNT) FROM POINT_ORDER", True),
+    ("SELECT COUNT(*) + 1 AS N FROM POINT_ORDER", True),
+    ("SELECT TOTAL_AMOUNT FROM POINT_ORDER", False),
+    ("SELECT STATUS, COUNT(*) FROM POINT_ORDER GROUP BY STATUS", False),
+    ("SELECT ID, ROW_NUMBER() OVER (ORDER BY ID) FROM POINT_ORDER", False),
+    ("SELECT ID, (SELECT COUNT(*) FROM POINT_TASK) FROM POINT_ORDER", False),
+])
+def test_is_single_row(sql, expected):
+    assert is_single_row(_parse(sql)) is expected
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT * FROM POINT_ORDER o JOIN POINT_TASK t ON o.ID = t.ORDER_ID",
+     "SELECT 1 FROM POINT_ORDER AS o JOIN POINT_TASK AS t ON o.ID = t.ORDER_ID"),
+    ("SELECT STATUS, COUNT(*) FROM POINT_ORDER GROUP BY STATUS ORDER BY COUNT(*) DESC",
+     "SELECT 1 FROM POINT_ORDER GROUP BY STATUS"),
+])
+def test_count_source_replaces_the_columns_by_a_constant(sql, expected):
+    assert count_source_query(sql) == expected
+
+@pytest.mark.parametrize("sql", [
+    # A constant projection would group or sort by the constant 1 instead of the column
+    "SELECT STATUS, COUNT(*) FROM POINT_ORDER GROUP BY 1",
+    "SELECT ID, NAME FROM POINT_ORDER ORDER BY 2",
+    "SELECT ID FROM POINT_ORDER UNION ALL SELECT ID FROM POINT_TASK ORDER BY 1",
+    "SELECT STATUS AS S, COUNT(*) FROM POINT_ORDER GROUP BY S",
+    "SELECT DISTINCT STATUS FROM POINT_ORDER",
+    "SELECT COUNT(*) FROM POINT_ORDER",
+])
+def test_count_source_keeps_projections_the_row_count_depends_on(sql):
+    assert count_source_query(sql) == sql